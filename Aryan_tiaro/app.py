@@ -1,35 +1,13 @@
+import os
 import streamlit as st
 import pandas as pd
 import requests
 import pickle
-import json
-import numpy as np
-import re
 
-# --- Extract float from mixed string ---
-
-
-def extract_number(value):
-    match = re.search(r"\d+\.?\d*", str(value))
-    return float(match.group()) if match else None
-
-# --- Calculate Fare ---
-
-
-def calculate_fare(distance, mileage, fuel_price, original_price, predicted_price, m2, passengers):
-    if mileage == 0 or original_price == 0 or passengers == 0:
-        return None, None
-    m1 = 1 + (1 - (predicted_price * 0.9 / original_price))
-    total_fare = (distance / mileage) * fuel_price * m1 * m2
-    per_head_fare = total_fare / passengers
-    return round(total_fare, 2), round(per_head_fare, 2)
-
-
-# --- Load model and car list ---
-with open("stacking_model.pkl", "rb") as f:
-    price_model = pickle.load(f)
-    st.write(f"✅ Model type loaded: {type(price_model)}")
+# Quote service (quote_api.py): car specs, resale price and fare in one request
+QUOTE_API_URL = os.getenv("QUOTE_API_URL", "http://127.0.0.1:8002/quote")
 
+# --- Load car list ---
 with open("car_brand_names.pkl", "rb") as f:
     car_brand_names = pickle.load(f)
 
@@ -87,113 +65,73 @@ if st.button("🔮 Predict Price & Estimate Fare"):
     if not all([car_name, model_name, year, fuel_type, variant]):
         st.warning("🚨 Please fill all fields.")
     else:
-        with st.spinner("⏳ Fetching car specs..."):
+        with st.spinner("⏳ Fetching car specs and pricing..."):
             api_payload = {
                 "car_name": car_name,
                 "model": model_name,
                 "year": str(year),
                 "fuel_type": fuel_type,
-                "variant": variant
+                "variant": variant,
+                "car_type": car_type,
+                "km_driven": km_driven,
+                "transmission": transmission,
+                "car_age": car_age,
+                "distance": distance,
+                "fuel_price": fuel_price,
+                "passengers": num_passengers,
+                "m2": m2,
+                "depreciation_ratio": custom_depreciation_ratio
             }
 
             try:
-                response = requests.post(
-                    "http://127.0.0.1:8000/get-car-info", json=api_payload)
-                result = response.json()
+                result = requests.post(QUOTE_API_URL, json=api_payload).json()
 
                 if "error" in result:
-                    st.error(f"❌ API Error: {result['error']}")
+                    st.error(f"❌ API Error ({result.get('stage')}): {result['error']}")
                 else:
-                    data = result["result"]
-
-                    # Extract values safely
-                    mileage = extract_number(
-                        data.get("company_claimed_mileage", ""))
-                    engine = extract_number(data.get("engine", ""))
-                    max_power = extract_number(data.get("max_power", ""))
-                    original_price = extract_number(
-                        data.get("original_price", ""))
-
-                    if None in (mileage, engine, max_power, original_price):
-                        st.error("⚠️ Missing data. Try another input or car.")
-                    else:
-                        input_df = pd.DataFrame([{
-                            "km_driven": km_driven,
-                            "fuel": fuel_type,
-                            "transmission": transmission,
-                            "mileage": mileage,
-                            "engine": engine,
-                            "max_power": max_power,
-                            "car_brand_name": car_name,
-                            "car_age": car_age
-                        }])
-
-                        st.write("🔍 Model Input Preview:")
-                        st.dataframe(input_df)
-
-                        # Predict log price and reverse log
-                        predicted_log = price_model.predict(input_df)[0]
-                        predicted_price = np.expm1(predicted_log)
-
-                        st.success(
-                            f"💰 Predicted Resale Price: ₹{predicted_price*0.9:,.2f}")
+                    st.write("🔍 Model Input Preview:")
+                    st.dataframe(pd.DataFrame([result["model_input"]]))
+
+                    predicted_price = result["predicted_price"]
+                    original_price = result["original_price"]
+                    st.success(
+                        f"💰 Predicted Resale Price: ₹{result['resale_price']:,.2f}")
+                    st.info(
+                        f"🧾 Original On-Road Price: ₹{original_price:,.2f}")
+
+                    # --- Depreciation Analysis ---
+                    depreciated_value = original_price - predicted_price
+                    retained_percent = (predicted_price / original_price) * 100
+
+                    st.subheader("📉 Car Depreciation Analysis")
+                    colA, colB, colC = st.columns(3)
+                    colA.metric("Original Price", f"₹{original_price:,.0f}")
+                    colB.metric("Predicted Price", f"₹{predicted_price:,.0f}")
+                    colC.metric(
+                        "Depreciated Value", f"₹{depreciated_value:,.0f}", f"-{result['depreciation_percent']:.1f}%")
+
+                    st.caption(
+                        f"⚖️ Retained Value: **{retained_percent:.2f}%** of original on-road price.")
+                    st.progress(min(retained_percent / 100, 1.0))
+
+                    if result["adjusted_mileage"]:
                         st.info(
-                            f"🧾 Original On-Road Price: ₹{original_price:,.2f}")
-
-                        # --- Depreciation Analysis ---
-                        depreciated_value = original_price - predicted_price
-                        depreciation_percent = (
-                            depreciated_value / original_price) * 100
-                        retained_percent = (
-                            predicted_price / original_price) * 100
-
-                        st.subheader("📉 Car Depreciation Analysis")
-                        colA, colB, colC = st.columns(3)
-                        colA.metric("Original Price",
-                                    f"₹{original_price:,.0f}")
-                        colB.metric("Predicted Price",
-                                    f"₹{predicted_price:,.0f}")
-                        colC.metric(
-                            "Depreciated Value", f"₹{depreciated_value:,.0f}", f"-{depreciation_percent:.1f}%")
-
-                        st.caption(
-                            f"⚖️ Retained Value: **{retained_percent:.2f}%** of original on-road price.")
-                        st.progress(min(retained_percent / 100, 1.0))
-
-                        # --- Adjusted Mileage Calculation ---
-                        m1_raw = 1 + (1 - (predicted_price * 0.9 / original_price))
-                        m1 = 1 + custom_depreciation_ratio * (m1_raw - 1)
-                        adjusted_mileage = mileage / m1 if m1 != 0 else None
-
-                        # Apply caps
-                        if adjusted_mileage:
-                            if car_type == "SUV":
-                                capped_mileage = max(16, adjusted_mileage)
-                            elif car_type == "Sedan":
-                                capped_mileage = max(20, adjusted_mileage)
-                            elif car_type == "Hatchback":
-                                capped_mileage = max(23, adjusted_mileage)
-                            else:
-                                capped_mileage = adjusted_mileage  # fallback
-                            st.info(
-                                f"📉 Adjusted Mileage (Based on Depreciation + Cap for {car_type}): **{capped_mileage:.2f} km/l**")
-                        else:
-                            st.warning(
-                                "⚠️ Could not compute adjusted mileage due to invalid values.")
-
-                        # --- Fare Calculation ---
-                        total_fare, per_head = calculate_fare(
-                            distance, capped_mileage, fuel_price, original_price, predicted_price, m2, num_passengers
-                        )
-
-                        if total_fare:
-                            st.subheader("🚕 Estimated Pool Fare")
-                            st.write(f"**Total Fare**: ₹{total_fare:,.2f}")
-                            st.write(
-                                f"**Per Passenger (Split)**: ₹{per_head:,.2f}")
-                        else:
-                            st.warning(
-                                "Could not compute fare due to invalid values.")
+                            f"📉 Adjusted Mileage (Based on Depreciation + Cap for {car_type}): **{result['adjusted_mileage']:.2f} km/l**")
+                    else:
+                        st.warning(
+                            "⚠️ Could not compute adjusted mileage due to invalid values.")
+
+                    # --- Fare Calculation ---
+                    if result["total_fare"]:
+                        st.subheader("🚕 Estimated Pool Fare")
+                        st.write(f"**Total Fare**: ₹{result['total_fare']:,.2f}")
+                        st.write(
+                            f"**Per Passenger (Split)**: ₹{result['per_head_fare']:,.2f}")
+                    else:
+                        st.warning(
+                            "Could not compute fare due to invalid values.")
+
+                    st.caption(" · ".join(f"{stage} {ms:.0f} ms" for stage, ms in result["timings_ms"].items()))
 
             except Exception as e:
                 st.error(f"❌ Error during prediction: {e}")
@@ -0,0 +1,65 @@
+"""Catalogue lookup latency: exact / prefix / fuzzy on the memory-mapped index vs difflib over all names.
+
+Queries are listing names as typed by users: exact, truncated, and with one typo
+(swapped or dropped letter) in a random word.
+
+Usage: python bench_catalogue.py ["Car details.csv"] [n_queries]
+"""
+import difflib
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from catalogue import Catalogue, build_catalogue, normalize, read_listing_names
+
+
+def typo(name, rng):
+    words = name.split()
+    i = rng.integers(len(words))
+    word = words[i]
+    if len(word) > 3:
+        j = rng.integers(1, len(word) - 1)
+        word = word[:j] + word[j + 1] + word[j] + word[j + 2:] if rng.random() < 0.5 else word[:j] + word[j + 1:]
+    words[i] = word
+    return " ".join(words)
+
+
+def per_query_us(fn, queries):
+    start = time.perf_counter()
+    results = [fn(q) for q in queries]
+    return (time.perf_counter() - start) / len(queries) * 1e6, results
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "Car details.csv"
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    rng = np.random.default_rng(0)
+
+    names = read_listing_names(path).dropna().unique()
+    with tempfile.TemporaryDirectory() as directory:
+        Catalogue(build_catalogue(names)).save(directory)
+        catalogue = Catalogue.load(directory)
+        picks = rng.choice(names, n)
+        queries = {
+            "exact": [p.lower() for p in picks],
+            "prefix": [p[:max(3, len(p) // 2)] for p in picks],
+            "typo": [typo(p, rng) for p in picks],
+        }
+
+        print(f"{len(catalogue.names):,} entries / {len(catalogue.keys):,} keys, {n} queries each\n")
+        print(f"{'queries':<8}{'resolve us':>12}{'top-1 ok':>10}{'difflib us':>12}{'top-1 ok':>10}")
+        all_names = [normalize(name) for name in catalogue.names.astype(str)]
+        for kind, qs in queries.items():
+            us, results = per_query_us(catalogue.resolve, qs)
+            base_us, base = per_query_us(lambda q: difflib.get_close_matches(normalize(q), all_names, 1, 0.3), qs)
+            wanted = [normalize(p) for p in picks]
+            if kind == "prefix":
+                ok = np.mean([any(normalize(r["name"]).startswith(normalize(q)) for r in res[:1])
+                              for q, res in zip(qs, results)])
+                base_ok = np.mean([bool(b) and b[0].startswith(normalize(q)) for q, b in zip(qs, base)])
+            else:
+                ok = np.mean([bool(res) and normalize(res[0]["name"]) == w for res, w in zip(results, wanted)])
+                base_ok = np.mean([bool(b) and b[0] == w for b, w in zip(base, wanted)])
+            print(f"{kind:<8}{us:>12.1f}{ok:>10.1%}{base_us:>12.1f}{base_ok:>10.1%}")
@@ -0,0 +1,75 @@
+"""Parity + rows/sec: sklearn stacking pipeline vs the compiled flat-array predictor.
+
+Batches go to the pipeline as DataFrames and to the compiled stack as lists of row dicts,
+the way price_api.py calls them. The last line is the largest batch size at which the
+compiled path is still faster (PRICE_COMPILED_MAX_BATCH).
+
+Usage: python bench_compiled.py [stacking_model.pkl] [Car details.csv]
+"""
+import pickle
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from tree_compile import CompiledStack
+
+
+def load_listings(csv_path):
+    # Same cleaning as the training notebook
+    df = pd.read_csv(csv_path)
+    df["car_brand_name"] = df["name"].str.extract(r"([^\s]+)", expand=False)
+    for col in ["engine", "mileage", "max_power"]:
+        df[col] = pd.to_numeric(df[col].str.extract(r"([^\s]+)", expand=False), errors="coerce")
+    df["car_age"] = 2020 - df["year"]
+    df = df[["km_driven", "fuel", "transmission", "mileage", "engine", "max_power", "car_brand_name", "car_age"]]
+    return df.fillna(df.median(numeric_only=True))
+
+
+BATCH_SIZES = [1, 8, 32, 64, 128, 256, 512, 1024, 4096]
+
+
+def rows_per_sec(predict, X, batch_size, min_seconds=1.0, as_records=False):
+    batches = [X.iloc[i:i + batch_size] for i in range(0, len(X) - batch_size + 1, batch_size)] or [X]
+    if as_records:
+        batches = [batch.to_dict("records") for batch in batches[:200]]
+    n_rows, start, i = 0, time.perf_counter(), 0
+    while time.perf_counter() - start < min_seconds:
+        batch = batches[i % len(batches)]
+        predict(batch)
+        n_rows += len(batch)
+        i += 1
+    return n_rows / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    model_path = sys.argv[1] if len(sys.argv) > 1 else "stacking_model.pkl"
+    csv_path = sys.argv[2] if len(sys.argv) > 2 else "Car details.csv"
+
+    with open(model_path, "rb") as f:
+        pipeline = pickle.load(f)
+    compiled = CompiledStack.from_pipeline(pipeline)
+    X = load_listings(csv_path)
+    X_big = pd.concat([X] * (4096 // len(X) + 1), ignore_index=True)
+
+    diff = np.max(np.abs(pipeline.predict(X) - compiled.predict(X)))
+    # XGBoost accumulates in float32, so exact equality is not expected (1e-4 in log price = 0.01%)
+    assert diff < 1e-4, f"compiled predictions differ by {diff} (log price)"
+    print(f"✅ Parity OK on {len(X)} rows (max abs diff {diff:.2e} in log price)")
+    if compiled.compiled_preprocess is not None:
+        pre_diff = np.max(np.abs(compiled.preprocess.transform(X) - compiled.compiled_preprocess.transform(X)))
+        records_diff = np.max(np.abs(compiled.predict(X) - compiled.predict(X.to_dict("records"))))
+        assert pre_diff < 1e-12 and records_diff < 1e-12, f"compiled preprocessing differs by {pre_diff}"
+        print(f"✅ Compiled preprocessing matches the ColumnTransformer (max abs diff {pre_diff:.2e})")
+
+    print(f"\n{'batch':>6}{'sklearn rows/s':>18}{'compiled rows/s':>18}{'speedup':>10}")
+    crossover = previous = 0
+    for batch_size in BATCH_SIZES:
+        ref = rows_per_sec(pipeline.predict, X_big, batch_size)
+        new = rows_per_sec(compiled.predict, X_big, batch_size, as_records=True)
+        print(f"{batch_size:>6}{ref:>18,.0f}{new:>18,.0f}{new / ref:>9.1f}x")
+        if new > ref and crossover == previous:  # faster at this size and at every smaller one
+            crossover = batch_size
+        previous = batch_size
+    print(f"\n⏳ Compiled path is faster up to batch {crossover}: PRICE_COMPILED_MAX_BATCH={crossover}")
@@ -0,0 +1,49 @@
+"""Parse time and prompt size: old BeautifulSoup get_text()[:5000] vs page_extract.
+
+fixtures/ holds three small saved-style pages (nav, footer, inline scripts and styles around the specs):
+one with a JSON-LD price, one with the price in text, one with no price (the LLM is still needed).
+    python bench_extract.py                   # the committed fixtures
+    python bench_extract.py saved/*.html      # or real pages, e.g. curl -A "Mozilla/5.0" -o saved/dzire.html ...
+"""
+import glob
+import os
+import statistics
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from page_extract import extract_page
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+def old_prompt_text(content):
+    soup = BeautifulSoup(content, "html.parser")
+    return soup.get_text(separator=' ')[:5000]
+
+
+def median_ms(fn, content, reps):
+    timings = []
+    for _ in range(reps):
+        start = time.perf_counter()
+        fn(content)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:] or sorted(glob.glob(os.path.join(FIXTURES, "*.html")))
+    if not paths:
+        sys.exit(f"No pages given and none in {FIXTURES}")
+    reps = 20
+
+    print(f"{'page':<30}{'KB':>8}{'old ms':>10}{'new ms':>10}{'old chars':>11}{'new chars':>11}  LLM skipped")
+    for path in paths:
+        with open(path, "rb") as f:
+            content = f.read()
+        page = extract_page(content)
+        print(
+            f"{path[-30:]:<30}{len(content) / 1024:>8.0f}"
+            f"{median_ms(old_prompt_text, content, reps):>10.1f}{median_ms(extract_page, content, reps):>10.1f}"
+            f"{len(old_prompt_text(content)):>11}{len(page['context']):>11}  {'yes' if page['complete'] else 'no'}"
+        )
@@ -0,0 +1,87 @@
+"""Spec-string parsing: notebook str.extract chains / per-value re.search vs spec_parse.
+
+Runs on Car details.csv and on a stress set 100x larger whose numbers and units are
+re-drawn at random, so it has far more distinct strings than the real listings
+(every torque string is unique: the worst case for spec_parse's dedup).
+
+Usage: python bench_parse.py ["Car details.csv"]
+"""
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from spec_parse import parse_engine, parse_mileage, parse_power, parse_torque
+
+
+def notebook_parse(df):
+    out = pd.DataFrame(index=df.index)
+    out["engine"] = df["engine"].str.extract(r"([^\s]+)")[0].astype(float)
+    out["mileage"] = df["mileage"].str.extract(r"([^\s]+)")[0].astype(float)
+    max_power = df["max_power"].str.extract(r"([^\s]+)")[0]
+    out["max_power"] = max_power[~(max_power == "bhp")].astype(float)
+    return out
+
+
+def extract_number(value):
+    # Aryan_tiaro/app.py before spec_parse
+    match = re.search(r"\d+\.?\d*", str(value))
+    return float(match.group()) if match else None
+
+
+def per_value_parse(df):
+    return pd.DataFrame({col: df[col].map(extract_number) for col in ["engine", "mileage", "max_power"]})
+
+
+def spec_parse(df):
+    return pd.DataFrame({
+        "engine": parse_engine(df["engine"]),
+        "mileage": parse_mileage(df["mileage"]),
+        "max_power": parse_power(df["max_power"])
+    })
+
+
+def stress_set(df, factor=100, seed=0):
+    rng = np.random.default_rng(seed)
+    big = pd.concat([df] * factor, ignore_index=True)
+    n = len(big)
+
+    def numbers(low, high, decimals):
+        return pd.Series(np.round(rng.uniform(low, high, n), decimals)).astype(str)
+
+    big["mileage"] = numbers(8, 30, 2) + pd.Series(rng.choice([" kmpl", " km/l", " km/kg"], n))
+    big["engine"] = numbers(800, 3000, 0).str[:-2] + pd.Series(rng.choice([" CC", " cc"], n))
+    big["max_power"] = numbers(40, 250, 2) + pd.Series(rng.choice([" bhp", " PS", " kW"], n))
+    big["torque"] = (numbers(80, 450, 1) + pd.Series(rng.choice(["Nm@ ", " Nm at "], n))
+                     + numbers(1500, 5000, 0).str[:-2] + "rpm")
+    return big
+
+
+def best_of(fn, df, reps=3):
+    timings = []
+    for _ in range(reps):
+        start = time.perf_counter()
+        fn(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    df = pd.read_csv(sys.argv[1] if len(sys.argv) > 1 else "Car details.csv")
+
+    # Parity with the notebook on the real listings
+    old, new = notebook_parse(df), spec_parse(df)
+    for col in ["engine", "mileage", "max_power"]:
+        np.testing.assert_allclose(new[col], old[col].reindex(df.index), equal_nan=True)
+    print(f"✅ Parity OK with the notebook on {len(df)} rows")
+
+    # mileage + engine + max_power; torque separately since the notebook never parsed it
+    print(f"\n{'dataset':<12}{'rows':>10}{'notebook s':>12}{'per-value s':>13}{'spec_parse s':>14}"
+          f"{'speedup':>9}{'torque s':>10}")
+    for name, data in [("listings", df), ("stress 100x", stress_set(df))]:
+        t_old, t_value, t_new = best_of(notebook_parse, data), best_of(per_value_parse, data), best_of(spec_parse, data)
+        t_torque = best_of(lambda d: parse_torque(d["torque"]), data)
+        print(f"{name:<12}{len(data):>10,}{t_old:>12.3f}{t_value:>13.3f}{t_new:>14.3f}"
+              f"{t_old / t_new:>8.1f}x{t_torque:>10.3f}")
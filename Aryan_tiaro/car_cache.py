@@ -0,0 +1,126 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+# --- Cache key ---
+def normalize_car_key(car_name, model, year, fuel_type, variant):
+    """'Maruti ', 'Dzire', 2022, 'Petrol', 'ZXI' and 'maruti', ' dzire', '2022', 'petrol', 'zxi' share a key."""
+    parts = (car_name, model, year, fuel_type, variant)
+    return "|".join(" ".join(str(p).lower().split()) for p in parts)
+
+
+# --- Two-tier cache: in-process LRU in front of a SQLite file ---
+class CarInfoCache:
+    """get_memory() never touches the disk; get() / set() may, so async callers run them in a thread.
+
+    Expired and overflow rows are deleted every `evict_every` writes, so the file can hold up to
+    max_rows + evict_every - 1 rows between sweeps.
+    """
+
+    def __init__(self, path, ttl_seconds=7 * 24 * 3600, max_rows=100_000, memory_size=1024, evict_every=256):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+        self.memory_size = memory_size
+        self.evict_every = evict_every
+
+        self._memory = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS car_info ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS car_info_created_at ON car_info (created_at)")
+        self._db.commit()
+
+    def get_memory(self, key):
+        """The in-process tier only; None on a miss (not counted, get() follows)."""
+        with self._lock:
+            return self._from_memory(key, time.time())
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            value = self._from_memory(key, now)
+            if value is not None:
+                return value
+
+            row = self._db.execute(
+                "SELECT value, created_at FROM car_info WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[1] + self.ttl_seconds > now:
+                value = json.loads(row[0])
+                self._remember(key, value, row[1] + self.ttl_seconds)
+                self._stats["disk_hits"] += 1
+                return value
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now + self.ttl_seconds)
+            self._db.execute(
+                "INSERT OR REPLACE INTO car_info (key, value, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), now)
+            )
+            self._stats["writes"] += 1
+            if self._stats["writes"] % self.evict_every == 0:
+                self._evict(now)
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            stats["disk_entries"] = self._db.execute("SELECT COUNT(*) FROM car_info").fetchone()[0]
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def _from_memory(self, key, now):
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return entry[1]
+            del self._memory[key]
+        return None
+
+    def _remember(self, key, value, expires_at):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _evict(self, now):
+        # Expired rows first, then the oldest rows beyond max_rows
+        expired = self._db.execute(
+            "DELETE FROM car_info WHERE created_at <= ?", (now - self.ttl_seconds,)
+        ).rowcount
+        overflow = self._db.execute(
+            "DELETE FROM car_info WHERE key IN ("
+            " SELECT key FROM car_info ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,)
+        ).rowcount
+        self._stats["evictions"] += expired + overflow
+
+
+def cache_from_env():
+    return CarInfoCache(
+        path=os.getenv("CAR_INFO_CACHE_PATH", "car_info_cache.sqlite3"),
+        ttl_seconds=float(os.getenv("CAR_INFO_CACHE_TTL", 7 * 24 * 3600)),
+        max_rows=int(os.getenv("CAR_INFO_CACHE_MAX_ROWS", 100_000)),
+        memory_size=int(os.getenv("CAR_INFO_CACHE_MEMORY_SIZE", 1024)),
+        evict_every=int(os.getenv("CAR_INFO_CACHE_EVICT_EVERY", 256))
+    )
@@ -0,0 +1,219 @@
+"""Car catalogue index: resolve user-typed brand / model / variant names to canonical IDs offline.
+
+Every listing name ("Maruti Swift Dzire VDI") adds three entries: brand ("Maruti"), model
+("Maruti Swift") and variant (the full name). Each entry gets an integer ID and a parent ID.
+Names are normalized (lower case, punctuation to spaces, whitespace collapsed), so
+"Maruti  swift-dzire VDi" and "maruti swift dzire vdi" are the same key.
+
+Lookup tries, in order:
+    exact   binary search in the sorted key array
+    prefix  the key range [query, query + 0xff)
+    fuzzy   trigram index: candidate keys sharing trigrams with the query, ranked by Jaccard
+
+Everything lives in flat NumPy arrays (fixed-width byte strings and CSR postings) saved as .npy,
+so Catalogue.load() memory-maps them and many processes share one copy.
+
+Usage:
+    python catalogue.py "Car details.csv" catalogue_index/
+"""
+import json
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ARRAY_NAMES = ["keys", "key_ids", "names", "levels", "parents",
+               "tri_keys", "tri_offsets", "tri_postings", "tri_counts"]
+LEVELS = ["brand", "model", "variant"]
+MIN_FUZZY_SCORE = 0.3
+
+_NON_ALNUM = re.compile(r"[^a-z0-9.]+|\.(?!\d)|(?<!\d)\.")  # keep the dot in "1.5", drop it elsewhere
+
+
+def normalize(name):
+    return " ".join(_NON_ALNUM.sub(" ", str(name).lower()).split())
+
+
+def trigrams(key):
+    """Distinct 3-byte windows of " key ", packed into ints."""
+    padded = np.frombuffer(f" {key} ".encode(), dtype=np.uint8).astype(np.int64)
+    if len(padded) < 3:
+        return np.empty(0, dtype=np.int64)
+    return np.unique((padded[:-2] << 16) | (padded[1:-1] << 8) | padded[2:])
+
+
+# --- Build ---
+def catalogue_entries(names):
+    """Listing names -> (display names, levels, parent IDs); brand = first word, model = first two."""
+    index, display, levels, parents = {}, [], [], []
+
+    def add(words, level, parent):
+        key = normalize(" ".join(words))
+        if key not in index:
+            index[key] = len(display)
+            display.append(" ".join(words))
+            levels.append(level)
+            parents.append(parent)
+        return index[key]
+
+    for name in pd.unique(pd.Series(names, dtype=object).dropna()):
+        words = str(name).split()
+        if not words or not normalize(name):
+            continue
+        parent = -1
+        for level in range(min(len(words), len(LEVELS))):
+            parent = add(words if level == len(LEVELS) - 1 else words[:level + 1], level, parent)
+    return display, np.array(levels, dtype=np.int8), np.array(parents, dtype=np.int32)
+
+
+def build_catalogue(names):
+    """Arrays for Catalogue from an iterable of listing names."""
+    display, levels, parents = catalogue_entries(names)
+    brand_names = {i: normalize(display[i]) for i in np.flatnonzero(levels == 0)}
+
+    # Lookup keys: the full name, plus the name without its brand ("swift dzire vdi")
+    key_list, id_list = [], []
+    for entry_id, name in enumerate(display):
+        key = normalize(name)
+        key_list.append(key)
+        id_list.append(entry_id)
+        if levels[entry_id] > 0:
+            brand = parents[entry_id] if levels[entry_id] == 1 else parents[parents[entry_id]]
+            key_list.append(key[len(brand_names[brand]):].strip())
+            id_list.append(entry_id)
+
+    order = np.argsort(np.array(key_list, dtype=object), kind="stable")
+    keys = np.array([key_list[i].encode() for i in order])
+    key_ids = np.array(id_list, dtype=np.int32)[order]
+
+    # Trigram postings in CSR layout: rows of keys for tri_keys[i] are tri_postings[tri_offsets[i]:tri_offsets[i+1]]
+    per_key = [trigrams(k.decode()) for k in keys]
+    tri_counts = np.array([len(t) for t in per_key], dtype=np.int32)
+    all_tris = np.concatenate(per_key)
+    rows = np.repeat(np.arange(len(keys), dtype=np.int32), tri_counts)
+    by_tri = np.argsort(all_tris, kind="stable")
+    tri_keys, starts = np.unique(all_tris[by_tri], return_index=True)
+
+    return {
+        "keys": keys,
+        "key_ids": key_ids,
+        "names": np.array([n.encode() for n in display]),
+        "levels": levels,
+        "parents": parents,
+        "tri_keys": tri_keys,
+        "tri_offsets": np.append(starts, len(all_tris)).astype(np.int64),
+        "tri_postings": rows[by_tri],
+        "tri_counts": tri_counts
+    }
+
+
+def read_listing_names(path, column="name"):
+    if path.endswith(".parquet") or os.path.isdir(path):
+        return pd.read_parquet(path, columns=[column])[column]
+    return pd.read_csv(path, usecols=[column])[column]
+
+
+# --- Lookup ---
+class Catalogue:
+    def __init__(self, arrays, meta=None):
+        self.arrays = arrays
+        self.meta = meta or {}
+        for name in ARRAY_NAMES:
+            setattr(self, name, arrays[name])
+
+    @classmethod
+    def from_names(cls, names):
+        return cls(build_catalogue(names))
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAY_NAMES:
+            np.save(os.path.join(directory, f"{name}.npy"), self.arrays[name])
+        meta = dict(self.meta, entries=len(self.names), keys=len(self.keys), trigrams=len(self.tri_keys))
+        with open(os.path.join(directory, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        return directory
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r"):
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode) for name in ARRAY_NAMES}
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        return cls(arrays, meta)
+
+    def entry(self, entry_id, score=1.0, match="exact"):
+        entry_id = int(entry_id)
+        level = int(self.levels[entry_id])
+        lineage = [entry_id]
+        while self.parents[lineage[0]] >= 0:
+            lineage.insert(0, int(self.parents[lineage[0]]))
+        result = {"id": entry_id, "name": self.names[entry_id].decode(), "level": LEVELS[level],
+                  "match": match, "score": round(float(score), 3)}
+        for parent_level, parent_id in enumerate(lineage[:-1]):
+            result[f"{LEVELS[parent_level]}_id"] = parent_id
+        return result
+
+    def exact(self, query):
+        key = normalize(query).encode()
+        lo, hi = np.searchsorted(self.keys, key, "left"), np.searchsorted(self.keys, key, "right")
+        return list(dict.fromkeys(self.key_ids[lo:hi].tolist()))
+
+    def prefix(self, query, limit=10):
+        """IDs whose key starts with the query; brands before models before variants, then shortest name."""
+        key = normalize(query).encode()
+        if not key:
+            return []
+        lo, hi = np.searchsorted(self.keys, key, "left"), np.searchsorted(self.keys, key + b"\xff", "left")
+        ids = np.unique(self.key_ids[lo:hi])
+        order = np.lexsort((np.char.str_len(self.names[ids]), self.levels[ids]))
+        return ids[order][:limit].tolist()
+
+    def fuzzy(self, query, limit=10, min_score=MIN_FUZZY_SCORE):
+        """(id, Jaccard score) pairs over trigrams, best first; ties go to the more specific level, then the shorter name."""
+        query_tris = trigrams(normalize(query))
+        pos = np.searchsorted(self.tri_keys, query_tris)
+        pos = pos[(pos < len(self.tri_keys)) & (self.tri_keys[np.minimum(pos, len(self.tri_keys) - 1)] == query_tris)]
+        if not len(pos):
+            return []
+        hits = np.concatenate([self.tri_postings[self.tri_offsets[p]:self.tri_offsets[p + 1]] for p in pos])
+        rows, shared = np.unique(hits, return_counts=True)
+        scores = shared / (len(query_tris) + self.tri_counts[rows] - shared)
+
+        keep = scores >= min_score
+        rows, scores = rows[keep], scores[keep]
+        ids = self.key_ids[rows]
+        order = np.lexsort((np.char.str_len(self.names[ids]), -self.levels[ids], -scores))
+        best = {}
+        for row, score in zip(ids[order].tolist(), scores[order].tolist()):
+            best.setdefault(row, score)  # an entry can match through two keys; keep the better one
+            if len(best) == limit:
+                break
+        return list(best.items())
+
+    def resolve(self, query, limit=5):
+        """Best matches for a user-typed name: exact, else prefix, else fuzzy."""
+        ids = self.exact(query)
+        if ids:
+            return [self.entry(i) for i in ids[:limit]]
+        ids = self.prefix(query, limit)
+        if ids:
+            return [self.entry(i, match="prefix") for i in ids]
+        return [self.entry(i, score, "fuzzy") for i, score in self.fuzzy(query, limit)]
+
+    def brands(self):
+        return [n.decode() for n in self.names[self.levels == 0]]
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else "Car details.csv"
+    out_dir = sys.argv[2] if len(sys.argv) > 2 else "catalogue_index"
+
+    start = time.perf_counter()
+    catalogue = Catalogue(build_catalogue(read_listing_names(source)), {"source": os.path.basename(source)})
+    catalogue.save(out_dir)
+    size = sum(os.path.getsize(os.path.join(out_dir, f"{name}.npy")) for name in ARRAY_NAMES)
+    print(f"✅ {len(catalogue.names):,} entries, {len(catalogue.keys):,} keys, {len(catalogue.tri_keys):,} trigrams "
+          f"-> {out_dir}/ ({size / 1024:.0f} KiB) in {time.perf_counter() - start:.2f}s")
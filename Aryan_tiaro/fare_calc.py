@@ -0,0 +1,33 @@
+"""Pool-fare math for quote_api.py. The M1 depreciation rule itself lives in Sabhyata_tiaro/fare_rules.py."""
+import os
+import sys
+
+FARE_RULES_DIR = os.getenv("FARE_RULES_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
+                                                          "Sabhyata_tiaro"))
+sys.path.insert(0, FARE_RULES_DIR)
+from fare_rules import depreciation_multiplier as _depreciation_multiplier  # noqa: E402
+
+# Adjusted mileage never drops below these (km/l)
+MILEAGE_CAPS = {"SUV": 16, "Sedan": 20, "Hatchback": 23}
+
+
+def depreciation_multiplier(predicted_price, original_price, ratio=1.0):
+    """M1 as a plain float (fare_rules works on arrays)."""
+    return float(_depreciation_multiplier(predicted_price, original_price, ratio))
+
+
+def adjusted_mileage(mileage, m1, car_type):
+    """Claimed mileage divided by M1, then capped from below for the car type (None if M1 is 0)."""
+    if m1 == 0:
+        return None
+    adjusted = mileage / m1
+    return max(MILEAGE_CAPS.get(car_type, 0), adjusted)
+
+
+def calculate_fare(distance, mileage, fuel_price, original_price, predicted_price, m2, passengers):
+    if mileage == 0 or original_price == 0 or passengers == 0:
+        return None, None
+    m1 = depreciation_multiplier(predicted_price, original_price)
+    total_fare = (distance / mileage) * fuel_price * m1 * m2
+    per_head_fare = total_fare / passengers
+    return round(total_fare, 2), round(per_head_fare, 2)
@@ -1,52 +1,125 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+import asyncio
 import json
+import re
 from pydantic import BaseModel
-import requests
-from bs4 import BeautifulSoup
+import httpx
+import sys
 from dotenv import load_dotenv
 import os
 from langchain.prompts import ChatPromptTemplate
 from langchain.chains import LLMChain
 from langchain_groq import ChatGroq
+from car_cache import cache_from_env, normalize_car_key
+from singleflight import SingleFlight
+from page_extract import MAX_CONTEXT_CHARS, SPEC_FIELDS, extract_page
+from microbatch import MicroBatcher
+from catalogue import Catalogue
+SHARED_DIR = os.getenv("SHARED_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+sys.path.insert(0, SHARED_DIR)  # instrument.py lives in ../shared, used by both services
+from instrument import MetricsMiddleware, metrics_endpoint, record_error, register_stats, stage  # noqa: E402
 
 # Load environment variables
 load_dotenv()
 os.environ["GROQ_API_KEY"] = os.getenv("GROQ_API_KEY")
 SERPER_API_KEY = os.getenv("SERPER_API_KEY")
 
-app = FastAPI(title="Car Info RAG API")
+SERPER_URL = os.getenv("SERPER_URL", "https://google.serper.dev/search")
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL")  # None = Groq's default endpoint
+
+# --- Pooled HTTP clients, one per upstream service (so limits are per host) ---
+# name -> (timeout seconds, max connections)
+CLIENT_CONFIG = {
+    "serper": (float(os.getenv("SERPER_TIMEOUT", 5)), int(os.getenv("SERPER_MAX_CONNECTIONS", 20))),
+    "page": (float(os.getenv("PAGE_TIMEOUT", 10)), int(os.getenv("PAGE_MAX_CONNECTIONS", 20))),
+    "llm": (float(os.getenv("LLM_TIMEOUT", 30)), int(os.getenv("LLM_MAX_CONNECTIONS", 20))),
+}
+_clients = {}
+
+
+def get_client(name):
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        timeout, max_connections = CLIENT_CONFIG[name]
+        client = _clients[name] = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            follow_redirects=True
+        )
+    return client
+
+
+# Optional per-service limiters (e.g. set by prefetch.py); the interactive path leaves this empty
+rate_limiters = {}
+
+
+async def throttle(name):
+    limiter = rate_limiters.get(name)
+    if limiter is not None:
+        await limiter.acquire()
+
+
+async def close_clients():
+    for client in _clients.values():
+        await client.aclose()
+    _clients.clear()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    await close_clients()
+
+
+app = FastAPI(title="Car Info RAG API", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+
+# Results keyed on the normalized (car_name, model, year, fuel_type, variant) tuple
+car_info_cache = cache_from_env()
+# Concurrent misses for the same key wait on one Serper -> scrape -> LLM chain
+car_info_flights = SingleFlight()
+# Offline brand / model / variant resolution (build with `python catalogue.py`), memory-mapped
+CATALOGUE_DIR = os.getenv("CATALOGUE_DIR", "catalogue_index")
+catalogue = Catalogue.load(CATALOGUE_DIR) if os.path.isdir(CATALOGUE_DIR) else None
+
+# Cache hit ratio / sizes and single-flight counters, read at scrape time
+register_stats("car_info_cache", car_info_cache.stats)
+register_stats("single_flight", car_info_flights.stats)
 
 # --- Serper search function ---
-def get_top_result_url(query):
+async def get_top_result_url(query):
     headers = {"X-API-KEY": SERPER_API_KEY}
     payload = {"q": query + " site:cardekho.com"}
     try:
-        response = requests.post("https://google.serper.dev/search", headers=headers, json=payload)
-        results = response.json()
+        await throttle("serper")
+        with stage("serper"):
+            response = await get_client("serper").post(SERPER_URL, headers=headers, json=payload)
+            response.raise_for_status()
+            results = response.json()
         if "organic" in results and results["organic"]:
             return results["organic"][0]["link"]
     except Exception as e:
         return f"Error in Serper: {e}"
+    record_error("serper")  # no organic result
     return None
 
 # --- Web scraping function ---
-def fetch_page_content(url):
+async def fetch_page_content(url):
     headers = {"User-Agent": "Mozilla/5.0"}
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.content, "html.parser")
-        return soup.get_text(separator=' ')
+        await throttle("page")
+        with stage("page_fetch"):
+            response = await get_client("page").get(url, headers=headers)
+            response.raise_for_status()  # an error page must not reach the LLM as car specs
+        # Parsing is CPU-bound, keep it off the event loop
+        with stage("html_parse"):
+            return await asyncio.to_thread(extract_page, response.content)
     except Exception as e:
         return f"Error fetching page: {e}"
 
 # --- Langchain LLM extraction ---
-
-def extract_car_info_with_groq(text_content):
-    llm = ChatGroq(model_name="Gemma2-9b-It", temperature=0)
-
-
-    # Prompt template for extracting car information
-    prompt = ChatPromptTemplate.from_template("""
+CAR_INFO_PROMPT = ChatPromptTemplate.from_template("""
 You are part of a backend system and must respond ONLY with valid JSON and all the values must be strictly a number.
 From the car page content, extract:
 - original_price(on-road price) (₹)
@@ -68,8 +141,66 @@ Page Content:
 {text}
 """)
 
-    chain = LLMChain(llm=llm, prompt=prompt)
-    result = chain.invoke({"text": text_content[:5000]})
+BATCH_CAR_INFO_PROMPT = ChatPromptTemplate.from_template("""
+You are part of a backend system and must respond ONLY with valid JSON and all the values must be strictly a number.
+Below are pages for several cars. Each page starts with a line "### <id>".
+For every id, extract from that page only:
+- original_price(on-road price) (₹)
+- company_claimed_mileage (km/l)
+- engine (CC)
+- max_power (bhp or kW)
+
+Output *only* valid JSON with one entry per id:
+{{
+  "<id>": {{"original_price": "...", "company_claimed_mileage": "...", "engine": "...", "max_power": "..."}}
+}}
+
+Do not explain anything. No other text.
+
+Pages:
+{pages}
+""")
+
+PROMPTS = {"single": CAR_INFO_PROMPT, "batch": BATCH_CAR_INFO_PROMPT}
+
+# Built once and reused; rebuilt only if the pooled LLM client was closed
+_llm = None
+_chains = {}
+
+
+def get_llm():
+    global _llm
+    client = get_client("llm")
+    if _llm is None or getattr(_llm, "http_async_client", client) is not client:
+        _llm = ChatGroq(
+            model_name="Gemma2-9b-It",
+            temperature=0,
+            groq_api_base=GROQ_BASE_URL,
+            request_timeout=CLIENT_CONFIG["llm"][0],
+            http_async_client=client
+        )
+        _chains.clear()
+    return _llm
+
+
+def set_llm(llm):
+    """Use another LangChain chat model instead of Groq (e.g. a local fake)."""
+    global _llm
+    _llm = llm
+    _chains.clear()
+
+
+def get_chain(name):
+    llm = get_llm()
+    if name not in _chains:
+        _chains[name] = LLMChain(llm=llm, prompt=PROMPTS[name])
+    return _chains[name]
+
+
+async def extract_car_info_with_groq(text_content):
+    await throttle("llm")
+    with stage("llm"):
+        result = await get_chain("single").ainvoke({"text": text_content[:5000]})
 
     response_text = result.get("text", "").strip()
 
@@ -78,24 +209,97 @@ Page Content:
         return json.loads(response_text)
     except json.JSONDecodeError:
         print("❌ JSONDecodeError: ", repr(response_text))  # Log exact error
+        record_error("llm_json")
         return {
             "error": "Invalid JSON from LLM",
             "raw_response": response_text
         }
 
 
+def is_valid_car_info(entry):
+    return isinstance(entry, dict) and all(
+        field in entry and re.search(r"\d", str(entry[field])) for field in SPEC_FIELDS
+    )
+
+
+async def extract_car_info_batch(texts):
+    """Several pages in one LLM call; entries missing or invalid in the reply are retried one by one."""
+    if len(texts) == 1:
+        return [await extract_car_info_with_groq(texts[0])]
+
+    pages = "\n\n".join(f"### car_{i}\n{text[:MAX_CONTEXT_CHARS]}" for i, text in enumerate(texts))
+    await throttle("llm")
+    with stage("llm_batch"):
+        result = await get_chain("batch").ainvoke({"pages": pages})
+
+    response_text = result.get("text", "").strip()
+    try:
+        parsed = json.loads(response_text)
+    except json.JSONDecodeError:
+        print("❌ JSONDecodeError in batch: ", repr(response_text))
+        record_error("llm_json")
+        parsed = {}
+    if not isinstance(parsed, dict):
+        parsed = {}
+
+    results = [parsed.get(f"car_{i}") for i in range(len(texts))]
+    retry = [i for i, entry in enumerate(results) if not is_valid_car_info(entry)]
+    if retry:
+        print(f"⚠️ {len(retry)}/{len(texts)} batched entries invalid, retrying individually")
+        retried = await asyncio.gather(*(extract_car_info_with_groq(texts[i]) for i in retry))
+        for i, entry in zip(retry, retried):
+            results[i] = entry
+    return results
+
+
+# LLM_BATCH_SIZE > 1 packs concurrent extractions into one call (prefetch.py turns this on too)
+LLM_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", 1))
+llm_batcher = MicroBatcher(
+    extract_car_info_batch, max_batch=LLM_BATCH_SIZE, max_wait=float(os.getenv("LLM_BATCH_WAIT", 0.05))
+) if LLM_BATCH_SIZE > 1 else None
+
+
+async def llm_extract(text_content):
+    if llm_batcher is not None:
+        return await llm_batcher.submit(text_content)
+    return await extract_car_info_with_groq(text_content)
+
+
 # --- Core Logic ---
-def get_car_info_online(car_name, model, year, fuel_type, variant):
+async def get_car_info_online(car_name, model, year, fuel_type, variant):
+    cache_key = normalize_car_key(car_name, model, year, fuel_type, variant)
+    # Memory hits stay on the loop; SQLite reads and writes go to a thread
+    cached = car_info_cache.get_memory(cache_key)
+    if cached is None:
+        cached = await asyncio.to_thread(car_info_cache.get, cache_key)
+    if cached is not None:
+        return cached
+
+    return await car_info_flights.do(
+        cache_key,
+        lambda: fetch_car_info(cache_key, car_name, model, year, fuel_type, variant)
+    )
+
+
+async def fetch_car_info(cache_key, car_name, model, year, fuel_type, variant):
     query = f"{car_name} {model} {year} {fuel_type} {variant}"
-    url = get_top_result_url(query)
+    url = await get_top_result_url(query)
     if not url or "Error" in url:
         return {"error": "No search result found or Serper failed."}
 
-    page_text = fetch_page_content(url)
-    if "Error fetching page" in page_text:
-        return {"error": page_text}
+    page = await fetch_page_content(url)
+    if isinstance(page, str):
+        return {"error": page}
 
-    result = extract_car_info_with_groq(page_text)
+    # All four fields found on the page itself: skip the LLM call
+    if page["complete"]:
+        result = page["specs"]
+    else:
+        result = await llm_extract(page["context"])
+
+    # Only successful extractions are cached; errors are retried next time
+    if isinstance(result, dict) and "error" not in result:
+        await asyncio.to_thread(car_info_cache.set, cache_key, result)
     return result
 
 # --- API Schema ---
@@ -108,8 +312,8 @@ class CarQuery(BaseModel):
 
 # --- Endpoint ---
 @app.post("/get-car-info")
-def get_car_info(query: CarQuery):
-    result = get_car_info_online(
+async def get_car_info(query: CarQuery):
+    result = await get_car_info_online(
         query.car_name,
         query.model,
         query.year,
@@ -126,3 +330,24 @@ def get_car_info(query: CarQuery):
         return {"result": result}
         
     
+
+@app.get("/catalogue/resolve")
+def resolve_car_name(q: str, limit: int = 5):
+    if catalogue is None:
+        return {"error": f"No catalogue index at {CATALOGUE_DIR}; build it with `python catalogue.py`"}
+    return {"query": q, "matches": catalogue.resolve(q, min(max(limit, 1), 50))}
+
+
+@app.get("/metrics")
+def metrics():
+    return metrics_endpoint()
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    return car_info_cache.stats()
+
+
+@app.get("/single-flight/stats")
+def single_flight_stats():
+    return car_info_flights.stats()
@@ -0,0 +1,110 @@
+"""Chunked CSV -> Parquet ingestion for training data of any size.
+
+Reads the CSV in fixed-size blocks with explicit dtypes, applies the same cleaning and
+feature derivation as the training notebook to each block (spec parsing, brand, car_age)
+and writes one Parquet file per block. Peak memory is one block, however big the input is.
+Training reads the directory back memory-mapped with read_parquet_dir().
+
+Median / mode filling needs the whole column, so it stays in the training loader.
+
+Usage:
+    python ingest.py "Car details.csv" listings_parquet/ --chunk-rows 250000
+    python ingest.py ../hemank_tiaro/cardata.csv cardata_parquet/ --schema cardata
+"""
+import argparse
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from spec_parse import parse_listing_specs
+
+REFERENCE_YEAR = 2020  # car_age = REFERENCE_YEAR - year, as in the notebook
+
+
+# --- Per-block cleaning ---
+def clean_listings(df):
+    """Car details.csv rows -> parsed specs, car_brand_name and car_age (no filling)."""
+    df = parse_listing_specs(df)
+    df["car_brand_name"] = df["name"].str.extract(r"([^\s]+)", expand=False).astype("category")
+    df["car_age"] = REFERENCE_YEAR - df["year"]
+    return df
+
+
+# --- Schemas: explicit dtypes per source CSV ---
+SCHEMAS = {
+    "listings": {
+        "dtype": {
+            "name": str,
+            "year": "int16",
+            "selling_price": "int64",
+            "km_driven": "int64",
+            "fuel": "category",
+            "seller_type": "category",
+            "transmission": "category",
+            "owner": "category",
+            "mileage": str,
+            "engine": str,
+            "max_power": str,
+            "torque": str,
+            "seats": "float32"
+        },
+        "clean": clean_listings
+    },
+    # hemank_tiaro/cardata.csv (prices in lakhs)
+    "cardata": {
+        "dtype": {
+            "Car_Name": "category",
+            "Year": "int16",
+            "Selling_Price": "float64",
+            "Present_Price": "float64",
+            "Kms_Driven": "int64",
+            "Fuel_Type": "category",
+            "Seller_Type": "category",
+            "Transmission": "category",
+            "Owner": "int8"
+        },
+        "clean": None
+    }
+}
+
+
+def ingest(csv_path, output_dir, schema="listings", chunk_rows=250_000):
+    spec = SCHEMAS[schema]
+    os.makedirs(output_dir, exist_ok=True)
+    for name in os.listdir(output_dir):
+        if name.startswith("part-") and name.endswith(".parquet"):
+            os.remove(os.path.join(output_dir, name))  # stale parts from a previous run
+
+    rows, start = 0, time.perf_counter()
+    reader = pd.read_csv(csv_path, dtype=spec["dtype"], usecols=list(spec["dtype"]), chunksize=chunk_rows)
+    for part, chunk in enumerate(reader):
+        if spec["clean"] is not None:
+            chunk = spec["clean"](chunk)
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        # Write under a temp name so a reader never sees half a part
+        path = os.path.join(output_dir, f"part-{part:05d}.parquet")
+        pq.write_table(table, path + ".tmp")
+        os.replace(path + ".tmp", path)
+        rows += len(chunk)
+        print(f"⏳ part {part}: {rows:,} rows ({rows / (time.perf_counter() - start):,.0f} rows/s)")
+    return rows
+
+
+def read_parquet_dir(path, columns=None):
+    """All parts as one DataFrame; files are memory-mapped, categoricals come back as category."""
+    return pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a training CSV into cleaned Parquet parts")
+    parser.add_argument("csv")
+    parser.add_argument("output_dir")
+    parser.add_argument("--schema", choices=sorted(SCHEMAS), default="listings")
+    parser.add_argument("--chunk-rows", type=int, default=250_000)
+    args = parser.parse_args()
+
+    rows = ingest(args.csv, args.output_dir, args.schema, args.chunk_rows)
+    print(f"✅ Wrote {rows:,} rows to {args.output_dir}")
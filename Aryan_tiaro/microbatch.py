@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+
+# --- Collect concurrent calls into one batched call ---
+class MicroBatcher:
+    """`await batcher.submit(item)` queues an item; `batch_fn(items) -> results` runs once
+    `max_batch` items are queued or `max_wait` seconds after the first one arrived."""
+
+    def __init__(self, batch_fn, max_batch=8, max_wait=0.05, on_batch=None):
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.on_batch = on_batch  # optional callback(batch_size, seconds)
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        start = time.perf_counter()
+        try:
+            results = await self.batch_fn([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            if self.on_batch is not None:
+                self.on_batch(len(batch), time.perf_counter() - start)
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,216 @@
+import codecs
+import json
+import re
+from html.parser import HTMLParser
+
+from spec_parse import POWER_UNITS, PRICE_UNITS
+
+try:
+    from lxml import etree
+except ImportError:  # lxml is optional, the stdlib parser is the fallback
+    etree = None
+
+SKIP_TAGS = {"script", "style", "noscript", "nav", "header", "footer", "svg", "iframe", "form", "button"}
+BLOCK_TAGS = {"p", "div", "section", "article", "li", "tr", "table", "ul", "ol", "br",
+              "h1", "h2", "h3", "h4", "h5", "h6", "dt", "dd"}
+CELL_TAGS = {"td", "th"}
+
+SPEC_KEYWORDS = re.compile(
+    r"price|on-road|ex-showroom|mileage|kmpl|km/l|engine|displacement|\bcc\b|power|bhp|\bps\b|\bkw\b",
+    re.IGNORECASE
+)
+MAX_CONTEXT_CHARS = 2500
+
+
+# --- Streaming text collection (same callbacks for lxml and html.parser) ---
+class _TextCollector:
+    def __init__(self):
+        self.lines = []
+        self.json_ld = []
+        self._line = []
+        self._skip_depth = 0
+        self._in_json_ld = False
+        self._json_ld_buf = []
+
+    def start(self, tag, attrs):
+        tag = tag.lower()
+        if tag == "script" and dict(attrs).get("type") == "application/ld+json":
+            self._in_json_ld = True
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._flush()
+
+    def end(self, tag):
+        tag = tag.lower()
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            if self._in_json_ld:
+                self.json_ld.append("".join(self._json_ld_buf))
+                self._json_ld_buf = []
+                self._in_json_ld = False
+        elif tag in BLOCK_TAGS:
+            self._flush()
+        elif tag in CELL_TAGS:
+            self._line.append(" |")
+
+    def data(self, text):
+        if self._in_json_ld:
+            self._json_ld_buf.append(text)
+        elif not self._skip_depth:
+            self._line.append(text)
+
+    def close(self):
+        self._flush()
+        return self
+
+    def _flush(self):
+        line = " ".join("".join(self._line).split()).strip(" |")
+        if line:
+            self.lines.append(line)
+        self._line = []
+
+
+class _StdlibParser(HTMLParser):
+    def __init__(self, collector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+
+    def handle_starttag(self, tag, attrs):
+        self.collector.start(tag, attrs)
+
+    def handle_endtag(self, tag):
+        self.collector.end(tag)
+
+    def handle_data(self, data):
+        self.collector.data(data)
+
+
+def html_lines(content, chunk_size=64 * 1024):
+    """Visible text lines + JSON-LD blocks of a page, skipping script/style/nav/header/footer."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    collector = _TextCollector()
+
+    if etree is not None:
+        parser = etree.HTMLParser(target=collector, encoding="utf-8")
+        feed, finish = parser.feed, parser.close
+    else:
+        parser = _StdlibParser(collector)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        feed = lambda chunk: parser.feed(decoder.decode(chunk))
+        finish = lambda: (parser.close(), collector.close())
+
+    for i in range(0, len(content), chunk_size):
+        feed(content[i:i + chunk_size])
+    finish()
+    return collector.lines, collector.json_ld
+
+
+# --- Targeted spec sections for the LLM prompt ---
+def spec_context(lines, window=1, max_chars=MAX_CONTEXT_CHARS):
+    keep = set()
+    for i, line in enumerate(lines):
+        if SPEC_KEYWORDS.search(line):
+            keep.update(range(max(0, i - window), min(len(lines), i + window + 1)))
+    if not keep:
+        return "\n".join(lines)[:max_chars]
+
+    context, size = [], 0
+    for i in sorted(keep):
+        if size + len(lines[i]) > max_chars:
+            break
+        context.append(lines[i])
+        size += len(lines[i]) + 1
+    return "\n".join(context)
+
+
+# --- Deterministic extraction (lets us skip the LLM call entirely) ---
+PRICE_PATTERN = re.compile(
+    r"(?:₹|\b(?:rs\.?|inr))\s*(\d[\d,]*(?:\.\d+)?)\s*(lakh|lac|crore|cr)?", re.IGNORECASE
+)
+MILEAGE_PATTERN = re.compile(r"(\d{1,2}(?:\.\d+)?)\s*(?:kmpl|km/l|km/litre)", re.IGNORECASE)
+ENGINE_PATTERN = re.compile(r"(\d{3,4}(?:\.\d+)?)\s*cc\b", re.IGNORECASE)
+POWER_PATTERN = re.compile(r"(\d{2,3}(?:\.\d+)?)\s*(bhp|ps|hp|kw)\b", re.IGNORECASE)
+
+
+def _price_from_json_ld(blocks):
+    for block in blocks:
+        try:
+            data = json.loads(block)
+        except json.JSONDecodeError:
+            continue
+        for item in data if isinstance(data, list) else [data]:
+            offers = item.get("offers") if isinstance(item, dict) else None
+            if isinstance(offers, dict):
+                price = offers.get("price") or offers.get("lowPrice")
+                if price:
+                    try:
+                        return float(str(price).replace(",", ""))
+                    except ValueError:
+                        pass
+    return None
+
+
+def _first_price(lines):
+    # Prefer lines that talk about price; an on-road price beats an ex-showroom one
+    priced = [l for l in lines if re.search(r"price|on-road|ex-showroom", l, re.IGNORECASE)]
+    priced.sort(key=lambda l: "on-road" not in l.lower())
+    for line in priced:
+        for match in PRICE_PATTERN.finditer(line):
+            try:
+                value = float(match.group(1).replace(",", ""))
+            except ValueError:  # never fail the page over one odd number; the LLM fills the price in
+                continue
+            return value * PRICE_UNITS.get((match.group(2) or "").lower(), 1.0)
+    return None
+
+
+def _first_match(pattern, lines, keyword):
+    for line in lines:
+        if keyword.search(line):
+            match = pattern.search(line)
+            if match:
+                return match
+    for line in lines:
+        match = pattern.search(line)
+        if match:
+            return match
+    return None
+
+
+def extract_specs(lines, json_ld=()):
+    """Return whichever of original_price / company_claimed_mileage / engine / max_power can be read directly."""
+    specs = {}
+
+    price = _price_from_json_ld(json_ld) or _first_price(lines)
+    if price:
+        specs["original_price"] = round(price, 2)
+
+    match = _first_match(MILEAGE_PATTERN, lines, re.compile(r"mileage", re.IGNORECASE))
+    if match:
+        specs["company_claimed_mileage"] = float(match.group(1))
+
+    match = _first_match(ENGINE_PATTERN, lines, re.compile(r"engine|displacement", re.IGNORECASE))
+    if match:
+        specs["engine"] = float(match.group(1))
+
+    match = _first_match(POWER_PATTERN, lines, re.compile(r"power", re.IGNORECASE))
+    if match:
+        specs["max_power"] = round(float(match.group(1)) * POWER_UNITS[match.group(2).lower()], 2)
+
+    return specs
+
+
+SPEC_FIELDS = ("original_price", "company_claimed_mileage", "engine", "max_power")
+
+
+def extract_page(content):
+    """Parse a car page once: structured specs (if complete the LLM can be skipped) plus trimmed LLM context."""
+    lines, json_ld = html_lines(content)
+    specs = extract_specs(lines, json_ld)
+    return {
+        "specs": specs,
+        "complete": all(field in specs for field in SPEC_FIELDS),
+        "context": spec_context(lines)
+    }
@@ -0,0 +1,156 @@
+"""Warm the car-info cache for every vehicle listed in a CSV.
+
+Usage:
+    python prefetch.py "Car details.csv" --concurrency 8 --serper-rps 5 --page-rps 5 --llm-rps 1
+"""
+import argparse
+import asyncio
+import json
+import os
+import pickle
+import time
+
+import pandas as pd
+
+import fetcher_api
+from car_cache import normalize_car_key
+from microbatch import MicroBatcher
+
+
+# --- Simple async rate limiter: at most `rate` acquisitions per second ---
+class RateLimiter:
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            wait = self._next_slot - now
+            if wait > 0:
+                await asyncio.sleep(wait)
+                now = self._next_slot
+            self._next_slot = now + self.interval
+
+
+# --- Key enumeration ---
+def load_car_keys(csv_path, brands=None, name_col="name", year_col="year", fuel_col="fuel"):
+    """Unique (brand, model, year, fuel, variant) tuples from a listings CSV.
+
+    Listing names look like "Maruti Swift Dzire VDI": first word is the brand,
+    second the model, the rest the variant.
+    """
+    df = pd.read_csv(csv_path, usecols=[name_col, year_col, fuel_col]).dropna()
+    parts = df[name_col].str.split(n=2, expand=True).reindex(columns=[0, 1, 2]).fillna("")
+    cars = pd.DataFrame({
+        "car_name": parts[0],
+        "model": parts[1],
+        "year": df[year_col].astype(str),
+        "fuel_type": df[fuel_col].str.lower(),
+        "variant": parts[2]
+    })
+    if brands is not None:
+        cars = cars[cars["car_name"].isin(brands)]
+
+    keys = {}
+    for car in cars.itertuples(index=False):
+        keys.setdefault(normalize_car_key(*car), tuple(car))
+    return keys
+
+
+# --- Checkpoint: one JSON line per finished key ---
+def load_checkpoint(path):
+    """Keys already resolved. A line cut short by a kill mid-write is skipped; that key is fetched again."""
+    done = set()
+    if os.path.exists(path):
+        with open(path) as f:
+            for number, line in enumerate(f, 1):
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"⚠️ Skipping unreadable checkpoint line {number} in {path}: {line.strip()[:80]!r}")
+                    continue
+                if entry["status"] == "ok":
+                    done.add(entry["key"])
+    return done
+
+
+def end_partial_line(path):
+    """Terminate a half-written last line so the next appended entry starts on its own line."""
+    if os.path.exists(path) and os.path.getsize(path):
+        with open(path, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+
+
+async def prefetch(keys, checkpoint_path, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    counts = {"ok": 0, "error": 0}
+    start = time.perf_counter()
+
+    end_partial_line(checkpoint_path)
+    with open(checkpoint_path, "a") as checkpoint:
+        async def resolve(key, car):
+            async with semaphore:
+                try:
+                    result = await fetcher_api.get_car_info_online(*car)
+                    status = "error" if isinstance(result, dict) and "error" in result else "ok"
+                except Exception as e:
+                    result, status = {"error": str(e)}, "error"
+
+            counts[status] += 1
+            entry = {"key": key, "status": status}
+            if status == "error":
+                entry["error"] = str(result.get("error"))
+            checkpoint.write(json.dumps(entry) + "\n")
+            checkpoint.flush()
+
+            done = counts["ok"] + counts["error"]
+            if done % 50 == 0 or done == len(keys):
+                rate = done / (time.perf_counter() - start)
+                print(f"⏳ {done}/{len(keys)} resolved ({counts['error']} errors, {rate:.1f} cars/s)")
+
+        await asyncio.gather(*(resolve(key, car) for key, car in keys.items()))
+
+    await fetcher_api.close_clients()
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolve car info for every vehicle in a CSV into the cache")
+    parser.add_argument("csv", nargs="?", default="Car details.csv")
+    parser.add_argument("--brands", default="car_brand_names.pkl", help="Pickled brand list to filter on ('' for all)")
+    parser.add_argument("--checkpoint", default="prefetch_checkpoint.jsonl")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--serper-rps", type=float, default=5.0)
+    parser.add_argument("--page-rps", type=float, default=5.0)
+    parser.add_argument("--llm-rps", type=float, default=1.0)
+    parser.add_argument("--llm-batch", type=int, default=8, help="Pages packed into one LLM call")
+    parser.add_argument("--limit", type=int, default=None, help="Only resolve the first N pending keys")
+    args = parser.parse_args()
+
+    brands = None
+    if args.brands:
+        with open(args.brands, "rb") as f:
+            brands = set(pickle.load(f))
+
+    keys = load_car_keys(args.csv, brands)
+    done = load_checkpoint(args.checkpoint)
+    pending = {k: car for k, car in keys.items() if k not in done}
+    print(f"🚗 {len(keys)} unique cars, {len(keys) - len(pending)} already done, {len(pending)} pending")
+    if args.limit is not None:
+        pending = dict(list(pending.items())[:args.limit])
+
+    fetcher_api.rate_limiters.update({
+        "serper": RateLimiter(args.serper_rps),
+        "page": RateLimiter(args.page_rps),
+        "llm": RateLimiter(args.llm_rps)
+    })
+    if args.llm_batch > 1:
+        fetcher_api.llm_batcher = MicroBatcher(
+            fetcher_api.extract_car_info_batch, max_batch=args.llm_batch, max_wait=0.5
+        )
+    counts = asyncio.run(prefetch(pending, args.checkpoint, args.concurrency))
+    print(f"✅ Done: {counts['ok']} cached, {counts['error']} errors (re-run to retry errors)")
@@ -0,0 +1,128 @@
+import asyncio
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI
+from prometheus_client import Histogram
+from pydantic import BaseModel
+
+SHARED_DIR = os.getenv("SHARED_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+sys.path.insert(0, SHARED_DIR)  # instrument.py lives in ../shared, used by both services
+from instrument import MetricsMiddleware, metrics_endpoint, stage  # noqa: E402
+from microbatch import MicroBatcher
+
+MODEL_PATH = os.getenv("PRICE_MODEL_PATH", "stacking_model.pkl")
+# Directory written by `python tree_compile.py stacking_model.pkl <dir>`; serves small batches when set
+COMPILED_MODEL_PATH = os.getenv("PRICE_COMPILED_MODEL")
+# Largest batch the compiled stack takes; bigger ones go to the pipeline (crossover from bench_compiled.py)
+COMPILED_MAX_BATCH = int(os.getenv("PRICE_COMPILED_MAX_BATCH", 256))
+MAX_BATCH = int(os.getenv("PRICE_MAX_BATCH", 32))
+MAX_WAIT_MS = float(os.getenv("PRICE_MAX_WAIT_MS", 5))
+
+# Column order the stacking pipeline was trained on (see the notebook)
+INPUT_COLUMNS = ["km_driven", "fuel", "transmission", "mileage", "engine", "max_power", "car_brand_name", "car_age"]
+
+
+# --- Micro-batch histograms, scraped on /metrics with the rest ---
+BATCH_SIZE = Histogram("price_batch_size", "Rows per micro-batched predict call", buckets=[1, 2, 4, 8, 16, 32, 64, 128])
+BATCH_LATENCY = Histogram("price_batch_duration_seconds", "Time per micro-batched predict call",
+                          buckets=[0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1])
+
+
+def summary(histogram, scale=1.0):
+    """count / mean / cumulative buckets of a Histogram, for /stats (`scale` converts units)."""
+    family = histogram.collect()[0]
+    samples = {(s.name, s.labels.get("le")): s.value for s in family.samples}
+    name = family.name
+    count = samples[(f"{name}_count", None)]
+    buckets = {f"<={float(le) * scale:g}" if le != "+Inf" else "+Inf": int(value)
+               for (sample, le), value in samples.items() if sample == f"{name}_bucket"}
+    return {
+        "count": int(count),
+        "mean": round(samples[(f"{name}_sum", None)] * scale / count, 3) if count else 0.0,
+        "buckets": buckets
+    }
+
+# --- Load the models once per process ---
+# The compiled stack is ~30x faster for one row but its NumPy traversal loses to the pipeline's
+# native tree loops past a few hundred rows, so with both loaded each batch takes the faster one
+compiled_model = None
+if COMPILED_MODEL_PATH:
+    from tree_compile import CompiledStack
+    compiled_model = CompiledStack.load(COMPILED_MODEL_PATH)
+price_model = None
+if compiled_model is None or os.path.exists(MODEL_PATH):
+    with open(MODEL_PATH, "rb") as f:
+        price_model = pickle.load(f)
+
+
+def predict_rows(rows):
+    """One predict over the whole batch; returns prices in rupees (model is trained on log1p)."""
+    with stage("model_predict"):
+        if compiled_model is not None and (price_model is None or len(rows) <= COMPILED_MAX_BATCH):
+            predicted_log = compiled_model.predict(rows)
+        else:
+            predicted_log = price_model.predict(pd.DataFrame(rows, columns=INPUT_COLUMNS))
+    return np.expm1(predicted_log).tolist()
+
+
+async def predict_batch(rows):
+    # predict is CPU-bound: run it off the event loop so new requests keep queueing
+    return await asyncio.to_thread(predict_rows, rows)
+
+
+def record_batch(size, seconds):
+    BATCH_SIZE.observe(size)
+    BATCH_LATENCY.observe(seconds)
+
+
+batcher = MicroBatcher(predict_batch, max_batch=MAX_BATCH, max_wait=MAX_WAIT_MS / 1000, on_batch=record_batch)
+
+app = FastAPI(title="Resale Price API")
+app.add_middleware(MetricsMiddleware)
+
+
+class PriceInput(BaseModel):
+    km_driven: float
+    fuel: str
+    transmission: str
+    mileage: float
+    engine: float
+    max_power: float
+    car_brand_name: str
+    car_age: float
+
+
+@app.get("/")
+def root():
+    return {
+        "message": "✅ Resale Price API is live",
+        "model": "compiled" if compiled_model is not None else "pipeline",
+        "compiled_max_batch": COMPILED_MAX_BATCH if compiled_model is not None and price_model is not None else None,
+        "max_batch": MAX_BATCH,
+        "max_wait_ms": MAX_WAIT_MS
+    }
+
+
+@app.post("/predict_price")
+async def predict_price(data: PriceInput):
+    start = time.perf_counter()
+    predicted_price = await batcher.submit(data.model_dump())
+    return {
+        "predicted_price": round(predicted_price, 2),
+        "latency_ms": round((time.perf_counter() - start) * 1000, 2)
+    }
+
+
+@app.get("/metrics")
+def metrics():
+    return metrics_endpoint()
+
+
+@app.get("/stats")
+def stats():
+    return {"batch_size": summary(BATCH_SIZE), "batch_latency_ms": summary(BATCH_LATENCY, scale=1000)}
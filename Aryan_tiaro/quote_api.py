@@ -0,0 +1,177 @@
+"""One-hop quote service: car-spec lookup, resale prediction and pool fare in a single request.
+
+The Streamlit app used to run three steps with a hop each: POST /get-car-info, unpickle and
+predict, calculate_fare. Here they run in-process. The request-side feature prep (brand
+resolution through the catalogue index, input checks) runs first, so a bad request never
+starts the car-spec lookup (cache / Serper / scrape / LLM, from fetcher_api), which may be
+shared with other callers through single-flight. The resale prediction goes through
+price_api's micro-batcher, so concurrent quotes share one predict call.
+
+Every response carries `timings_ms` with one entry per stage plus the total.
+
+Usage:
+    uvicorn quote_api:app --port 8002
+"""
+import os
+import sys
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+import fetcher_api
+import price_api
+from fare_calc import MILEAGE_CAPS, adjusted_mileage, calculate_fare, depreciation_multiplier
+from spec_parse import parse_value
+
+SHARED_DIR = os.getenv("SHARED_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+sys.path.insert(0, SHARED_DIR)  # instrument.py lives in ../shared, used by both services
+from instrument import MetricsMiddleware, metrics_endpoint  # noqa: E402
+
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    await fetcher_api.close_clients()
+
+
+app = FastAPI(title="Quote API", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+
+
+class QuoteInput(BaseModel):
+    car_name: str
+    model: str
+    year: str
+    fuel_type: str
+    variant: str
+    car_type: str = "Hatchback"
+    km_driven: float
+    transmission: str
+    car_age: float
+    distance: float
+    fuel_price: float
+    passengers: int = 1
+    m2: float = 1.0
+    depreciation_ratio: float = 1.0
+
+
+# --- Per-stage wall-clock timings ---
+class StageTimer:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.timings_ms = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings_ms[name] = round((time.perf_counter() - start) * 1000, 2)
+
+    async def run(self, name, coro):
+        with self.stage(name):
+            return await coro
+
+    def done(self):
+        self.timings_ms["total"] = round((time.perf_counter() - self.start) * 1000, 2)
+        return self.timings_ms
+
+
+def prepare_features(data):
+    """Request-side half of the model input; needs no car specs. Raises ValueError on bad input."""
+    brand = data.car_name.strip()
+    catalogue = fetcher_api.catalogue
+    if catalogue is not None:
+        matches = catalogue.resolve(brand, limit=1)
+        if matches and matches[0]["level"] == "brand":
+            brand = matches[0]["name"]  # "maruti " / "MARUTI" -> "Maruti", as the model was trained
+    if data.car_type not in MILEAGE_CAPS:
+        raise ValueError(f"car_type must be one of {list(MILEAGE_CAPS)}")
+    return {
+        "km_driven": data.km_driven,
+        "fuel": data.fuel_type,
+        "transmission": data.transmission,
+        "car_brand_name": brand,
+        "car_age": data.car_age
+    }
+
+
+def parse_specs(info):
+    specs = {
+        "mileage": parse_value(info.get("company_claimed_mileage", ""), "company_claimed_mileage"),
+        "engine": parse_value(info.get("engine", ""), "engine"),
+        "max_power": parse_value(info.get("max_power", ""), "max_power"),
+        "original_price": parse_value(info.get("original_price", ""), "original_price")
+    }
+    missing = [field for field, value in specs.items() if value is None and field != "original_price"]
+    if missing:
+        raise ValueError(f"Car specs missing {missing}")
+    return specs
+
+
+async def quote(data):
+    timer = StageTimer()
+
+    def failed(stage, error):
+        return {"error": str(error), "stage": stage, "timings_ms": timer.done()}
+
+    # Before the lookup: never start (or cancel) a lookup other callers may be coalesced onto
+    try:
+        with timer.stage("feature_prep"):
+            row = prepare_features(data)
+    except ValueError as e:
+        return failed("feature_prep", e)
+
+    info = await timer.run("car_info", fetcher_api.get_car_info_online(
+        data.car_name, data.model, data.year, data.fuel_type, data.variant))
+    if isinstance(info, dict) and "error" in info:
+        return failed("car_info", info["error"])
+
+    try:
+        with timer.stage("parse_specs"):
+            specs = parse_specs(info)
+    except ValueError as e:
+        return failed("parse_specs", e)
+    original_price = specs.pop("original_price")
+    if not original_price:  # M1 and the depreciation percent divide by it
+        return failed("car_info", "No original price found for this car")
+
+    predicted_price = await timer.run("resale_predict", price_api.batcher.submit(dict(row, **specs)))
+
+    with timer.stage("fare"):
+        m1 = depreciation_multiplier(predicted_price, original_price, data.depreciation_ratio)
+        mileage = adjusted_mileage(specs["mileage"], m1, data.car_type)
+        total_fare, per_head = calculate_fare(
+            data.distance, mileage or 0, data.fuel_price, original_price, predicted_price, data.m2, data.passengers
+        )
+
+    return {
+        "car_info": info,
+        "model_input": dict(row, **specs),
+        "predicted_price": round(predicted_price, 2),
+        "resale_price": round(predicted_price * 0.9, 2),
+        "original_price": original_price,
+        "depreciation_percent": round((original_price - predicted_price) / original_price * 100, 2),
+        "adjusted_mileage": round(mileage, 2) if mileage else None,
+        "total_fare": total_fare,
+        "per_head_fare": per_head,
+        "timings_ms": timer.done()
+    }
+
+
+@app.get("/")
+def root():
+    return {"message": "✅ Quote API is live", "model": "compiled" if price_api.COMPILED_MODEL_PATH else "pipeline"}
+
+
+@app.post("/quote")
+async def post_quote(data: QuoteInput):
+    return await quote(data)
+
+
+@app.get("/metrics")
+def metrics():
+    return metrics_endpoint()
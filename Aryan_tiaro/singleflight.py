@@ -0,0 +1,33 @@
+import asyncio
+
+
+# --- Single-flight: concurrent calls for the same key share one computation ---
+class SingleFlight:
+    def __init__(self):
+        self._in_flight = {}  # key -> asyncio.Task
+        self._stats = {"leaders": 0, "coalesced": 0}
+
+    async def do(self, key, fn):
+        """Run `await fn()` once per key at a time; callers arriving meanwhile get its result (or error).
+
+        The call runs in its own task, so a cancelled caller (the first one included) only stops
+        waiting; the others still get the result.
+        """
+        task = self._in_flight.get(key)
+        if task is not None:
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["leaders"] += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    def _done(self, key, task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved, every caller may have gone
+
+    def stats(self):
+        return {**self._stats, "in_flight": len(self._in_flight)}
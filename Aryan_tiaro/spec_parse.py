@@ -0,0 +1,148 @@
+"""Parse spec strings ("23.4 kmpl", "1248 CC", "74 bhp", "190Nm@ 2000rpm", "₹5.6 Lakh") into floats.
+
+Every parser takes a whole column (Series / list / array) and returns a float Series on the same
+index. Listing columns repeat the same few thousand strings, so each parser factorizes the column,
+runs one precompiled regex per unique value only and broadcasts the result back by code.
+`parse_value` is the single-value wrapper for serving code.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+NUMBER = r"(?P<value>\d+(?:\.\d+)?)"
+
+MILEAGE_PATTERN = re.compile(NUMBER + r"\s*(?P<unit>kmpl|km/l(?:itre)?|km/kg)?", re.IGNORECASE)
+ENGINE_PATTERN = re.compile(NUMBER + r"\s*(?P<unit>cc|l(?:itre)?\b)?", re.IGNORECASE)
+POWER_PATTERN = re.compile(NUMBER + r"\s*(?P<unit>bhp|hp|ps|kw)?", re.IGNORECASE)
+# "₹5.6 - 8.2 Lakh": the unit after the range applies to its first number too
+PRICE_PATTERN = re.compile(r"(?:₹|rs\.?|inr)?\s*" + NUMBER + r"(?:\s*(?:-|–|to)\s*\d+(?:\.\d+)?)?"
+                           r"\s*(?P<unit>lakh|lac|crore|cr)?", re.IGNORECASE)
+# "2020 model 5 lakh": a number with a unit wins over an earlier bare one
+PRICE_WITH_UNIT_PATTERN = re.compile(NUMBER + r"(?:\s*(?:-|–|to)\s*\d+(?:\.\d+)?)?\s*(?P<unit>lakh|lac|crore|cr)\b",
+                                     re.IGNORECASE)
+TORQUE_PATTERN = re.compile(
+    r"^\s*" + NUMBER + r"\s*(?P<unit>nm|kgm)?\s*(?:@|at)?\s*(?:(?P<rpm_low>\d+)\s*[-~]\s*)?(?P<rpm>\d+)?",
+    re.IGNORECASE
+)
+
+# Multipliers to the unit the models were trained on; a missing unit means the canonical one.
+# km/kg (CNG) is kept as-is, like the training notebook does.
+MILEAGE_UNITS = {"kmpl": 1.0, "km/l": 1.0, "km/litre": 1.0, "km/kg": 1.0}
+ENGINE_UNITS = {"cc": 1.0, "l": 1000.0, "litre": 1000.0}
+POWER_UNITS = {"bhp": 1.0, "hp": 1.0, "ps": 0.98632, "kw": 1.34102}
+PRICE_UNITS = {"lakh": 1e5, "lac": 1e5, "crore": 1e7, "cr": 1e7}
+BARE_PRICE_LAKHS_BELOW = 1000  # no car costs under ₹1000: a unitless "5.6" means lakhs
+TORQUE_UNITS = {"nm": 1.0, "kgm": 9.80665}
+
+
+# --- Column helpers ---
+def _as_series(values):
+    return values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+
+
+def _on_uniques(values, parse, columns):
+    """Run `parse(string) -> tuple of floats` once per distinct value and broadcast back by code."""
+    values = _as_series(values)
+    codes, uniques = pd.factorize(values)
+    # One extra all-NaN row so code -1 (missing input) picks NaN
+    table = np.full((len(uniques) + 1, len(columns)), np.nan)
+    if len(uniques):
+        table[:-1] = [parse(str(value).replace(",", "")) for value in uniques]
+    return pd.DataFrame(table[codes], index=values.index, columns=columns)
+
+
+def _value_with_unit(pattern, units):
+    def parse(text):
+        match = pattern.search(text)
+        if match is None:
+            return (np.nan,)
+        unit = match.group("unit")
+        return (float(match.group("value")) * (units[unit.lower()] if unit else 1.0),)
+    return parse
+
+
+def _price_rupees(value, unit=None):
+    if unit:
+        return value * PRICE_UNITS[unit.lower()]
+    return value * PRICE_UNITS["lakh"] if value < BARE_PRICE_LAKHS_BELOW else value
+
+
+def _parse_price(text):
+    match = PRICE_WITH_UNIT_PATTERN.search(text) or PRICE_PATTERN.search(text)
+    if match is None:
+        return (np.nan,)
+    return (_price_rupees(float(match.group("value")), match.group("unit")),)
+
+
+TORQUE_UNIT_ANYWHERE = re.compile(r"kgm|nm", re.IGNORECASE)
+
+
+def _parse_torque(text):
+    match = TORQUE_PATTERN.search(text)
+    if match is None:
+        return np.nan, np.nan
+    value, unit, rpm = float(match.group("value")), match.group("unit"), match.group("rpm")
+    if unit is None:
+        # "11.5@ 4,500(kgm@ rpm)": the unit comes after the rpm
+        anywhere = TORQUE_UNIT_ANYWHERE.search(text)
+        unit = anywhere.group() if anywhere else "nm"
+    # No car makes 100 kgm; listings like "145@ 4,100(kgm@ rpm)" are Nm with the wrong label
+    factor = TORQUE_UNITS[unit.lower()] if value <= 100 else 1.0
+    return value * factor, float(rpm) if rpm else np.nan  # rpm: upper end of a range
+
+
+# --- Public parsers ---
+def parse_mileage(values):
+    """kmpl (km/kg passed through)."""
+    return _on_uniques(values, _value_with_unit(MILEAGE_PATTERN, MILEAGE_UNITS), ["value"])["value"]
+
+
+def parse_engine(values):
+    """Displacement in cc ("1.2 L" -> 1200)."""
+    return _on_uniques(values, _value_with_unit(ENGINE_PATTERN, ENGINE_UNITS), ["value"])["value"]
+
+
+def parse_power(values):
+    """Max power in bhp (PS and kW converted)."""
+    return _on_uniques(values, _value_with_unit(POWER_PATTERN, POWER_UNITS), ["value"])["value"]
+
+
+def parse_price(values):
+    """Price in rupees ("₹5.6 Lakh" -> 560000); the first number of a range, bare values under 1000 as lakhs."""
+    return _on_uniques(values, _parse_price, ["value"])["value"]
+
+
+def parse_torque(values):
+    """DataFrame with torque_nm (kgm converted) and torque_rpm."""
+    return _on_uniques(values, _parse_torque, ["torque_nm", "torque_rpm"])
+
+
+PARSERS = {
+    "mileage": parse_mileage,
+    "engine": parse_engine,
+    "max_power": parse_power,
+    "original_price": parse_price,
+    "company_claimed_mileage": parse_mileage
+}
+
+
+def parse_listing_specs(df):
+    """Replace the raw mileage / engine / max_power (and torque, if present) columns of a listings frame."""
+    df = df.copy()
+    for col in ["mileage", "engine", "max_power"]:
+        if col in df:
+            df[col] = PARSERS[col](df[col])
+    if "torque" in df:
+        df = df.drop(columns="torque").join(parse_torque(df["torque"]))
+    return df
+
+
+def parse_value(value, kind):
+    """Single value for serving code: float, or None if nothing parseable."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if np.isnan(value):
+            return None
+        return _price_rupees(float(value)) if kind == "original_price" else float(value)
+    parsed = PARSERS[kind]([value]).iloc[0]
+    return None if np.isnan(parsed) else float(parsed)
@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(HERE)
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, os.path.join(APP_DIR, "..", "loadtest"))
+
+# fetcher_api reads these at import time; no real keys or network are used
+os.environ.setdefault("GROQ_API_KEY", "stub")
+os.environ.setdefault("SERPER_API_KEY", "stub")
+os.environ.setdefault("CATALOGUE_DIR", os.path.join(HERE, "no_catalogue"))
+os.environ.setdefault("PROFILE_SAMPLE_RATE", "0")
+# Opened when fetcher_api is imported (test collection, before any fixture); tests use tmp_path caches
+os.environ.setdefault("CAR_INFO_CACHE_PATH", os.path.join(tempfile.mkdtemp(prefix="car-info-cache-"), "cache.sqlite3"))
+
+from stubs import StubServer  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def stubs():
+    """Serper, cardekho and Groq stand-ins on a local port, answering without delay."""
+    server = StubServer({"serper": 0, "page": 0, "llm": 0})
+    with server:
+        yield server
+
+
+@pytest.fixture
+def fetcher(stubs, monkeypatch, tmp_path):
+    """fetcher_api pointed at the stubs, with an empty cache and fresh clients and stub state."""
+    import fetcher_api
+    from car_cache import CarInfoCache
+
+    monkeypatch.setattr(fetcher_api, "SERPER_URL", f"{stubs.base_url}/search")
+    monkeypatch.setattr(fetcher_api, "GROQ_BASE_URL", stubs.base_url)
+    monkeypatch.setattr(fetcher_api, "car_info_cache", CarInfoCache(str(tmp_path / "cache.sqlite3")))
+    fetcher_api.set_llm(None)  # rebuilt against GROQ_BASE_URL on first use
+    state = stubs.app.state
+    state.fail.clear()
+    state.llm_reply = None
+    for name in state.calls:
+        state.calls[name] = 0
+        state.peers[name].clear()
+    yield fetcher_api
+    fetcher_api.set_llm(None)
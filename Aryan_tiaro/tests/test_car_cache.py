@@ -0,0 +1,26 @@
+from car_cache import CarInfoCache
+
+
+def test_rows_past_the_cap_are_evicted_every_n_writes(tmp_path):
+    cache = CarInfoCache(str(tmp_path / "cache.sqlite3"), max_rows=3, memory_size=0, evict_every=4)
+
+    for i in range(3):
+        cache.set(f"car{i}", {"engine": i})
+    assert cache.stats()["disk_entries"] == 3
+
+    cache.set("car3", {"engine": 3})  # 4th write: sweep back down to max_rows
+    stats = cache.stats()
+    assert (stats["disk_entries"], stats["evictions"]) == (3, 1)
+    assert cache.get("car0") is None
+    assert cache.get("car3") == {"engine": 3}
+
+
+def test_get_memory_does_not_read_the_disk(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    CarInfoCache(path).set("swift", {"engine": 1197})
+    cache = CarInfoCache(path)  # same file, empty memory tier
+
+    assert cache.get_memory("swift") is None
+    assert cache.get("swift") == {"engine": 1197}
+    assert cache.get_memory("swift") == {"engine": 1197}
+    assert cache.stats()["misses"] == 0
@@ -0,0 +1,13 @@
+from catalogue import Catalogue, build_catalogue
+
+NAMES = ["Maruti Swift VXI", "Maruti Swift LDI", "Maruti SX4 ZXI", "Maruti Alto 800 LXI", "Hyundai i20 Asta"]
+
+
+def test_fuzzy_ties_prefer_the_more_specific_entry():
+    catalogue = Catalogue(build_catalogue(NAMES))
+
+    matches = catalogue.resolve("maruti swfit")
+
+    assert matches[0]["name"] == "Maruti Swift"
+    assert matches[0]["score"] == matches[1]["score"]
+    assert matches[1]["name"] == "Maruti"
@@ -0,0 +1,64 @@
+from fastapi.testclient import TestClient
+
+QUERY = {"car_name": "Maruti", "model": "Swift", "year": "2020", "fuel_type": "petrol", "variant": "VXI"}
+
+
+def post(client, **overrides):
+    return client.post("/get-car-info", json=dict(QUERY, **overrides)).json()
+
+
+def test_chain_goes_serper_page_llm(fetcher, stubs):
+    with TestClient(fetcher.app) as client:
+        body = post(client)
+    # The stub page has engine / power / mileage but no price, so the LLM is called
+    assert body["result"]["original_price"] == "₹6.49 Lakh"
+    assert body["result"]["engine"] == "1197 cc"
+    assert stubs.app.state.calls == {"serper": 1, "page": 1, "llm": 1}
+
+
+def test_second_lookup_is_cached(fetcher, stubs):
+    with TestClient(fetcher.app) as client:
+        first = post(client)
+        second = post(client, car_name="  MARUTI ")  # same normalized key
+    assert first == second
+    assert stubs.app.state.calls == {"serper": 1, "page": 1, "llm": 1}
+
+
+def test_pooled_clients_reuse_connections(fetcher, stubs):
+    with TestClient(fetcher.app) as client:
+        post(client, variant="LXI")
+        clients = {name: fetcher.get_client(name) for name in ("serper", "page", "llm")}
+        post(client, variant="ZXI")
+        post(client, variant="VDI")
+        assert {name: fetcher.get_client(name) for name in clients} == clients
+    # Sequential lookups ride one keep-alive connection per upstream
+    assert stubs.app.state.calls == {"serper": 3, "page": 3, "llm": 3}
+    assert {name: len(ports) for name, ports in stubs.app.state.peers.items()} == {"serper": 1, "page": 1, "llm": 1}
+
+
+def test_serper_failure_is_reported_and_not_cached(fetcher, stubs):
+    stubs.app.state.fail.add("serper")
+    with TestClient(fetcher.app) as client:
+        assert post(client) == {"error": "No search result found or Serper failed."}
+        stubs.app.state.fail.clear()
+        assert "result" in post(client)
+    assert stubs.app.state.calls["serper"] == 2
+
+
+def test_page_failure_skips_the_llm(fetcher, stubs):
+    stubs.app.state.fail.add("page")
+    with TestClient(fetcher.app) as client:
+        body = post(client)
+    assert body["error"].startswith("Error fetching page")
+    assert stubs.app.state.calls["llm"] == 0
+
+
+def test_invalid_llm_json_is_reported_and_not_cached(fetcher, stubs):
+    stubs.app.state.llm_reply = "Sure! Here are the specs you asked for."
+    with TestClient(fetcher.app) as client:
+        body = post(client)
+        assert body["error"] == "Invalid JSON from LLM"
+        assert body["raw_response"] == stubs.app.state.llm_reply
+        stubs.app.state.llm_reply = None
+        assert "result" in post(client)
+    assert stubs.app.state.calls["llm"] == 2
@@ -0,0 +1,91 @@
+import asyncio
+import json
+from typing import List
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from microbatch import MicroBatcher
+
+SPECS = {"original_price": "₹6.49 Lakh", "company_claimed_mileage": "22.38 kmpl", "engine": "1197 cc",
+         "max_power": "88.50 bhp"}
+PAGES = ["Swift page: 1197 cc, 88.50 bhp", "Baleno page: 1197 cc", "Dzire page: 1197 cc, 88.50 bhp"]
+
+
+class RecordingFakeLLM(FakeListChatModel):
+    """FakeListChatModel that also keeps the prompt of every call."""
+    prompts: List[str] = []
+
+    def _call(self, messages, stop=None, run_manager=None, **kwargs):
+        self.prompts.append(messages[-1].content)
+        return super()._call(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+def use_fake_llm(fetcher_api, *responses):
+    llm = RecordingFakeLLM(responses=list(responses), prompts=[])
+    fetcher_api.set_llm(llm)
+    return llm
+
+
+def test_batch_resolves_good_entries_and_retries_the_bad_one_alone(fetcher):
+    bad = dict(SPECS, engine="not listed")  # no digits: fails per-entry validation
+    llm = use_fake_llm(fetcher,
+                       json.dumps({"car_0": SPECS, "car_1": bad, "car_2": dict(SPECS, engine="1462 cc")}),
+                       json.dumps(dict(SPECS, engine="1200 cc")))
+
+    results = asyncio.run(fetcher.extract_car_info_batch(PAGES))
+
+    assert results == [SPECS, dict(SPECS, engine="1200 cc"), dict(SPECS, engine="1462 cc")]
+    assert len(llm.prompts) == 2
+    batch_prompt, retry_prompt = llm.prompts
+    assert all(f"### car_{i}" in batch_prompt for i in range(3))
+    # The retry carries only the failed page, as a single-car prompt
+    assert PAGES[1] in retry_prompt and PAGES[0] not in retry_prompt and "### car_" not in retry_prompt
+
+
+def test_missing_entry_is_retried(fetcher):
+    llm = use_fake_llm(fetcher, json.dumps({"car_0": SPECS, "car_2": SPECS}), json.dumps(SPECS))
+
+    assert asyncio.run(fetcher.extract_car_info_batch(PAGES)) == [SPECS, SPECS, SPECS]
+    assert len(llm.prompts) == 2 and PAGES[1] in llm.prompts[1]
+
+
+def test_unparseable_batch_retries_every_entry_individually(fetcher):
+    llm = use_fake_llm(fetcher, "Here you go: {car_0: ...", *[json.dumps(SPECS)] * 3)
+
+    assert asyncio.run(fetcher.extract_car_info_batch(PAGES)) == [SPECS, SPECS, SPECS]
+    assert len(llm.prompts) == 4
+    assert sorted(next(i for i, page in enumerate(PAGES) if page in prompt) for prompt in llm.prompts[1:]) == [0, 1, 2]
+
+
+def test_failed_retry_returns_an_error_for_that_entry_only(fetcher):
+    use_fake_llm(fetcher, json.dumps({"car_0": SPECS, "car_1": {}, "car_2": SPECS}), "still not json")
+
+    results = asyncio.run(fetcher.extract_car_info_batch(PAGES))
+
+    assert results[0] == results[2] == SPECS
+    assert results[1] == {"error": "Invalid JSON from LLM", "raw_response": "still not json"}
+
+
+def test_single_page_uses_the_single_prompt(fetcher):
+    llm = use_fake_llm(fetcher, json.dumps(SPECS))
+
+    assert asyncio.run(fetcher.extract_car_info_batch(PAGES[:1])) == [SPECS]
+    assert "### car_" not in llm.prompts[0]
+
+
+def test_concurrent_extractions_share_one_batched_call(fetcher):
+    llm = use_fake_llm(fetcher, json.dumps({f"car_{i}": dict(SPECS, engine=f"{1000 + i} cc") for i in range(3)}))
+    batcher = MicroBatcher(fetcher.extract_car_info_batch, max_batch=3, max_wait=1.0)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit(page) for page in PAGES))
+
+    results = asyncio.run(run())
+    assert [r["engine"] for r in results] == ["1000 cc", "1001 cc", "1002 cc"]
+    assert len(llm.prompts) == 1
+
+
+def test_chain_is_built_once_per_llm(fetcher):
+    use_fake_llm(fetcher, json.dumps(SPECS))
+    assert fetcher.get_chain("batch") is fetcher.get_chain("batch")
+    assert fetcher.get_chain("single") is not fetcher.get_chain("batch")
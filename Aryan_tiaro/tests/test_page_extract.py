@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+from page_extract import extract_page, extract_specs
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+
+def test_json_ld_price_page_is_complete():
+    page = extract_page(read_fixture("swift_jsonld.html"))
+
+    assert page["complete"]
+    assert page["specs"] == {"original_price": 649000.0, "company_claimed_mileage": 22.38, "engine": 1197.0,
+                             "max_power": 88.5}
+
+
+def test_text_price_page_prefers_the_on_road_price():
+    page = extract_page(read_fixture("creta_text_price.html"))
+
+    assert page["complete"]
+    assert page["specs"]["original_price"] == 1724000.0
+
+
+def test_page_without_a_price_goes_to_the_llm():
+    page = extract_page(read_fixture("nexon_no_price.html"))
+
+    assert not page["complete"]
+    assert "original_price" not in page["specs"]
+    assert "1199 cc" in page["context"]
+
+
+def test_rs_after_a_word_and_a_comma_is_not_a_price():
+    assert extract_specs(["Tata cars, on-road price Rs 8.5 Lakh"]) == {"original_price": 850000.0}
+
+
+@pytest.mark.parametrize("line", ["Compare cars 2024 price list", "Price list for cars, trucks and vans"])
+def test_no_price_when_rs_is_only_the_end_of_a_word(line):
+    assert extract_specs([line]) == {}
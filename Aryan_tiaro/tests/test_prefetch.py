@@ -0,0 +1,26 @@
+import json
+
+from prefetch import end_partial_line, load_checkpoint
+
+
+def test_load_checkpoint_skips_half_written_last_line(tmp_path, capsys):
+    path = tmp_path / "prefetch_checkpoint.jsonl"
+    path.write_text(
+        json.dumps({"key": "a", "status": "ok"}) + "\n"
+        + json.dumps({"key": "b", "status": "error", "error": "boom"}) + "\n"
+        + '{"key": "c", "sta'  # killed mid-write
+    )
+
+    assert load_checkpoint(str(path)) == {"a"}
+    assert "line 3" in capsys.readouterr().out
+
+
+def test_resume_appends_after_half_written_line(tmp_path):
+    path = tmp_path / "prefetch_checkpoint.jsonl"
+    path.write_text(json.dumps({"key": "a", "status": "ok"}) + "\n" + '{"key": "c", "sta')
+
+    end_partial_line(str(path))
+    with open(path, "a") as f:
+        f.write(json.dumps({"key": "c", "status": "ok"}) + "\n")
+
+    assert load_checkpoint(str(path)) == {"a", "c"}
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def test_concurrent_calls_for_one_key_run_fn_once():
+    async def scenario():
+        flights, calls = SingleFlight(), []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"price": 1}
+
+        results = await asyncio.gather(*(flights.do("swift", fn) for _ in range(10)))
+        return flights, calls, results
+
+    flights, calls, results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert results == [{"price": 1}] * 10
+    assert flights.stats() == {"leaders": 1, "coalesced": 9, "in_flight": 0}
+
+
+def test_cancelling_the_first_caller_does_not_fail_the_others():
+    async def scenario():
+        flights, release = SingleFlight(), asyncio.Event()
+
+        async def fn():
+            await release.wait()
+            return "ok"
+
+        first = asyncio.ensure_future(flights.do("swift", fn))
+        await asyncio.sleep(0)
+        others = [asyncio.ensure_future(flights.do("swift", fn)) for _ in range(3)]
+        await asyncio.sleep(0)
+        first.cancel()  # e.g. the client disconnected
+        release.set()
+        return first, await asyncio.gather(*others)
+
+    first, results = asyncio.run(scenario())
+
+    assert first.cancelled()
+    assert results == ["ok"] * 3
+
+
+def test_error_reaches_every_caller_and_frees_the_key():
+    async def scenario():
+        flights, calls = SingleFlight(), []
+
+        async def fail():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise RuntimeError("serper down")
+
+        results = await asyncio.gather(*(flights.do("swift", fail) for _ in range(3)), return_exceptions=True)
+        with pytest.raises(RuntimeError):
+            await flights.do("swift", fail)  # not stuck on the failed call: runs again
+        return calls, results
+
+    calls, results = asyncio.run(scenario())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(calls) == 2
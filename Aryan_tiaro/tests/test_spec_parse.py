@@ -0,0 +1,21 @@
+import pytest
+
+from spec_parse import parse_value
+
+
+@pytest.mark.parametrize("text, rupees", [
+    ("₹6.49 Lakh", 649000.0),
+    ("₹5.6 - 8.2 Lakh", 560000.0),
+    ("1.2 Cr", 12000000.0),
+    ("Rs 6,49,000", 649000.0),
+    ("2020 model 5 lakh", 500000.0),  # the number next to the unit, not the first one
+    ("5.6", 560000.0),  # unitless and under 1000: lakhs
+    (5.6, 560000.0),
+    (649000, 649000.0),
+])
+def test_original_price_in_rupees(text, rupees):
+    assert parse_value(text, "original_price") == rupees
+
+
+def test_unparseable_price_is_none():
+    assert parse_value("on request", "original_price") is None
@@ -0,0 +1,244 @@
+"""Train the resale-price stacking model outside the notebook.
+
+Same data cleaning, preprocessing, base learners and Ridge meta-model as
+car-prices-predict-with-ensemble-methods.ipynb, but every expensive stage is cached on disk:
+  - the fitted ColumnTransformer and its output, keyed by the training data + preprocessor params
+  - each base learner's out-of-fold predictions (one file per fold) and its full-data fit,
+    keyed by the transformed data + that learner's params
+So changing one base learner or the meta-model only refits what changed.
+Fold and full-data fits run in a process pool.
+
+Usage:
+    python train_price.py "Car details.csv" --output stacking_model.pkl --workers 4
+    python train_price.py listings_parquet/   # directory written by ingest.py
+"""
+import argparse
+import os
+import pickle
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor, StackingRegressor
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.linear_model import LassoCV, Ridge
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import KFold, train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, OneHotEncoder, OrdinalEncoder, StandardScaler
+from sklearn.utils import Bunch
+from xgboost import XGBRegressor
+
+from ingest import clean_listings, read_parquet_dir
+
+CACHE_DIR = os.getenv("TRAIN_CACHE_DIR", ".train_cache")
+N_FOLDS = 5  # StackingRegressor(cv=5) -> unshuffled KFold(5)
+
+# LassoCV tries alphas down to 1e-10; the notebook silences the resulting warnings too
+warnings.filterwarnings("ignore", category=ConvergenceWarning)
+
+LOG_TRANSFORM_COLS = ["km_driven", "mileage", "engine", "max_power", "car_age"]
+CATEGORICAL_COLS = ["fuel", "transmission"]
+BRAND_COL = ["car_brand_name"]
+
+
+# --- Data (same cleaning as the notebook) ---
+TRAIN_COLUMNS = ["selling_price", "km_driven", "fuel", "transmission", "mileage", "engine", "max_power",
+                 "car_brand_name", "car_age"]
+
+
+def load_training_data(path):
+    """Listings from a CSV, or from a Parquet directory written by ingest.py (memory-mapped)."""
+    if os.path.isdir(path):
+        df = read_parquet_dir(path, columns=TRAIN_COLUMNS)
+        df["car_age"] = df["car_age"].astype("int64")
+    else:
+        df = clean_listings(pd.read_csv(path).drop(columns="torque"))[TRAIN_COLUMNS]
+    for col in ["fuel", "transmission"]:
+        df[col] = df[col].astype("category")
+
+    for col in df.select_dtypes(["int", "float"]):
+        df[col] = df[col].fillna(df[col].median())
+    for col in df.select_dtypes(exclude=["int", "float"]):
+        df[col] = df[col].fillna(df[col].value_counts().index[0])
+
+    return df.drop("selling_price", axis=1), df["selling_price"]
+
+
+# --- Model definition ---
+def build_preprocessor():
+    log_scale_transform = Pipeline([
+        ("log", FunctionTransformer(np.log1p, validate=True)),
+        ("scale", StandardScaler())
+    ])
+    return ColumnTransformer(transformers=[
+        ("log_num", log_scale_transform, LOG_TRANSFORM_COLS),
+        ("cat", OrdinalEncoder(handle_unknown="use_encoded_value", unknown_value=-1), CATEGORICAL_COLS),
+        ("brand", OneHotEncoder(handle_unknown="ignore", sparse_output=False), BRAND_COL)
+    ])
+
+
+def build_base_models():
+    return [
+        ("xgb", XGBRegressor(n_estimators=500, learning_rate=0.1, random_state=42)),
+        ("rf", RandomForestRegressor(n_estimators=300, random_state=42)),
+        ("gbr", GradientBoostingRegressor(n_estimators=300, random_state=42)),
+        ("lasso", LassoCV(alphas=[
+            1e-10, 1e-8, 1e-7, 1e-5, 1e-2, 9e-4, 9e-3,
+            5e-4, 3e-4, 1e-4, 1e-3, 1e-2, 0.1,
+            0.3, 0.6, 1, 3, 5, 7, 14, 18, 25, 30,
+            45, 50, 70, 90
+        ], n_jobs=-1, cv=5))
+    ]
+
+
+def build_meta_model():
+    return Ridge(alpha=1.0)
+
+
+# --- Disk cache keyed by content hashes ---
+def params_key(estimator):
+    # n_jobs only changes speed, not the fitted model
+    params = {k: v for k, v in estimator.get_params().items() if not k.endswith("n_jobs")}
+    return type(estimator).__name__, params
+
+
+def cache_path(stage, *key_parts):
+    return os.path.join(CACHE_DIR, f"{stage}-{joblib.hash(key_parts)}.joblib")
+
+
+def cached(path, compute):
+    """Returns (value, was_cached)."""
+    if os.path.exists(path):
+        return joblib.load(path), True
+    value = compute()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    joblib.dump(value, path + ".tmp")
+    os.replace(path + ".tmp", path)
+    return value, False
+
+
+# --- Pool jobs (top-level so they pickle) ---
+def _fit(estimator, X, y):
+    if "n_jobs" in estimator.get_params():
+        estimator.set_params(n_jobs=1)  # the pool already uses every core
+    start = time.perf_counter()
+    estimator.fit(X, y)
+    return estimator, time.perf_counter() - start
+
+
+def fold_job(estimator, X, y, train_idx, test_idx, path):
+    fitted, seconds = _fit(estimator, X[train_idx], y[train_idx])
+    preds = fitted.predict(X[test_idx])
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    joblib.dump(preds, path + ".tmp")
+    os.replace(path + ".tmp", path)
+    return preds, seconds
+
+
+def full_fit_job(estimator, X, y, path):
+    fitted, seconds = _fit(estimator, X, y)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    joblib.dump(fitted, path + ".tmp")
+    os.replace(path + ".tmp", path)
+    return fitted, seconds
+
+
+# --- Training ---
+def train(x_train, y_train, workers=None):
+    timings = []  # (stage, seconds, cached)
+
+    start = time.perf_counter()
+    preprocessor = build_preprocessor()
+    path = cache_path("preprocess", joblib.hash(x_train), params_key(preprocessor))
+    (preprocessor, Xt), hit = cached(path, lambda: (preprocessor, preprocessor.fit_transform(x_train)))
+    timings.append(("preprocess", time.perf_counter() - start, hit))
+
+    y = np.asarray(y_train, dtype=float)
+    data_key = (joblib.hash(Xt), joblib.hash(y))
+    folds = list(KFold(n_splits=N_FOLDS).split(Xt))
+    base_models = build_base_models()
+
+    # Submit every (learner, fold) and (learner, full fit) that isn't cached yet
+    oof = {name: np.empty(len(y)) for name, _ in base_models}
+    fitted, jobs = {}, {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for name, est in base_models:
+            for fold, (train_idx, test_idx) in enumerate(folds):
+                path = cache_path("oof", data_key, params_key(est), fold, N_FOLDS)
+                if os.path.exists(path):
+                    oof[name][test_idx] = joblib.load(path)
+                    timings.append((f"{name} fold {fold}", 0.0, True))
+                else:
+                    jobs[(name, fold)] = pool.submit(fold_job, clone(est), Xt, y, train_idx, test_idx, path)
+
+            path = cache_path("full", data_key, params_key(est))
+            if os.path.exists(path):
+                fitted[name] = joblib.load(path)
+                timings.append((f"{name} full fit", 0.0, True))
+            else:
+                jobs[(name, "full")] = pool.submit(full_fit_job, clone(est), Xt, y, path)
+
+        for (name, fold), job in jobs.items():
+            result, seconds = job.result()
+            if fold == "full":
+                fitted[name] = result
+                timings.append((f"{name} full fit", seconds, False))
+            else:
+                oof[name][folds[fold][1]] = result
+                timings.append((f"{name} fold {fold}", seconds, False))
+
+    # Meta-model on out-of-fold predictions + passthrough features (cheap, never cached)
+    start = time.perf_counter()
+    names = [name for name, _ in base_models]
+    meta = build_meta_model().fit(np.column_stack([oof[name] for name in names] + [Xt]), y)
+    timings.append(("meta", time.perf_counter() - start, False))
+
+    # Assemble the same fitted objects StackingRegressor.fit would produce
+    stack = StackingRegressor(estimators=base_models, final_estimator=build_meta_model(), passthrough=True, cv=N_FOLDS)
+    stack.estimators_ = [fitted[name] for name in names]
+    stack.named_estimators_ = Bunch(**fitted)
+    stack.stack_method_ = ["predict"] * len(names)
+    stack.final_estimator_ = meta
+    stack._n_feature_outs = [1] * len(names)
+    return Pipeline([("preprocess", preprocessor), ("model", stack)]), timings
+
+
+def print_timings(timings, total):
+    print(f"\n{'stage':<22}{'seconds':>10}  source")
+    for stage, seconds, hit in timings:
+        print(f"{stage:<22}{seconds:>10.2f}  {'cache' if hit else 'fit'}")
+    print(f"{'total (wall)':<22}{total:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the resale-price stacking model with cached stages")
+    parser.add_argument("csv", nargs="?", default="Car details.csv", help="CSV file or ingest.py Parquet directory")
+    parser.add_argument("--output", default="stacking_model.pkl")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    x, y = load_training_data(args.csv)
+    load_seconds = time.perf_counter() - start
+    # Same split as the notebook
+    x_train, x_test, y_train, y_test = train_test_split(x, y, test_size=0.20, shuffle=True, random_state=1)
+
+    pipeline, timings = train(x_train, np.log1p(y_train), args.workers)
+    timings.insert(0, ("load data", load_seconds, False))
+
+    preds = np.expm1(pipeline.predict(x_test))
+    print("\n📊 Stacking Regressor Evaluation:")
+    print(f"MAE: ₹{mean_absolute_error(y_test, preds):,.2f}")
+    print(f"RMSE: {np.sqrt(mean_squared_error(y_test, preds)):,.2f}")
+    print(f"R² Score: {r2_score(y_test, preds):.4f}")
+
+    with open(args.output, "wb") as f:
+        pickle.dump(pipeline, f)
+    print_timings(timings, time.perf_counter() - start)
+    print(f"✅ Saved {args.output}")
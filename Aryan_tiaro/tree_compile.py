@@ -0,0 +1,335 @@
+"""Compile the fitted stacking pipeline into flat NumPy arrays.
+
+All trees of all tree ensembles (RandomForest, GradientBoosting, XGBoost) share one
+node layout: feature / threshold / left / value, concatenated, plus a root index per
+tree. Nodes are renumbered breadth-first so the right child is always left + 1, and a
+leaf's `left` points at itself. Linear learners (LassoCV) and the Ridge meta-model
+become plain coefficient vectors. The ColumnTransformer is kept as the sklearn step
+(preprocess.pkl) and, when it only uses log1p / StandardScaler / OrdinalEncoder /
+OneHotEncoder, is also compiled to per-column arrays and dicts at load time. That is
+where most of a single-row predict went.
+
+The level-by-level NumPy traversal beats sklearn / XGBoost up to a few hundred rows per
+call; above that their native tree loops win (bench_compiled.py prints the crossover).
+price_api.py routes by batch size.
+
+Usage:
+    python tree_compile.py stacking_model.pkl stacking_compiled/
+"""
+import json
+import os
+import pickle
+import sys
+from collections import deque
+
+import numpy as np
+
+ARRAY_NAMES = ["feature", "threshold", "left", "value", "roots"]
+
+
+# --- Exporters: one fitted model -> list of trees as (feature, threshold, left, right, value) ---
+def _sklearn_tree(tree):
+    t = tree.tree_
+    is_leaf = t.children_left == -1
+    return (
+        np.where(is_leaf, 0, t.feature),
+        np.where(is_leaf, np.inf, t.threshold),
+        t.children_left,
+        t.children_right,
+        t.value[:, 0, 0]
+    )
+
+
+def _xgb_trees(model):
+    booster = model.get_booster()
+    dump = json.loads(booster.save_raw(raw_format="json"))
+    trees = []
+    for tree in dump["learner"]["gradient_booster"]["model"]["trees"]:
+        left = np.array(tree["left_children"], dtype=np.int64)
+        right = np.array(tree["right_children"], dtype=np.int64)
+        # Stored as float32 in the model; round-trip through float32 to undo the JSON decimal rounding
+        conditions = np.array(tree["split_conditions"], dtype=np.float32).astype(np.float64)
+        is_leaf = left == -1
+        # XGBoost goes left on x < t (in float32); x <= previous float gives the same split
+        threshold = np.where(is_leaf, np.inf, np.nextafter(conditions, -np.inf))
+        trees.append((
+            np.where(is_leaf, 0, np.array(tree["split_indices"], dtype=np.int64)),
+            threshold,
+            left,
+            right,
+            np.where(is_leaf, conditions, 0.0)
+        ))
+    base_score = dump["learner"]["learner_model_param"]["base_score"]
+    return trees, float(base_score.strip("[]"))
+
+
+def export_estimator(name, est):
+    """Returns (ensemble meta, trees) for tree models or (linear meta, None) for linear ones."""
+    kind = type(est).__name__
+    if kind in ("RandomForestRegressor", "ExtraTreesRegressor"):
+        trees = [_sklearn_tree(t) for t in est.estimators_]
+        return {"name": name, "kind": "trees", "offset": 0.0, "scale": 1.0 / len(trees)}, trees
+    if kind == "GradientBoostingRegressor":
+        trees = [_sklearn_tree(t) for t in est.estimators_[:, 0]]
+        n_features = est.n_features_in_
+        offset = 0.0 if est.init_ == "zero" else float(est.init_.predict(np.zeros((1, n_features)))[0])
+        return {"name": name, "kind": "trees", "offset": offset, "scale": float(est.learning_rate)}, trees
+    if kind == "XGBRegressor":
+        trees, base_score = _xgb_trees(est)
+        return {"name": name, "kind": "trees", "offset": base_score, "scale": 1.0}, trees
+    if hasattr(est, "coef_") and hasattr(est, "intercept_"):
+        return {
+            "name": name,
+            "kind": "linear",
+            "coef": np.ravel(est.coef_).astype(float).tolist(),
+            "intercept": float(np.ravel(est.intercept_)[0])
+        }, None
+    raise ValueError(f"Cannot compile base learner {name!r} of type {kind}")
+
+
+def _renumber(feature, threshold, left, right, value, offset):
+    """Breadth-first order with siblings adjacent. Returns global arrays and the tree depth."""
+    order, new_left, depth = [0], {}, 0
+    queue = deque([(0, 0)])
+    while queue:
+        node, level = queue.popleft()
+        depth = max(depth, level)
+        if left[node] != -1:
+            new_left[node] = len(order)
+            order.extend([left[node], right[node]])
+            queue.extend([(left[node], level + 1), (right[node], level + 1)])
+
+    order = np.array(order)
+    position = np.empty(len(left), dtype=np.int64)
+    position[order] = np.arange(len(order))
+    children = np.array([new_left.get(n, position[n]) for n in order]) + offset
+    return feature[order], threshold[order], children, value[order], depth
+
+
+# --- Compiled preprocessing: the ColumnTransformer as arrays and dicts ---
+def _column(X, name):
+    if isinstance(X, list):  # rows as dicts, skips building a DataFrame
+        return [row[name] for row in X]
+    return X[name].to_numpy()
+
+
+class CompiledPreprocess:
+    """Same output as ColumnTransformer.transform for the step types the price pipeline uses.
+
+    Raises ValueError from `from_column_transformer` for anything else, so callers can keep sklearn.
+    """
+
+    def __init__(self, blocks):
+        self.blocks = blocks  # list of (kind, columns, params), in output column order
+
+    @classmethod
+    def from_column_transformer(cls, ct):
+        from sklearn.pipeline import Pipeline
+
+        blocks = []
+        for name, transformer, columns in ct.transformers_:
+            if transformer == "drop" or (name == "remainder" and not len(columns)):
+                continue
+            kind = type(transformer).__name__
+            steps = transformer.steps if isinstance(transformer, Pipeline) else [(name, transformer)]
+            if all(type(t).__name__ in ("FunctionTransformer", "StandardScaler") for _, t in steps):
+                ops = []
+                for _, t in steps:
+                    if type(t).__name__ == "FunctionTransformer":
+                        if t.func is not np.log1p or t.kw_args:
+                            raise ValueError(f"Cannot compile FunctionTransformer({t.func!r})")
+                        ops.append(("log1p", None, None))
+                    else:
+                        ops.append(("scale", t.mean_, t.scale_))
+                blocks.append(("numeric", list(columns), ops))
+            elif kind == "OrdinalEncoder":
+                if transformer.handle_unknown == "use_encoded_value":
+                    unknown = float(transformer.unknown_value)
+                else:
+                    unknown = None  # sklearn raises on unseen values; so do we
+                lookups = [{c: float(i) for i, c in enumerate(cats)} for cats in transformer.categories_]
+                blocks.append(("ordinal", list(columns), (lookups, unknown)))
+            elif kind == "OneHotEncoder":
+                if transformer.handle_unknown != "ignore" or transformer.drop_idx_ is not None:
+                    raise ValueError("Only OneHotEncoder(handle_unknown='ignore', drop=None) compiles")
+                lookups = [{c: i for i, c in enumerate(cats)} for cats in transformer.categories_]
+                blocks.append(("onehot", list(columns), lookups))
+            else:
+                raise ValueError(f"Cannot compile transformer {name!r} of type {kind}")
+        return cls(blocks)
+
+    def transform(self, X):
+        parts = []
+        for kind, columns, params in self.blocks:
+            if kind == "numeric":
+                values = np.column_stack([np.asarray(_column(X, c), dtype=np.float64) for c in columns])
+                for op, mean, scale in params:
+                    if op == "log1p":
+                        values = np.log1p(values)
+                    else:
+                        if mean is not None:
+                            values = values - mean
+                        if scale is not None:
+                            values = values / scale
+                parts.append(values)
+            elif kind == "ordinal":
+                lookups, unknown = params
+                for column, lookup in zip(columns, lookups):
+                    codes = [lookup.get(v, unknown) for v in _column(X, column)]
+                    if unknown is None and None in codes:
+                        raise ValueError(f"Unknown category in {column!r}")
+                    parts.append(np.array(codes, dtype=np.float64)[:, None])
+            else:
+                for column, lookup in zip(columns, params):
+                    codes = np.array([lookup.get(v, len(lookup)) for v in _column(X, column)])
+                    # Unknown categories hit the extra all-zero row, as handle_unknown="ignore" does
+                    parts.append(np.eye(len(lookup) + 1)[codes, :len(lookup)])
+        return np.hstack(parts)
+
+
+# --- Compiled stack ---
+class CompiledStack:
+    def __init__(self, arrays, meta, preprocess=None):
+        self.arrays = arrays
+        self.meta = meta
+        self.preprocess = preprocess
+        self.final_coef = np.asarray(meta["final"]["coef"])
+        self.final_intercept = meta["final"]["intercept"]
+        self._is_leaf = arrays["left"] == np.arange(len(arrays["left"]))
+        self.compiled_preprocess = None
+        if preprocess is not None:
+            try:
+                self.compiled_preprocess = CompiledPreprocess.from_column_transformer(preprocess)
+            except (ValueError, AttributeError):
+                pass  # unsupported step: keep sklearn's transform
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        preprocess, stack = pipeline.named_steps["preprocess"], pipeline.named_steps["model"]
+        final = stack.final_estimator_
+        if not hasattr(final, "coef_"):
+            raise ValueError(f"Cannot fold meta-model of type {type(final).__name__}")
+
+        names = [name for name, est in stack.estimators if est != "drop"]
+        learners = []
+        feature, threshold, left, value, roots = [], [], [], [], []
+        offset = 0
+        for name, est in zip(names, stack.estimators_):
+            meta, trees = export_estimator(name, est)
+            if trees is not None:
+                meta["tree_start"], meta["max_depth"] = len(roots), 0
+                for tree in trees:
+                    f, t, l, v, depth = _renumber(*tree, offset)
+                    feature.append(f)
+                    threshold.append(t)
+                    left.append(l)
+                    value.append(v)
+                    roots.append(offset)
+                    meta["max_depth"] = max(meta["max_depth"], depth)
+                    offset += len(f)
+                meta["tree_end"] = len(roots)
+            learners.append(meta)
+
+        arrays = {
+            "feature": np.concatenate(feature).astype(np.int32),
+            "threshold": np.concatenate(threshold).astype(np.float64),
+            "left": np.concatenate(left).astype(np.int32),
+            "value": np.concatenate(value).astype(np.float64),
+            "roots": np.array(roots, dtype=np.int32)
+        }
+        meta = {
+            "learners": learners,
+            "passthrough": bool(stack.passthrough),
+            "final": {"coef": np.ravel(final.coef_).tolist(), "intercept": float(np.ravel(final.intercept_)[0])}
+        }
+        return cls(arrays, meta, preprocess)
+
+    # --- Persistence: one .npy per array so they can be memory-mapped ---
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAY_NAMES:
+            np.save(os.path.join(directory, f"{name}.npy"), self.arrays[name])
+        with open(os.path.join(directory, "meta.json"), "w") as f:
+            json.dump(self.meta, f)
+        if self.preprocess is not None:
+            with open(os.path.join(directory, "preprocess.pkl"), "wb") as f:
+                pickle.dump(self.preprocess, f)
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r"):
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode) for name in ARRAY_NAMES}
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        preprocess = None
+        if os.path.exists(os.path.join(directory, "preprocess.pkl")):
+            with open(os.path.join(directory, "preprocess.pkl"), "rb") as f:
+                preprocess = pickle.load(f)
+        return cls(arrays, meta, preprocess)
+
+    # --- Prediction ---
+    def _tree_sum(self, X, learner):
+        """Sum of leaf values over one ensemble's trees, per row.
+
+        Walks every (row, tree) pair one level per step and drops pairs that reached
+        a leaf, so the cost follows the actual path lengths rather than the deepest tree.
+        """
+        a = self.arrays
+        feature, threshold, left, value = a["feature"], a["threshold"], a["left"], a["value"]
+        roots = a["roots"][learner["tree_start"]:learner["tree_end"]]
+        n_rows, n_trees = len(X), len(roots)
+
+        x_flat = X.ravel()
+        node = np.tile(roots, n_rows)
+        row_offset = np.repeat(np.arange(n_rows) * X.shape[1], n_trees)
+        slot = np.arange(n_rows * n_trees)
+        leaves = np.empty(n_rows * n_trees, dtype=np.int64)
+
+        for _ in range(learner["max_depth"] + 1):
+            at_leaf = self._is_leaf[node]
+            if at_leaf.any():
+                leaves[slot[at_leaf]] = node[at_leaf]
+                active = ~at_leaf
+                node, row_offset, slot = node[active], row_offset[active], slot[active]
+                if not len(node):
+                    break
+            node = left[node] + (x_flat[row_offset + feature[node]] > threshold[node])
+
+        return value[leaves].reshape(n_rows, n_trees).sum(axis=1)
+
+    def predict_transformed(self, Xt):
+        Xt = np.asarray(Xt, dtype=np.float64)
+        # sklearn and XGBoost trees both compare in float32
+        X_trees = np.ascontiguousarray(Xt.astype(np.float32), dtype=np.float64)
+
+        base_preds = []
+        for learner in self.meta["learners"]:
+            if learner["kind"] == "trees":
+                base_preds.append(learner["offset"] + learner["scale"] * self._tree_sum(X_trees, learner))
+            else:
+                base_preds.append(Xt @ np.asarray(learner["coef"]) + learner["intercept"])
+
+        stacked = np.column_stack(base_preds)
+        if self.meta["passthrough"]:
+            stacked = np.hstack([stacked, Xt])
+        return stacked @ self.final_coef + self.final_intercept
+
+    def predict(self, X):
+        """X: DataFrame, or a list of row dicts when the preprocessing is compiled."""
+        if self.compiled_preprocess is not None:
+            return self.predict_transformed(self.compiled_preprocess.transform(X))
+        if isinstance(X, list):
+            import pandas as pd
+            X = pd.DataFrame(X)
+        return self.predict_transformed(self.preprocess.transform(X))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python tree_compile.py stacking_model.pkl output_dir/")
+    with open(sys.argv[1], "rb") as f:
+        pipeline = pickle.load(f)
+    compiled = CompiledStack.from_pipeline(pipeline)
+    compiled.save(sys.argv[2])
+    depths = ", ".join(f"{l['name']}={l['max_depth']}" for l in compiled.meta["learners"] if l["kind"] == "trees")
+    print(f"✅ Compiled {len(compiled.arrays['roots'])} trees ({len(compiled.arrays['feature'])} nodes, "
+          f"max depth {depths}) to {sys.argv[2]}")
@@ -0,0 +1,247 @@
+"""Walk-forward backtest of every fare model on a historical trip log.
+
+The log is split into time partitions (calendar periods of --time-column, or equal row-order
+chunks when the log has no timestamps). Each partition is priced by:
+
+    rule              fare_rules.price_trips (the M2 formula)
+    fare_api_mileage  fare-api's mileage model -> distance / mileage * fuel price, as /predict_fare does
+    fare_api_forest   fare-api's fare_model.joblib as shipped
+    linear_regression, decision_tree, random_forest
+                      the notebook's models, refit on the partitions before it (expanding window,
+                      or the last --window partitions), so no model ever sees its own test trips
+
+Partitions are replayed in a process pool; each worker loads the log once. Results go to
+--output as Parquet:
+
+    errors.parquet      model x partition x segment: n, sums of errors, MAE / RMSE / bias / MAPE
+    summary.parquet     the same over all partitions
+    throughput.parquet  model x partition: fit and predict seconds, trips per second
+
+Usage:
+    python backtest.py fare_prediction_dataset.csv --partitions 5
+    python backtest.py trips.parquet --time-column completed_at --freq M --window 3 --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.tree import DecisionTreeRegressor
+
+from fare_rules import MIN_FARE, fare_features, price_trips
+
+FARE_API_DIR = os.getenv("FARE_API_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "fare-api"))
+sys.path.insert(0, FARE_API_DIR)
+from model_store import (CAR_TYPES, MILEAGE_FEATURES, ArtifactError, load_fare_model,  # noqa: E402
+                         load_mileage_model, mileage_features, train_mileage_model)
+from predictors import make_predictor  # noqa: E402
+
+SEGMENTS = ["car_type", "ride_type", "time_of_day", "area_supply_status"]
+TARGET = "actual_fare_paid"
+
+# Refit on each partition's history (same settings as the notebook)
+TRAINED_MODELS = {
+    "linear_regression": lambda: LinearRegression(),
+    "decision_tree": lambda: DecisionTreeRegressor(random_state=42),
+    "random_forest": lambda: RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=1),
+}
+
+# fare-api serving constants (main.py)
+API_MIN_MILEAGE = 17.0
+CAR_TYPE_ALIASES = {"Hatchback": "Hatch"}
+
+
+# --- Fixed models: priced the same way in every partition ---
+def rule_model(trips, X):
+    return price_trips(trips)["rule_fare"].to_numpy()
+
+
+class MileageFareModel:
+    """fare-api's mileage model turned into fares exactly like /predict_fare/batch."""
+
+    def __init__(self, path=None):
+        try:
+            model = load_mileage_model(path, allow_training=False)
+        except ArtifactError:
+            model = train_mileage_model()  # what fare-api builds with FARE_API_ALLOW_TRAINING=1
+        self.predictor = make_predictor(model, MILEAGE_FEATURES)
+
+    def __call__(self, trips, X):
+        fare = np.full(len(trips), np.nan)
+        car_type = trips["car_type"].replace(CAR_TYPE_ALIASES)
+        known = car_type.isin(CAR_TYPES).to_numpy()
+        if known.any():
+            features = mileage_features(X["vehicle_age"][known], car_type[known], trips["ride_type"][known])
+            mileage = np.maximum(self.predictor.predict(features), API_MIN_MILEAGE)
+            distance = X["trip_distance_km"].to_numpy()[known]
+            fare[known] = np.maximum(distance / mileage * X["fuel_price_per_litre"].to_numpy()[known], MIN_FARE)
+        return fare
+
+
+class FareForestModel:
+    def __init__(self, path=None):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # InconsistentVersionWarning: the artifact predates our sklearn
+            self.model = load_fare_model(path)
+
+    def __call__(self, trips, X):
+        return predict_complete(self.model, X)
+
+
+def predict_complete(model, X):
+    """Predict rows with every feature present; NaN elsewhere (unknown categories)."""
+    fare = np.full(len(X), np.nan)
+    complete = X.notna().all(axis=1).to_numpy()
+    if complete.any():
+        fare[complete] = model.predict(X[complete])
+    return fare
+
+
+# --- Worker state: the whole log, loaded once per process ---
+_trips = None
+_features = None
+_partitions = None
+_fixed_models = None
+
+
+def load_trips(path, time_column=None, freq="M", n_partitions=5):
+    """Trips sorted by time plus a partition label per row."""
+    if path.endswith(".parquet") or os.path.isdir(path):
+        trips = pd.read_parquet(path, memory_map=True)
+    else:
+        trips = pd.read_csv(path)
+    trips = trips.dropna(subset=[TARGET])
+
+    if time_column and time_column in trips:
+        when = pd.to_datetime(trips[time_column])
+        trips = trips.assign(**{time_column: when}).sort_values(time_column, kind="stable")
+        labels = trips[time_column].dt.to_period(freq).astype(str)
+    else:
+        # No timestamps: the log is append-only, so row order is time order
+        labels = pd.Series(np.arange(len(trips)) * n_partitions // max(len(trips), 1), index=trips.index)
+        labels = "rows " + labels.astype(str)
+    codes, names = pd.factorize(labels, sort=False)
+    return trips.reset_index(drop=True), codes, list(names)
+
+
+def _init_worker(path, time_column, freq, n_partitions, model_paths):
+    global _trips, _features, _partitions, _fixed_models
+    _trips, _partitions, _ = load_trips(path, time_column, freq, n_partitions)
+    _features = fare_features(_trips)
+    _fixed_models = {
+        "rule": rule_model,
+        "fare_api_mileage": MileageFareModel(model_paths.get("mileage")),
+        "fare_api_forest": FareForestModel(model_paths.get("fare")),
+    }
+
+
+def segment_errors(trips, actual, predicted):
+    """Per-segment sufficient statistics, so partitions can be summed into the overall table."""
+    error = predicted - actual
+    frame = pd.DataFrame({
+        "priced": ~np.isnan(error),
+        "abs_error": np.abs(error),
+        "sq_error": error ** 2,
+        "error": error,
+        "ape": np.abs(error) / actual
+    })
+    tables = [frame.sum().to_frame().T.assign(segment="all", value="all", n=len(frame))]
+    for column in SEGMENTS:
+        grouped = frame.groupby(trips[column].astype(str).to_numpy())
+        table = grouped.sum().assign(n=grouped.size())
+        tables.append(table.rename_axis("value").reset_index().assign(segment=column))
+    table = pd.concat(tables, ignore_index=True).astype({"n": int, "priced": int})
+    return table[["segment", "value", "n", "priced", "abs_error", "sq_error", "error", "ape"]]
+
+
+def replay_partition(k, window):
+    """Score every model on partition k; trained models are fit on the partitions before it."""
+    test = _partitions == k
+    history = (_partitions < k) & (_partitions >= (k - window if window else 0))
+    trips, X = _trips[test], _features[test]
+    actual = trips[TARGET].to_numpy(dtype=float)
+
+    errors, timings = [], []
+
+    def score(name, predict, fit_seconds=0.0, n_train=0):
+        start = time.perf_counter()
+        predicted = predict(trips, X)
+        predict_seconds = time.perf_counter() - start
+        errors.append(segment_errors(trips, actual, predicted).assign(model=name, partition=k))
+        timings.append({"model": name, "partition": k, "n_train": n_train, "n_test": len(trips),
+                        "fit_seconds": fit_seconds, "predict_seconds": predict_seconds,
+                        "trips_per_second": len(trips) / predict_seconds if predict_seconds else np.nan})
+
+    for name, model in _fixed_models.items():
+        score(name, model)
+
+    X_train = _features[history]
+    keep = X_train.notna().all(axis=1).to_numpy()
+    X_train, y_train = X_train[keep], _trips[TARGET][history][keep]
+    if len(y_train):
+        for name, make_model in TRAINED_MODELS.items():
+            start = time.perf_counter()
+            model = make_model().fit(X_train, y_train)
+            score(name, lambda trips, X: predict_complete(model, X), time.perf_counter() - start, len(y_train))
+
+    return pd.concat(errors, ignore_index=True), pd.DataFrame(timings)
+
+
+def with_metrics(table):
+    priced = table["priced"].where(table["priced"] > 0)
+    return table.assign(
+        mae=table["abs_error"] / priced,
+        rmse=np.sqrt(table["sq_error"] / priced),
+        bias=table["error"] / priced,
+        mape=100 * table["ape"] / priced
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the fare models on a trip log")
+    parser.add_argument("trips", help="Trip log: CSV, Parquet file or Parquet directory with actual_fare_paid")
+    parser.add_argument("--time-column", default="completed_at",
+                        help="Timestamp column to partition on (row order if the log has none)")
+    parser.add_argument("--freq", default="M", help="Partition period for --time-column (pandas period alias)")
+    parser.add_argument("--partitions", type=int, default=5, help="Row-order partitions when there is no timestamp")
+    parser.add_argument("--window", type=int, default=0, help="Partitions of history to refit on (0: all)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--mileage-model", default=os.getenv("MILEAGE_MODEL_PATH"))
+    parser.add_argument("--fare-model", default=os.getenv("FARE_MODEL_PATH"))
+    parser.add_argument("--output", default="backtest_results")
+    args = parser.parse_args()
+
+    _, codes, names = load_trips(args.trips, args.time_column, args.freq, args.partitions)
+    print(f"🚕 {len(codes):,} trips in {len(names)} partitions, {args.workers} workers")
+
+    start = time.perf_counter()
+    init_args = (args.trips, args.time_column, args.freq, args.partitions,
+                 {"mileage": args.mileage_model, "fare": args.fare_model})
+    with ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=init_args) as pool:
+        results = list(pool.map(replay_partition, range(len(names)), [args.window] * len(names)))
+    elapsed = time.perf_counter() - start
+
+    errors = pd.concat([e for e, _ in results], ignore_index=True)
+    throughput = pd.concat([t for _, t in results], ignore_index=True)
+    errors["partition"] = errors["partition"].map(dict(enumerate(names)))
+    throughput["partition"] = throughput["partition"].map(dict(enumerate(names)))
+    stats = ["n", "priced", "abs_error", "sq_error", "error", "ape"]
+    summary = errors.groupby(["model", "segment", "value"], sort=False)[stats].sum().reset_index()
+
+    os.makedirs(args.output, exist_ok=True)
+    with_metrics(errors).to_parquet(os.path.join(args.output, "errors.parquet"), index=False)
+    summary = with_metrics(summary)
+    summary.to_parquet(os.path.join(args.output, "summary.parquet"), index=False)
+    throughput.to_parquet(os.path.join(args.output, "throughput.parquet"), index=False)
+
+    overall = summary[summary["segment"] == "all"].set_index("model")
+    rates = throughput.groupby("model", sort=False)[["n_test", "predict_seconds", "fit_seconds"]].sum()
+    overall = overall.join(rates.assign(trips_per_second=rates["n_test"] / rates["predict_seconds"]))
+    print(overall[["priced", "mae", "rmse", "bias", "mape", "fit_seconds", "trips_per_second"]].round(2).to_string())
+    print(f"✅ {len(codes) / elapsed:,.0f} trips/s replayed in {elapsed:.1f}s, results in {args.output}/")
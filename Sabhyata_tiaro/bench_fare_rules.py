@@ -0,0 +1,55 @@
+"""Rule fare: the notebook's per-row .apply / .map code vs fare_rules, with a parity check.
+
+Usage: python bench_fare_rules.py [fare_prediction_dataset.csv] [rows ...]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from fare_rules import price_trips
+
+
+def notebook_rule_fare(df):
+    # Copied from fair_prediction_(2).py
+    df = df.copy()
+    df['claimed_mileage_kmpl'] = df['claimed_mileage_kmpl'].replace(0, np.nan)
+    df['vehicle_age'] = 2025 - df['year_of_manufacture']
+    df['age_factor'] = df['vehicle_age'].apply(lambda x: max(0.7, 1.0 - 0.05 * x))
+    df['AC_factor'] = df['AC_on'].apply(lambda x: 1.05 if x else 1.0)
+    df['ride_type_factor'] = df['ride_type'].map({'Shared': 1.0, 'Exclusive': 1.2})
+    df['car_type_factor'] = df['car_type'].map({'Hatch': 1.0, 'Sedan': 1.1, 'SUV': 1.2})
+    df['time_of_day_factor'] = df['time_of_day'].apply(lambda t: 1.2 if str(t).lower() in ['morning', 'evening'] else 1.0)
+    df['day_type_factor'] = df['day_type'].apply(lambda x: 1.1 if x == 'Weekend' else 1.0)
+    df['area_surge'] = df['area_supply_status'].map({'High': 0.1, 'Medium': 0.0, 'Low': -0.1})
+    df['M2'] = (df['age_factor'] * df['AC_factor'] * df['ride_type_factor'] *
+                df['car_type_factor'] * df['time_of_day_factor'] * df['day_type_factor']) + df['area_surge']
+    return ((df['trip_distance_km'] / df['claimed_mileage_kmpl']) *
+            df['fuel_price_per_litre'] * df['M2']).apply(lambda x: max(x, 40))
+
+
+def seconds(fn, df):
+    start = time.perf_counter()
+    fn(df)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "fare_prediction_dataset.csv"
+    sizes = [int(n) for n in sys.argv[2:]] or [100_000, 1_000_000, 5_000_000]
+    trips = pd.read_csv(path)
+
+    # Parity on every trip the notebook can price ("Hatchback" / "Normal" come out NaN there)
+    old, new = notebook_rule_fare(trips), price_trips(trips)["rule_fare"]
+    priced = old.notna()
+    np.testing.assert_allclose(new[priced], old[priced], rtol=1e-12)
+    print(f"✅ Parity OK on {priced.sum()} of {len(trips)} trips "
+          f"(the notebook gives NaN for the other {(~priced).sum()}; fare_rules prices {new.notna().sum()})")
+
+    print(f"\n{'trips':>12}{'apply s':>10}{'fare_rules s':>14}{'speedup':>9}{'trips/s':>14}")
+    for n in sizes:
+        big = trips.sample(n, replace=True, random_state=0).reset_index(drop=True)
+        t_old = seconds(notebook_rule_fare, big)
+        t_new = seconds(price_trips, big)
+        print(f"{n:>12,}{t_old:>10.2f}{t_new:>14.3f}{t_old / t_new:>8.0f}x{n / t_new:>14,.0f}")
@@ -0,0 +1,127 @@
+"""Rule-based fare engine: M2 multiplier and minimum-fare rule over whole columns.
+
+    M2   = age_factor * AC_factor * ride_type_factor * car_type_factor
+           * time_of_day_factor * day_type_factor + area_surge
+    fare = max(trip_distance_km / claimed_mileage_kmpl * fuel_price_per_litre * M2, 40)
+
+Categorical factors are lookup tables applied via pd.factorize, so a column of millions of
+trips costs one hash pass plus a table take. Every function accepts NumPy arrays, Series or
+lists; price_trips() works on a trips DataFrame and quote_fare() is the single-trip wrapper.
+"""
+import numpy as np
+import pandas as pd
+
+MIN_FARE = 40.0
+REFERENCE_YEAR = 2025  # vehicle_age = REFERENCE_YEAR - year_of_manufacture
+
+# --- Lookup tables (keys are lower-cased) ---
+RIDE_TYPE_FACTORS = {"shared": 1.0, "exclusive": 1.2}
+# The dataset says "Hatchback", the apps say "Hatch"
+CAR_TYPE_FACTORS = {"hatch": 1.0, "hatchback": 1.0, "sedan": 1.1, "suv": 1.2}
+TIME_OF_DAY_FACTORS = {"morning": 1.2, "evening": 1.2, "rush hour": 1.2}  # anything else: 1.0
+DAY_TYPE_FACTORS = {"weekend": 1.1}  # anything else: 1.0
+# "Normal" is what the dataset calls the notebook's "Medium"
+AREA_SURGE = {"high": 0.1, "medium": 0.0, "normal": 0.0, "low": -0.1}
+
+# Feature layout the notebook's LR / tree / forest models (and fare-api's fare_model.joblib) are fit on
+FARE_FEATURES = ['trip_distance_km', 'claimed_mileage_kmpl', 'fuel_price_per_litre',
+                 'vehicle_age', 'AC_on', 'ride_type_factor', 'car_type_factor',
+                 'time_of_day_factor', 'day_type_factor', 'area_surge']
+
+AGE_FACTOR_PER_YEAR = 0.05
+MIN_AGE_FACTOR = 0.7
+AC_FACTOR = 1.05
+
+
+def lookup(values, table, default=np.nan):
+    """Map a column of labels through `table` (case-insensitive); unknown or missing -> default."""
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object) if isinstance(values, list) else values)
+    factors = np.array([table.get(str(label).lower(), default) for label in uniques] + [default], dtype=float)
+    return factors[codes]  # code -1 (missing) picks the trailing default
+
+
+# --- Factors ---
+def age_factor(vehicle_age):
+    return np.maximum(MIN_AGE_FACTOR, 1.0 - AGE_FACTOR_PER_YEAR * np.asarray(vehicle_age, dtype=float))
+
+
+def ac_factor(ac_on):
+    return np.where(np.asarray(ac_on, dtype=bool), AC_FACTOR, 1.0)
+
+
+def m2_multiplier(vehicle_age, ac_on, ride_type, car_type, time_of_day, day_type, area_supply_status=None,
+                  area_surge=None):
+    """M2 per trip. Pass either area_supply_status labels or numeric area_surge values."""
+    if area_surge is None:
+        area_surge = lookup(area_supply_status, AREA_SURGE) if area_supply_status is not None else 0.0
+    return (
+        age_factor(vehicle_age)
+        * ac_factor(ac_on)
+        * lookup(ride_type, RIDE_TYPE_FACTORS)
+        * lookup(car_type, CAR_TYPE_FACTORS)
+        * lookup(time_of_day, TIME_OF_DAY_FACTORS, 1.0)
+        * lookup(day_type, DAY_TYPE_FACTORS, 1.0)
+    ) + np.asarray(area_surge, dtype=float)
+
+
+def rule_fare(trip_distance_km, claimed_mileage_kmpl, fuel_price_per_litre, m2, min_fare=MIN_FARE):
+    base_fare = (np.asarray(trip_distance_km, dtype=float) / np.asarray(claimed_mileage_kmpl, dtype=float)
+                 * np.asarray(fuel_price_per_litre, dtype=float) * m2)
+    # fmax keeps NaN (unknown category) as NaN instead of turning it into the minimum fare
+    return np.where(np.isnan(base_fare), np.nan, np.fmax(base_fare, min_fare))
+
+
+def depreciation_multiplier(predicted_price, original_price, ratio=1.0):
+    """M1 from the resale-price app: 1 + ratio * (1 - 0.9 * predicted / original)."""
+    predicted_price = np.asarray(predicted_price, dtype=float)
+    return 1.0 + ratio * (1.0 - predicted_price * 0.9 / np.asarray(original_price, dtype=float))
+
+
+# --- Whole trip tables ---
+def price_trips(trips, min_fare=MIN_FARE):
+    """DataFrame in the fare_prediction_dataset.csv layout -> DataFrame with vehicle_age, M2, rule_fare."""
+    if "vehicle_age" in trips:
+        vehicle_age = trips["vehicle_age"].to_numpy(dtype=float)
+    else:
+        vehicle_age = REFERENCE_YEAR - trips["year_of_manufacture"].to_numpy(dtype=float)
+    m2 = m2_multiplier(
+        vehicle_age, trips["AC_on"], trips["ride_type"], trips["car_type"], trips["time_of_day"],
+        trips["day_type"], trips.get("area_supply_status"), trips.get("area_surge")
+    )
+    # Zero mileage would divide by zero; the notebook drops those trips, so they price as NaN
+    mileage = trips["claimed_mileage_kmpl"].to_numpy(dtype=float)
+    mileage = np.where(mileage == 0, np.nan, mileage)
+    fare = rule_fare(trips["trip_distance_km"], mileage, trips["fuel_price_per_litre"], m2, min_fare)
+    return pd.DataFrame({"vehicle_age": vehicle_age, "M2": m2, "rule_fare": fare}, index=trips.index)
+
+
+def fare_features(trips):
+    """FARE_FEATURES frame for the ML fare models; unknown categories come out NaN."""
+    if "vehicle_age" in trips:
+        vehicle_age = trips["vehicle_age"].to_numpy(dtype=float)
+    else:
+        vehicle_age = REFERENCE_YEAR - trips["year_of_manufacture"].to_numpy(dtype=float)
+    return pd.DataFrame({
+        "trip_distance_km": trips["trip_distance_km"].to_numpy(dtype=float),
+        "claimed_mileage_kmpl": trips["claimed_mileage_kmpl"].to_numpy(dtype=float),
+        "fuel_price_per_litre": trips["fuel_price_per_litre"].to_numpy(dtype=float),
+        "vehicle_age": vehicle_age,
+        "AC_on": np.asarray(trips["AC_on"], dtype=bool),
+        "ride_type_factor": lookup(trips["ride_type"], RIDE_TYPE_FACTORS),
+        "car_type_factor": lookup(trips["car_type"], CAR_TYPE_FACTORS),
+        "time_of_day_factor": lookup(trips["time_of_day"], TIME_OF_DAY_FACTORS, 1.0),
+        "day_type_factor": lookup(trips["day_type"], DAY_TYPE_FACTORS, 1.0),
+        "area_surge": lookup(trips["area_supply_status"], AREA_SURGE)
+    }, index=trips.index)
+
+
+def quote_fare(trip_distance_km, claimed_mileage_kmpl, fuel_price_per_litre, vehicle_age, ac_on, ride_type,
+               car_type, time_of_day="Normal", day_type="Weekday", area_supply_status=None, area_surge=0.0,
+               min_fare=MIN_FARE):
+    """Single trip -> fare in rupees (NaN for an unknown ride/car type)."""
+    if area_supply_status is not None:
+        area_surge = None
+    m2 = m2_multiplier([vehicle_age], [ac_on], [ride_type], [car_type], [time_of_day], [day_type],
+                       [area_supply_status] if area_supply_status is not None else None,
+                       [area_surge] if area_surge is not None else None)
+    return float(rule_fare(trip_distance_km, claimed_mileage_kmpl, fuel_price_per_litre, m2, min_fare)[0])
@@ -0,0 +1,85 @@
+"""Parity report + micro-benchmark for the sklearn, compiled and precomputed-table mileage predictors.
+
+The table is compared with the live model on every grid cell and on off-grid rows (which it
+must hand to the model). The same checks gate CI in tests/test_predictors.py.
+
+Usage: python bench_predict.py [n_calls]
+"""
+import sys
+import time
+
+import numpy as np
+
+from model_store import MILEAGE_FEATURES, ArtifactError, load_mileage_model, train_mileage_model
+from predictors import TABLE_AGES, CompiledLinearPredictor, SklearnPredictor, TablePredictor
+
+
+def sample_rows(n, seed=0):
+    rng = np.random.RandomState(seed)
+    return np.column_stack([
+        rng.randint(0, 20, n),
+        np.full(n, 1.2),
+        rng.choice([1.0, 1.2], n),
+        rng.choice([1.0, 1.1, 1.2], n),
+        np.full(n, 1.0)
+    ]).astype(float)
+
+
+def grid_and_off_grid_rows():
+    ages, cars, rides = np.meshgrid(np.arange(TABLE_AGES), [1.0, 1.1, 1.2], [1.0, 1.2], indexing="ij")
+    grid = np.column_stack([ages.ravel(), np.full(ages.size, 1.2), rides.ravel(), cars.ravel(), np.full(ages.size, 1.0)])
+    off_grid = np.array([
+        [TABLE_AGES, 1.2, 1.0, 1.0, 1.0],  # age past the table
+        [45, 1.2, 1.2, 1.2, 1.0],
+        [-1, 1.2, 1.0, 1.1, 1.0],
+        [3.5, 1.2, 1.0, 1.1, 1.0],  # fractional age
+        [3, 1.0, 1.0, 1.1, 1.0],  # AC off
+        [3, 1.2, 1.0, 1.1, 1.3],  # other time of day
+        [3, 1.2, 1.1, 1.1, 1.0],  # unknown ride factor
+        [3, 1.2, 1.0, 1.15, 1.0]  # unknown car factor
+    ])
+    return np.vstack([grid, off_grid])
+
+
+def check_parity(name, reference, candidate, rows, tol=1e-9):
+    batch_diff = np.max(np.abs(reference.predict(rows) - candidate.predict(rows)))
+    single_diff = max(abs(reference.predict_one(r) - candidate.predict_one(r)) for r in rows[:200])
+    status = "✅" if max(batch_diff, single_diff) <= tol else "❌"
+    print(f"{status} {name} parity (max abs diff: batch {batch_diff:.2e}, single {single_diff:.2e})")
+
+
+def time_calls(predict_one, rows):
+    timings = np.empty(len(rows))
+    for i, row in enumerate(rows):
+        start = time.perf_counter()
+        predict_one(row)
+        timings[i] = time.perf_counter() - start
+    return timings * 1e6  # µs
+
+
+if __name__ == "__main__":
+    n_calls = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    try:
+        model = load_mileage_model()
+    except ArtifactError:
+        model = train_mileage_model()
+
+    reference = SklearnPredictor(model, MILEAGE_FEATURES)
+    compiled = CompiledLinearPredictor(model, MILEAGE_FEATURES)
+    table = TablePredictor(compiled, MILEAGE_FEATURES)
+    rows = sample_rows(n_calls)
+    grid_rows = grid_and_off_grid_rows()
+
+    check_parity("compiled", reference, compiled, rows)
+    check_parity("table", reference, table, rows)
+    check_parity("table (full grid + off-grid)", reference, table, grid_rows)
+    # A table over the sklearn path, i.e. what FARE_API_PREDICTOR=sklearn serves
+    check_parity("table over sklearn", reference, TablePredictor(reference, MILEAGE_FEATURES), grid_rows)
+
+    print(f"\n{'path':<10}{'p50 (µs)':>12}{'p99 (µs)':>12}")
+    for name, predictor in [("sklearn", reference), ("compiled", compiled), ("table", table)]:
+        # sklearn is hundreds of times slower per call, so cap its sample size
+        sample = rows if name != "sklearn" else rows[:min(n_calls, 2000)]
+        timings = time_calls(predictor.predict_one, sample.tolist())  # plain lists, as the endpoint builds them
+        print(f"{name:<10}{np.percentile(timings, 50):>12.2f}{np.percentile(timings, 99):>12.2f}")
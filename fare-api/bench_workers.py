@@ -0,0 +1,204 @@
+"""Memory per worker and aggregate throughput as the worker count grows: serve.py vs uvicorn --workers.
+
+For each mode and worker count the server is started on a free port, loaded for --duration
+seconds by --clients load-generator processes, then its process tree is measured from
+/proc/<pid>/smaps_rollup (Linux only):
+    PSS total   shared pages split between the processes that map them; sums to real usage
+    USS/worker  pages only that worker holds, i.e. what one more worker costs
+
+Usage: python bench_workers.py [--workers 1,2,4] [--duration 5] [--endpoint single|batch]
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+
+from model_store import MILEAGE_FEATURES, save_artifact, train_mileage_model
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CAR_TYPES = ["Hatch", "Sedan", "SUV"]
+
+
+# --- Process tree memory ---
+def children_map():
+    children = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError):
+                continue
+            children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def descendants(pid):
+    tree, stack, found = children_map(), [pid], []
+    while stack:
+        for child in tree.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def memory_kb(pid):
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {"rss": fields["Rss"], "pss": fields["Pss"],
+            "uss": fields["Private_Clean"] + fields["Private_Dirty"]}
+
+
+def cmdline(pid):
+    with open(f"/proc/{pid}/cmdline", "rb") as f:
+        return f.read().replace(b"\0", b" ").decode(errors="replace")
+
+
+def worker_pids(root):
+    """Processes serving requests: the root itself when it has no children (uvicorn, 1 worker)."""
+    pids = [p for p in descendants(root) if "resource_tracker" not in cmdline(p)]
+    return pids or [root]
+
+
+# --- Load generator (one per client process) ---
+def fare_trip(rng):
+    return {"trip_distance_km": round(rng.uniform(2, 40), 1), "fuel_price_per_litre": 100.0,
+            "vehicle_age": rng.randrange(20), "car_type": rng.choice(CAR_TYPES),
+            "ride_type": rng.choice(["Shared", "Exclusive"])}
+
+
+async def drive(url, endpoint, batch_size, concurrency, duration, seed):
+    path = "/predict_fare" if endpoint == "single" else "/predict_fare/batch"
+    done = errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def connection(client, rng):
+        nonlocal done, errors
+        while time.perf_counter() < deadline:
+            body = fare_trip(rng) if endpoint == "single" else {"trips": [fare_trip(rng) for _ in range(batch_size)]}
+            response = await client.post(path, json=body)
+            done += 1
+            errors += response.status_code != 200
+
+    # One client (and pool) per connection, so the kernel spreads the connections over the workers
+    clients = [httpx.AsyncClient(base_url=url, timeout=30) for _ in range(concurrency)]
+    try:
+        await asyncio.gather(*(connection(c, random.Random(seed * 1000 + i)) for i, c in enumerate(clients)))
+    finally:
+        for client in clients:
+            await client.aclose()
+    return done, errors
+
+
+def run_client(*args):
+    return asyncio.run(drive(*args))
+
+
+# --- One server run ---
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode, workers, port, env):
+    if mode == "serve.py":
+        command = [sys.executable, "serve.py", "--workers", str(workers), "--port", str(port), "--log-level", "warning"]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers),
+                   "--log-level", "warning"]
+    return subprocess.Popen(command, cwd=HERE, env=env, stdout=subprocess.DEVNULL)
+
+
+def wait_ready(proc, url, workers, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Server exited with {proc.returncode}")
+        try:
+            if httpx.get(url, timeout=1).status_code == 200 and len(worker_pids(proc.pid)) >= workers:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"{url} not ready with {workers} workers after {timeout}s")
+
+
+def bench(mode, workers, args, env):
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    proc = start_server(mode, workers, port, env)
+    try:
+        start = time.perf_counter()
+        wait_ready(proc, url, workers)
+        startup = time.perf_counter() - start
+
+        per_client = max(1, args.concurrency // args.clients)
+        with ProcessPoolExecutor(args.clients) as pool:
+            futures = [pool.submit(run_client, url, args.endpoint, args.batch_size, per_client, args.duration, seed)
+                       for seed in range(args.clients)]
+            results = [f.result() for f in futures]
+        requests, errors = map(sum, zip(*results))
+
+        # Measured after serving, so pages the workers dirtied while handling requests are counted
+        pids = [proc.pid] + descendants(proc.pid)
+        memory = {pid: memory_kb(pid) for pid in pids}
+        served_by = worker_pids(proc.pid)
+        rows = requests * (1 if args.endpoint == "single" else args.batch_size)
+        return {
+            "startup_s": startup,
+            "rps": requests / args.duration,
+            "rows_per_s": rows / args.duration,
+            "errors": errors,
+            "pss_total_mb": sum(m["pss"] for m in memory.values()) / 1024,
+            "uss_per_worker_mb": sum(memory[p]["uss"] for p in served_by) / len(served_by) / 1024,
+            "rss_per_worker_mb": sum(memory[p]["rss"] for p in served_by) / len(served_by) / 1024
+        }
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-worker memory and throughput vs worker count")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--modes", default="uvicorn,serve.py")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=32, help="Open connections across all clients")
+    parser.add_argument("--clients", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="Load-generator processes")
+    parser.add_argument("--endpoint", choices=["single", "batch"], default="single")
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-workers-")
+    model_path = os.path.join(workdir, "mileage_model.joblib")
+    save_artifact(train_mileage_model(), model_path, MILEAGE_FEATURES)
+    env = dict(os.environ, MILEAGE_MODEL_PATH=model_path, SHADOW_FRACTION="0")
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)  # serve.py makes a fresh one per run
+
+    print(f"⏳ {args.endpoint} requests, {args.concurrency} connections from {args.clients} client process(es), "
+          f"{args.duration:.0f}s per run, {os.cpu_count()} CPUs")
+    print(f"\n{'mode':<10}{'workers':>8}{'startup s':>11}{'req/s':>10}{'rows/s':>10}{'errors':>8}"
+          f"{'PSS total MB':>14}{'USS/worker MB':>15}{'RSS/worker MB':>15}")
+    for mode in args.modes.split(","):
+        for workers in map(int, args.workers.split(",")):
+            r = bench(mode, workers, args, env)
+            print(f"{mode:<10}{workers:>8}{r['startup_s']:>11.1f}{r['rps']:>10,.0f}{r['rows_per_s']:>10,.0f}"
+                  f"{r['errors']:>8}{r['pss_total_mb']:>14.1f}{r['uss_per_worker_mb']:>15.1f}"
+                  f"{r['rss_per_worker_mb']:>15.1f}", flush=True)
@@ -1,34 +1,47 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException
 from pydantic import BaseModel
+from typing import List, Optional, Union
+import os
+import sys
 import numpy as np
-import pandas as pd
-from sklearn.linear_model import LinearRegression
-
-app = FastAPI()
-
-# ✅ Simulate training
-np.random.seed(42)
-n = 500
-train_df = pd.DataFrame({
-    'vehicle_age': np.random.randint(0, 20, n),
-    'ac_factor': np.full(n, 1.2),
-    'ride_type_factor': np.random.choice([1.0, 1.2], n),
-    'car_type_factor': np.random.choice([1.0, 1.1, 1.2], n),
-    'time_of_day_factor': np.full(n, 1.0)
-})
+SHARED_DIR = os.getenv("SHARED_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+sys.path.insert(0, SHARED_DIR)  # instrument.py lives in ../shared, used by both services
+from instrument import MetricsMiddleware, metrics_endpoint, register_stats, stage  # noqa: E402
+from model_store import DEFAULT_MODEL_PATH, MILEAGE_FEATURES, mileage_features
+from registry import ModelRegistry
+
+# ✅ Model registry (see registry.py): the artifact in MODELS_DIR is watched and swapped in
+# without a restart; a candidate file next to it is shadow-scored on a sample of traffic
+FEATURES = MILEAGE_FEATURES
+MODEL_PATH = os.getenv("MILEAGE_MODEL_PATH", DEFAULT_MODEL_PATH)
+MODELS_DIR = os.path.dirname(os.path.abspath(MODEL_PATH))
+MODEL_CANDIDATE_NAME = os.getenv("MODEL_CANDIDATE_NAME", "mileage_model.candidate.joblib")
+MODEL_RELOAD_SECONDS = float(os.getenv("MODEL_RELOAD_SECONDS", 5))  # 0 disables the watch
+SHADOW_FRACTION = float(os.getenv("SHADOW_FRACTION", 0.1))
+ADMIN_TOKEN = os.getenv("FARE_API_ADMIN_TOKEN")  # admin endpoints are off unless set
+
+registry = ModelRegistry(MODELS_DIR, FEATURES, os.path.basename(MODEL_PATH), MODEL_CANDIDATE_NAME,
+                         poll_seconds=MODEL_RELOAD_SECONDS, shadow_fraction=SHADOW_FRACTION)
 
-train_df['mileage'] = (
-    21
-    - 0.5 * train_df['vehicle_age']
-    - 2.0 * (train_df['ac_factor'] - 1.0)
-    - 1.5 * (train_df['car_type_factor'] - 1.0)
-    - 1.0 * (train_df['ride_type_factor'] - 1.0)
-    - 0.5 * (train_df['time_of_day_factor'] - 1.0)
-    + np.random.normal(0, 0.5, n)
-).clip(lower=8, upper=25)
 
-model = LinearRegression()
-model.fit(train_df[['vehicle_age', 'ac_factor', 'ride_type_factor', 'car_type_factor', 'time_of_day_factor']], train_df['mileage'])
+@asynccontextmanager
+async def lifespan(app):
+    registry.start()
+    yield
+    registry.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+register_stats("model_registry", lambda: {
+    "swaps": registry.swaps,
+    "candidate_loaded": registry.candidate is not None,
+    "shadow_dropped_batches": registry.divergence.dropped
+})
+
+MIN_MILEAGE = 17.0
+MIN_FARE = 40.0
 
 
 class FareInput(BaseModel):
@@ -39,24 +52,64 @@ class FareInput(BaseModel):
     ride_type: str  # "Shared" or "Exclusive"
 
 
+class FareBatchInput(BaseModel):
+    trips: List[FareInput]
+
+
+class FareColumns(BaseModel):
+    trip_distance_km: List[float]
+    fuel_price_per_litre: List[float]
+    vehicle_age: List[int]
+    car_type: List[str]
+    ride_type: List[str]
+
+
+def predict_fares(trip_distance_km, fuel_price_per_litre, vehicle_age, car_type, ride_type):
+    """Vectorized version of /predict_fare: one model call for the whole batch."""
+    distance = np.asarray(trip_distance_km, dtype=float)
+    fuel_price = np.asarray(fuel_price_per_litre, dtype=float)
+
+    try:
+        with stage("feature_prep"):
+            X = mileage_features(vehicle_age, car_type, ride_type)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    # One registry read per request: a swap mid-request can't mix two models
+    version = registry.active
+    with stage("model_predict"):
+        raw_mileage = version.predictor.predict(X)
+    registry.shadow(X, raw_mileage)
+    mileage = np.maximum(raw_mileage, MIN_MILEAGE)
+    fare = np.maximum(distance / mileage * fuel_price, MIN_FARE)
+    return mileage, fare
+
+
 @app.get("/")
 def root():
     return {"message": "✅ Fare & Mileage API is live"}
 
 
+@app.get("/metrics")
+def metrics():
+    return metrics_endpoint()
+
+
 @app.post("/predict_fare")
 def predict_fare(data: FareInput):
-    # Prepare input features
-    user_X = pd.DataFrame([{
-        "vehicle_age": data.vehicle_age,
-        "ac_factor": 1.2,
-        "ride_type_factor": 1.0 if data.ride_type == "Shared" else 1.2,
-        "car_type_factor": {"Hatch": 1.0, "Sedan": 1.1, "SUV": 1.2}[data.car_type],
-        "time_of_day_factor": 1.0
-    }])
+    # Prepare input features (FEATURES order)
+    user_X = [
+        data.vehicle_age,
+        1.2,
+        1.0 if data.ride_type == "Shared" else 1.2,
+        {"Hatch": 1.0, "Sedan": 1.1, "SUV": 1.2}[data.car_type],
+        1.0
+    ]
 
     # Predict mileage
-    predicted_mileage = float(model.predict(user_X)[0])
+    with stage("model_predict"):
+        predicted_mileage = registry.active.predictor.predict_one(user_X)
+    registry.shadow([user_X], [predicted_mileage])
     predicted_mileage = max(predicted_mileage, 17.0)  # 👈 clamp to minimum 17
 
     # Estimate fare
@@ -69,3 +122,91 @@ def predict_fare(data: FareInput):
         "fare_estimate": round(final_fare, 2)
     }
 
+
+@app.post("/predict_fare/batch")
+def predict_fare_batch(data: Union[FareBatchInput, FareColumns]):
+    if isinstance(data, FareBatchInput):
+        columns = {field: [getattr(trip, field) for trip in data.trips] for field in FareColumns.model_fields}
+    else:
+        columns = data.model_dump()
+        if len({len(values) for values in columns.values()}) > 1:
+            raise HTTPException(status_code=422, detail="All columns must have the same length")
+
+    if not columns["trip_distance_km"]:
+        return {"results": []}
+
+    mileage, fare = predict_fares(**columns)
+
+    # Results come back in the same order as the input trips
+    return {
+        "results": [
+            {"predicted_mileage": round(m, 2), "fare_estimate": round(f, 2)}
+            for m, f in zip(mileage.tolist(), fare.tolist())
+        ]
+    }
+
+
+# --- Admin: explicit swaps and shadow control (header X-Admin-Token) ---
+class ModelRequest(BaseModel):
+    name: Optional[str] = None  # file name inside MODELS_DIR; default: the watched artifact
+    shadow_fraction: Optional[float] = None
+
+
+def check_admin(token):
+    if not ADMIN_TOKEN or token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled or the token is wrong")
+
+
+def model_path(name, default):
+    if name is None:
+        return default
+    # Only files inside MODELS_DIR: artifacts are pickles, so never load an arbitrary path
+    if os.path.basename(name) != name:
+        raise HTTPException(status_code=422, detail="name must be a file name inside MODELS_DIR")
+    return os.path.join(MODELS_DIR, name)
+
+
+def swap(load, path):
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail=f"{path} not found")
+    try:
+        return load(path).info()
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Rejected {path}: {e}")
+
+
+@app.get("/admin/models")
+def models_status(x_admin_token: Optional[str] = Header(None)):
+    check_admin(x_admin_token)
+    return registry.status()
+
+
+@app.post("/admin/models/activate")
+def activate_model(data: ModelRequest, x_admin_token: Optional[str] = Header(None)):
+    check_admin(x_admin_token)
+    return {"active": swap(registry.activate, model_path(data.name, registry.active_path))}
+
+
+@app.post("/admin/models/shadow")
+def shadow_model(data: ModelRequest, x_admin_token: Optional[str] = Header(None)):
+    check_admin(x_admin_token)
+    if data.shadow_fraction is not None:
+        registry.shadow_fraction = min(max(data.shadow_fraction, 0.0), 1.0)
+    return {"candidate": swap(registry.set_candidate, model_path(data.name, registry.candidate_path)),
+            "shadow_fraction": registry.shadow_fraction}
+
+
+@app.post("/admin/models/promote")
+def promote_model(x_admin_token: Optional[str] = Header(None)):
+    check_admin(x_admin_token)
+    try:
+        return {"active": registry.promote().info()}
+    except LookupError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@app.delete("/admin/models/shadow")
+def drop_shadow_model(x_admin_token: Optional[str] = Header(None)):
+    check_admin(x_admin_token)
+    registry.drop_candidate()
+    return {"candidate": None}
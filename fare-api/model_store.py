@@ -0,0 +1,199 @@
+import logging
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.linear_model import LinearRegression
+
+# Goes through uvicorn's error logger so messages show up in the Render logs
+logger = logging.getLogger("uvicorn.error")
+
+ARTIFACT_VERSION = 1
+MILEAGE_FEATURES = ['vehicle_age', 'ac_factor', 'ride_type_factor', 'car_type_factor', 'time_of_day_factor']
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mileage_model.joblib")
+
+# Factor lookup tables (index = category code, -1 = unknown)
+CAR_TYPES = ["Hatch", "Sedan", "SUV"]
+CAR_TYPE_FACTORS = np.array([1.0, 1.1, 1.2])
+RIDE_TYPE_FACTORS = np.array([1.0, 1.2])  # Shared, anything else (Exclusive)
+AC_FACTOR = 1.2  # the API always assumes AC on and a neutral time of day
+TIME_OF_DAY_FACTOR = 1.0
+
+# fare_model.joblib: RandomForest trained on the Sabhyata_tiaro fare dataset
+FARE_FEATURES = ['trip_distance_km', 'claimed_mileage_kmpl', 'fuel_price_per_litre',
+                 'vehicle_age', 'AC_on', 'ride_type_factor', 'car_type_factor',
+                 'time_of_day_factor', 'day_type_factor', 'area_surge']
+DEFAULT_FARE_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fare_model.joblib")
+
+
+class ArtifactError(Exception):
+    pass
+
+
+# --- Training (only used to build the artifact, or when explicitly allowed) ---
+def train_mileage_model(n=500, seed=42):
+    rng = np.random.RandomState(seed)
+    train_df = pd.DataFrame({
+        'vehicle_age': rng.randint(0, 20, n),
+        'ac_factor': np.full(n, 1.2),
+        'ride_type_factor': rng.choice([1.0, 1.2], n),
+        'car_type_factor': rng.choice([1.0, 1.1, 1.2], n),
+        'time_of_day_factor': np.full(n, 1.0)
+    })
+
+    train_df['mileage'] = (
+        21
+        - 0.5 * train_df['vehicle_age']
+        - 2.0 * (train_df['ac_factor'] - 1.0)
+        - 1.5 * (train_df['car_type_factor'] - 1.0)
+        - 1.0 * (train_df['ride_type_factor'] - 1.0)
+        - 0.5 * (train_df['time_of_day_factor'] - 1.0)
+        + rng.normal(0, 0.5, n)
+    ).clip(lower=8, upper=25)
+
+    model = LinearRegression()
+    model.fit(train_df[MILEAGE_FEATURES], train_df['mileage'])
+    return model
+
+
+# --- Online model: least squares from running sums, so updates cost O(new rows) ---
+class IncrementalLinearRegression:
+    """Linear model updated with partial_fit on mini-batches of trips.
+
+    Keeps X'X and X'y (plus an intercept column) instead of the rows themselves, so the
+    result after any number of batches is the ridge solution over the whole history,
+    pulled towards `prior_coef` / `prior_intercept` with weight `prior_strength`.
+    `decay` < 1 down-weights older batches. Exposes coef_ / intercept_ like LinearRegression,
+    so the compiled predictor works unchanged.
+    """
+
+    def __init__(self, n_features, prior_coef=None, prior_intercept=0.0, prior_strength=10.0, decay=1.0):
+        prior_coef = np.zeros(n_features) if prior_coef is None else np.asarray(prior_coef, dtype=float).ravel()
+        self.prior = np.append(prior_coef, prior_intercept)
+        self.prior_strength = prior_strength
+        self.decay = decay
+        self.xtx = np.zeros((n_features + 1, n_features + 1))
+        self.xty = np.zeros(n_features + 1)
+        self.n_samples_seen_ = 0
+        self.sources_ = {}  # input file -> bytes consumed, so reruns only read new trips
+        self._solve()
+
+    @classmethod
+    def from_model(cls, model, **kwargs):
+        coef = np.ravel(model.coef_)
+        return cls(len(coef), coef, float(np.ravel(model.intercept_)[0]), **kwargs)
+
+    def partial_fit(self, X, y):
+        X = np.asarray(X, dtype=float)
+        X = np.column_stack([X, np.ones(len(X))])
+        self.xtx = self.decay * self.xtx + X.T @ X
+        self.xty = self.decay * self.xty + X.T @ np.asarray(y, dtype=float)
+        self.n_samples_seen_ += len(X)
+        self._solve()
+        return self
+
+    def _solve(self):
+        a = self.xtx + self.prior_strength * np.eye(len(self.prior))
+        w = np.linalg.solve(a, self.xty + self.prior_strength * self.prior)
+        self.coef_, self.intercept_ = w[:-1], float(w[-1])
+
+    def predict(self, X):
+        return np.asarray(X, dtype=float) @ self.coef_ + self.intercept_
+
+
+# --- Feature rows (shared by the API and online training) ---
+def mileage_features(vehicle_age, car_type, ride_type):
+    """Matrix in MILEAGE_FEATURES order. Raises ValueError naming the first unknown car_type."""
+    car_codes = pd.Categorical(car_type, categories=CAR_TYPES).codes
+    if (car_codes < 0).any():
+        bad = int(np.flatnonzero(car_codes < 0)[0])
+        raise ValueError(f"Unknown car_type at index {bad}: {list(car_type)[bad]!r}")
+
+    n = len(car_codes)
+    return np.column_stack([
+        np.asarray(vehicle_age, dtype=float),
+        np.full(n, AC_FACTOR),
+        RIDE_TYPE_FACTORS[(np.asarray(ride_type) != "Shared").astype(int)],
+        CAR_TYPE_FACTORS[car_codes],
+        np.full(n, TIME_OF_DAY_FACTOR)
+    ])
+
+
+# --- Artifact format: a header dict wrapping the fitted estimator ---
+def save_artifact(model, path, features, kind="mileage"):
+    artifact = {
+        "version": ARTIFACT_VERSION,
+        "kind": kind,
+        "features": list(features),
+        "sklearn_version": sklearn.__version__,
+        "created_at": time.time(),
+        "model": model
+    }
+    # No compression, so numpy arrays inside the model can be memory-mapped on load.
+    # Write next to the target and rename, so a running API never reads half a file.
+    joblib.dump(artifact, path + ".tmp")
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def load_artifact(path, features, mmap_mode="r"):
+    artifact = joblib.load(path, mmap_mode=mmap_mode)
+
+    if isinstance(artifact, dict):
+        if artifact.get("version") != ARTIFACT_VERSION:
+            raise ArtifactError(f"{path}: artifact version {artifact.get('version')!r}, expected {ARTIFACT_VERSION}")
+        if artifact.get("features") != list(features):
+            raise ArtifactError(f"{path}: feature schema {artifact.get('features')!r} does not match {list(features)!r}")
+        if artifact.get("sklearn_version") != sklearn.__version__:
+            logger.warning("%s was built with scikit-learn %s, running %s",
+                           path, artifact.get("sklearn_version"), sklearn.__version__)
+        return artifact["model"]
+
+    # Bare estimators (e.g. fare_model.joblib) carry no header, so check what sklearn recorded at fit time
+    fitted_features = getattr(artifact, "feature_names_in_", None)
+    if fitted_features is None or list(fitted_features) != list(features):
+        raise ArtifactError(f"{path}: feature schema {fitted_features!r} does not match {list(features)!r}")
+    return artifact
+
+
+def load_mileage_model(path=None, allow_training=None):
+    path = path or os.getenv("MILEAGE_MODEL_PATH", DEFAULT_MODEL_PATH)
+    if allow_training is None:
+        allow_training = os.getenv("FARE_API_ALLOW_TRAINING", "0") == "1"
+
+    start = time.perf_counter()
+    try:
+        model = load_artifact(path, MILEAGE_FEATURES)
+        source = "artifact"
+    except FileNotFoundError:
+        if not allow_training:
+            raise ArtifactError(
+                f"{path} not found. Build it with `python model_store.py` "
+                "or set FARE_API_ALLOW_TRAINING=1 to train at startup."
+            )
+        model = train_mileage_model()
+        save_artifact(model, path, MILEAGE_FEATURES)
+        source = "training"
+
+    logger.info("Mileage model loaded from %s (%s) in %.1f ms",
+                path, source, (time.perf_counter() - start) * 1000)
+    return model
+
+
+def load_fare_model(path=None):
+    path = path or os.getenv("FARE_MODEL_PATH", DEFAULT_FARE_MODEL_PATH)
+    start = time.perf_counter()
+    model = load_artifact(path, FARE_FEATURES)
+    logger.info("Fare model loaded from %s in %.1f ms", path, (time.perf_counter() - start) * 1000)
+    return model
+
+
+if __name__ == "__main__":
+    # Usage: python model_store.py [output_path]
+    out_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_MODEL_PATH
+    save_artifact(train_mileage_model(), out_path, MILEAGE_FEATURES)
+    print(f"✅ Saved mileage model artifact to {out_path}")
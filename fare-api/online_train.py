@@ -0,0 +1,101 @@
+"""Update the mileage model from completed trips, a mini-batch at a time.
+
+Each trip with a real `actual_fare_paid` implies the mileage the fare was effectively
+priced at (distance * fuel price / fare). Those targets update an IncrementalLinearRegression
+that starts from the current model, and the artifact is checkpointed after every batch.
+A running fare-api picks the new file up on its own (see registry.py).
+
+The checkpoint records how far into each trips file it has read, and the next run seeks
+straight past that, so the cost of a run grows with the new trips, not the whole history
+(trip files are assumed to be append-only).
+
+Usage:
+    python online_train.py trips.csv --batch-rows 5000
+    python online_train.py ../Sabhyata_tiaro/fare_prediction_dataset.csv
+"""
+import argparse
+import io
+import itertools
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from model_store import (CAR_TYPES, DEFAULT_MODEL_PATH, MILEAGE_FEATURES, IncrementalLinearRegression,
+                         load_mileage_model, mileage_features, save_artifact)
+
+TRIP_YEAR = 2025  # vehicle_age = TRIP_YEAR - year_of_manufacture, as in the Sabhyata notebook
+CAR_TYPE_ALIASES = {"Hatchback": "Hatch"}
+MIN_FARE = 40.0
+MILEAGE_RANGE = (3.0, 40.0)  # implied mileage outside this is a data error, not a signal
+
+
+def trip_rows(trips, min_fare=MIN_FARE):
+    """(X, y) from trip records; drops minimum-fare trips (the fare says nothing about mileage) and bad rows."""
+    if "vehicle_age" in trips:
+        vehicle_age = trips["vehicle_age"]
+    else:
+        vehicle_age = TRIP_YEAR - trips["year_of_manufacture"]
+    car_type = trips["car_type"].replace(CAR_TYPE_ALIASES)
+    mileage = trips["trip_distance_km"] * trips["fuel_price_per_litre"] / trips["actual_fare_paid"]
+
+    keep = (
+        (trips["actual_fare_paid"] > min_fare)
+        & mileage.between(*MILEAGE_RANGE)
+        & car_type.isin(CAR_TYPES)
+        & vehicle_age.notna()
+    ).to_numpy()
+    X = mileage_features(vehicle_age[keep], car_type[keep], trips["ride_type"][keep])
+    return X, mileage[keep].to_numpy()
+
+
+def read_new_trips(path, offset, batch_rows):
+    """Yield (trips DataFrame, byte offset after it) for rows past `offset`, seeking straight there."""
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(max(offset, len(header)))
+        while True:
+            lines = list(itertools.islice(f, batch_rows))
+            if lines and not lines[-1].endswith(b"\n"):
+                f.seek(-len(lines.pop()), os.SEEK_CUR)  # half-written last row: leave it for next time
+            if not lines:
+                return
+            yield pd.read_csv(io.BytesIO(header + b"".join(lines))), f.tell()
+
+
+def load_online_model(path, prior_strength, decay):
+    model = load_mileage_model(path)
+    if isinstance(model, IncrementalLinearRegression):
+        return model
+    # First run: start from the batch-trained model's coefficients
+    return IncrementalLinearRegression.from_model(model, prior_strength=prior_strength, decay=decay)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally retrain the mileage model on completed trips")
+    parser.add_argument("trips", help="CSV of completed trips with actual_fare_paid")
+    parser.add_argument("--model", default=os.getenv("MILEAGE_MODEL_PATH", DEFAULT_MODEL_PATH))
+    parser.add_argument("--batch-rows", type=int, default=5000)
+    parser.add_argument("--prior-strength", type=float, default=10.0,
+                        help="Pseudo-trips worth of weight on the starting coefficients (first run only)")
+    parser.add_argument("--decay", type=float, default=1.0, help="Weight kept by older batches at each update")
+    parser.add_argument("--min-fare", type=float, default=MIN_FARE)
+    args = parser.parse_args()
+
+    model = load_online_model(args.model, args.prior_strength, args.decay)
+    source = os.path.abspath(args.trips)
+    offset = model.sources_.get(source, 0)
+    print(f"🚕 {args.trips}: {offset:,} bytes already learned, reading the rest")
+
+    start = time.perf_counter()
+    for batch, offset in read_new_trips(args.trips, offset, args.batch_rows):
+        X, y = trip_rows(batch, args.min_fare)
+        if len(y):
+            model.partial_fit(X, y)
+        model.sources_[source] = offset
+        save_artifact(model, args.model, MILEAGE_FEATURES)
+        print(f"⏳ +{len(batch):,} trips ({len(y):,} used), {model.n_samples_seen_:,} learned in total, "
+              f"coef {np.round(model.coef_, 3).tolist()} intercept {model.intercept_:.3f}")
+
+    print(f"✅ Checkpointed {args.model} in {time.perf_counter() - start:.2f}s")
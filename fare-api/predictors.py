@@ -0,0 +1,111 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from model_store import (AC_FACTOR, CAR_TYPE_FACTORS, CAR_TYPES, MILEAGE_FEATURES, RIDE_TYPE_FACTORS,
+                         TIME_OF_DAY_FACTOR, mileage_features)
+
+TABLE_AGES = 20  # vehicle_age 0-19 is precomputed; anything else goes to the model
+
+
+# --- Reference path: pandas DataFrame + sklearn input validation ---
+class SklearnPredictor:
+    def __init__(self, model, features):
+        self.model = model
+        self.features = list(features)
+
+    def predict(self, X):
+        return self.model.predict(pd.DataFrame(X, columns=self.features))
+
+    def predict_one(self, row):
+        return float(self.predict([row])[0])
+
+
+# --- Compiled path: coef_/intercept_ pulled out once, plain dot product per call ---
+class CompiledLinearPredictor:
+    def __init__(self, model, features):
+        self.features = list(features)
+        # Copy out of any memory-mapped artifact into a small contiguous array
+        self.coef = np.array(model.coef_, dtype=np.float64).ravel()
+        self.intercept = float(np.ravel(model.intercept_)[0])
+        if self.coef.shape != (len(self.features),):
+            raise ValueError(f"Model has {self.coef.size} coefficients, expected {len(self.features)}")
+        # One preallocated row buffer per thread (sync endpoints run in a threadpool)
+        self._local = threading.local()
+
+    def predict(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.coef + self.intercept
+
+    def predict_one(self, row):
+        buf = getattr(self._local, "row", None)
+        if buf is None:
+            buf = self._local.row = np.empty(len(self.features))
+        buf[:] = row
+        return float(buf @ self.coef) + self.intercept
+
+
+# --- Precomputed path: mileage for every discrete input the API can send ---
+class TablePredictor:
+    """Mileage of `predictor` over vehicle_age x car type x ride type, computed once per loaded model.
+
+    Besides trip distance and fuel price (applied after the model), the API's inputs are discrete
+    and the AC / time-of-day factors are fixed, so a single-trip prediction is a list lookup.
+    Rows off the grid (age 20+, fractional ages, other factor values) go to the wrapped predictor.
+    """
+
+    def __init__(self, predictor, features, ages=TABLE_AGES):
+        self.predictor = predictor
+        self.features = list(features)
+        grid_ages, grid_cars, grid_rides = np.meshgrid(np.arange(ages), np.arange(len(CAR_TYPES)),
+                                                       np.arange(len(RIDE_TYPE_FACTORS)), indexing="ij")
+        grid_X = mileage_features(grid_ages.ravel(), np.array(CAR_TYPES)[grid_cars.ravel()],
+                                  np.where(grid_rides.ravel() == 0, "Shared", "Exclusive"))
+        self.values = np.asarray(predictor.predict(grid_X), dtype=np.float64).reshape(grid_ages.shape)
+        # Per age: (ride factor, car factor) -> mileage, as plain floats so a lookup never touches numpy
+        self._rows = [
+            {(ride, car): float(self.values[age, c, r])
+             for c, car in enumerate(CAR_TYPE_FACTORS.tolist()) for r, ride in enumerate(RIDE_TYPE_FACTORS.tolist())}
+            for age in range(ages)
+        ]
+
+    def predict_one(self, row):
+        age, ac, ride, car, time_of_day = row
+        if ac == AC_FACTOR and time_of_day == TIME_OF_DAY_FACTOR and 0 <= age < len(self._rows) and age == int(age):
+            mileage = self._rows[int(age)].get((ride, car))
+            if mileage is not None:
+                return mileage
+        return self.predictor.predict_one(row)
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        age, ac, ride, car, time_of_day = X.T
+        car_hits = car[:, None] == CAR_TYPE_FACTORS
+        ride_hits = ride[:, None] == RIDE_TYPE_FACTORS
+        on_grid = ((ac == AC_FACTOR) & (time_of_day == TIME_OF_DAY_FACTOR) & (age >= 0) & (age < len(self._rows))
+                   & (age == np.floor(age)) & car_hits.any(axis=1) & ride_hits.any(axis=1))
+
+        out = np.empty(len(X))
+        out[on_grid] = self.values[age[on_grid].astype(int), car_hits[on_grid].argmax(axis=1),
+                                   ride_hits[on_grid].argmax(axis=1)]
+        if not on_grid.all():
+            out[~on_grid] = self.predictor.predict(X[~on_grid])
+        return out
+
+
+def make_predictor(model, features, mode=None, table=None):
+    """Pick the predictor for `model`. FARE_API_PREDICTOR=sklearn forces the reference path.
+
+    Mileage models are wrapped in a TablePredictor unless FARE_API_MILEAGE_TABLE=0.
+    """
+    mode = mode or os.getenv("FARE_API_PREDICTOR", "compiled")
+    if table is None:
+        table = os.getenv("FARE_API_MILEAGE_TABLE", "1") == "1"
+    if mode == "compiled" and hasattr(model, "coef_"):
+        predictor = CompiledLinearPredictor(model, features)
+    else:
+        predictor = SklearnPredictor(model, features)
+    if table and list(features) == MILEAGE_FEATURES:
+        predictor = TablePredictor(predictor, features)
+    return predictor
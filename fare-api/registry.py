@@ -0,0 +1,220 @@
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+SHARED_DIR = os.getenv("SHARED_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+sys.path.insert(0, SHARED_DIR)  # instrument.py lives in ../shared, used by both services
+from instrument import stage  # noqa: E402
+from model_store import CAR_TYPES, load_mileage_model, logger, mileage_features
+from predictors import make_predictor
+
+# Every car type x ride type x age 0-20: a new model must give sane mileages on all of them
+_ages, _cars, _rides = np.meshgrid(np.arange(21), np.arange(len(CAR_TYPES)), [0, 1], indexing="ij")
+PROBE_X = mileage_features(_ages.ravel(), np.array(CAR_TYPES)[_cars.ravel()],
+                           np.where(_rides.ravel() == 0, "Shared", "Exclusive"))
+PROBE_MILEAGE_RANGE = (1.0, 60.0)
+
+
+class ModelVersion:
+    """One loaded artifact. Never mutated after creation, so requests can hold on to it safely."""
+
+    def __init__(self, path, model, predictor, mtime):
+        self.path = path
+        self.model = model
+        self.predictor = predictor
+        self.mtime = mtime
+        self.loaded_at = time.time()
+
+    def info(self):
+        return {
+            "path": self.path,
+            "model": type(self.model).__name__,
+            "predictor": type(self.predictor).__name__,
+            "file_mtime": self.mtime / 1e9,
+            "loaded_at": self.loaded_at
+        }
+
+
+def load_version(path, features, allow_training=False):
+    """Load + validate an artifact; raises on a schema mismatch or implausible predictions."""
+    model = load_mileage_model(path, allow_training=allow_training)
+    mtime = os.stat(path).st_mtime_ns
+    predictor = make_predictor(model, features)  # includes the mileage table, so each swap builds its own
+    probe = predictor.predict(PROBE_X)
+    low, high = PROBE_MILEAGE_RANGE
+    if not np.all(np.isfinite(probe)) or probe.min() < low or probe.max() > high:
+        raise ValueError(f"{path}: probe mileages {probe.min():.2f}..{probe.max():.2f} outside {PROBE_MILEAGE_RANGE}")
+    return ModelVersion(path, model, predictor, mtime)
+
+
+# --- Divergence between the active model and the shadow candidate ---
+class Divergence:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.batches = 0
+            self.rows = 0
+            self.sum_abs = 0.0
+            self.sum_sq = 0.0
+            self.max_abs = 0.0
+            self.dropped = 0
+
+    def record_dropped(self):
+        with self._lock:
+            self.dropped += 1
+
+    def record(self, active, shadow):
+        diff = np.abs(np.asarray(shadow) - np.asarray(active))
+        with self._lock:
+            self.batches += 1
+            self.rows += diff.size
+            self.sum_abs += float(diff.sum())
+            self.sum_sq += float((diff ** 2).sum())
+            self.max_abs = max(self.max_abs, float(diff.max()))
+
+    def summary(self):
+        with self._lock:
+            n = self.rows or 1
+            return {
+                "batches": self.batches,
+                "rows": self.rows,
+                "dropped_batches": self.dropped,
+                "mean_abs_diff": round(self.sum_abs / n, 4),
+                "rmse": round((self.sum_sq / n) ** 0.5, 4),
+                "max_abs_diff": round(self.max_abs, 4)
+            }
+
+
+# --- Registry: active model, optional shadow candidate, background directory watch ---
+class ModelRegistry:
+    """Holds the active ModelVersion and swaps it atomically.
+
+    `models_dir/active_name` is the serving artifact and `models_dir/candidate_name`, if present,
+    is shadow-scored on `shadow_fraction` of live batches. A background thread polls both files
+    every `poll_seconds`; the admin endpoints call activate() / set_candidate() directly.
+    """
+
+    def __init__(self, models_dir, features, active_name, candidate_name, poll_seconds=5.0,
+                 shadow_fraction=0.0, max_shadow_backlog=100, allow_training=None):
+        self.models_dir = models_dir
+        self.features = list(features)
+        self.active_path = os.path.join(models_dir, active_name)
+        self.candidate_path = os.path.join(models_dir, candidate_name)
+        self.poll_seconds = poll_seconds
+        self.shadow_fraction = shadow_fraction
+
+        # Only the startup load may train (FARE_API_ALLOW_TRAINING); swaps never do
+        self.active = load_version(self.active_path, self.features, allow_training)
+        self.candidate = None
+        self.divergence = Divergence()
+        self.swaps = 0
+
+        self._swap_lock = threading.Lock()
+        self._shadow_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+        self._shadow_slots = threading.BoundedSemaphore(max_shadow_backlog)
+        self._seen = {self.active_path: self.active.mtime}  # watched file -> mtime already handled
+        self._stop = threading.Event()
+        self._watcher = None
+
+    # --- Swaps ---
+    def activate(self, path=None):
+        """Load + validate `path` (default: the active artifact) and make it the serving model."""
+        version = load_version(path or self.active_path, self.features)
+        with self._swap_lock:
+            self.active = version  # single reference assignment: requests see old or new, never a mix
+            self.swaps += 1
+        logger.info("Activated model %s", version.path)
+        return version
+
+    def set_candidate(self, path=None):
+        version = load_version(path or self.candidate_path, self.features)
+        with self._swap_lock:
+            self.candidate = version
+        self.divergence.reset()
+        logger.info("Shadow candidate %s loaded", version.path)
+        return version
+
+    def promote(self):
+        with self._swap_lock:
+            if self.candidate is None:
+                raise LookupError("No shadow candidate loaded")
+            self.active, self.candidate = self.candidate, None
+            self.swaps += 1
+        logger.info("Promoted shadow candidate %s", self.active.path)
+        return self.active
+
+    def drop_candidate(self):
+        with self._swap_lock:
+            self.candidate = None
+
+    # --- Shadow scoring (never on the request path) ---
+    def shadow(self, X, active_predictions):
+        candidate = self.candidate
+        if candidate is None or random.random() >= self.shadow_fraction:
+            return
+        if not self._shadow_slots.acquire(blocking=False):
+            self.divergence.record_dropped()  # shadow is best-effort; never let it queue up memory
+            return
+        self._shadow_pool.submit(self._score_shadow, candidate, np.array(X, dtype=float), active_predictions)
+
+    def _score_shadow(self, candidate, X, active_predictions):
+        try:
+            with stage("shadow_predict"):
+                shadow_predictions = candidate.predictor.predict(X)
+            self.divergence.record(active_predictions, shadow_predictions)
+        except Exception as e:
+            logger.warning("Shadow scoring with %s failed: %s", candidate.path, e)
+        finally:
+            self._shadow_slots.release()
+
+    # --- Directory watch ---
+    def poll_once(self):
+        for path, load in [(self.active_path, self.activate), (self.candidate_path, self.set_candidate)]:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                self._seen.pop(path, None)
+                candidate = self.candidate
+                if path == self.candidate_path and candidate is not None and candidate.path == path:
+                    self.drop_candidate()  # candidate file removed: stop shadowing it
+                continue
+            if self._seen.get(path) == mtime:
+                continue
+            # Marked before loading, so a rejected file isn't retried until it is written again
+            self._seen[path] = mtime
+            try:
+                load(path)
+            except Exception as e:
+                logger.warning("Rejected %s, keeping the current model: %s", path, e)
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_seconds):
+            self.poll_once()
+
+    def start(self):
+        if self.poll_seconds > 0 and self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, name="model-watch", daemon=True)
+            self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+        self._shadow_pool.shutdown(wait=False)
+
+    def status(self):
+        candidate = self.candidate
+        return {
+            "active": self.active.info(),
+            "candidate": candidate.info() if candidate else None,
+            "shadow_fraction": self.shadow_fraction,
+            "divergence": self.divergence.summary() if candidate else None,
+            "swaps": self.swaps,
+            "poll_seconds": self.poll_seconds
+        }
@@ -0,0 +1,143 @@
+"""Pre-fork server for the fare API: models load once in the parent and are shared by every worker.
+
+`uvicorn main:app --workers N` starts N fresh interpreters, so each worker pays for its own
+imports (numpy, pandas, scikit-learn, FastAPI) and its own copy of the model. Here the parent
+imports main (the registry loads and probe-validates the model), freezes the GC so no worker
+touches those objects' headers during collection, binds the socket, then forks the workers.
+The loaded pages stay shared copy-on-write, so an added worker costs only the memory it
+writes to. Artifacts are uncompressed and loaded with mmap_mode="r" (model_store.py), so the
+numpy arrays of a model that a worker swaps in later come from the shared page cache too.
+
+Each worker runs its own registry watch, so a new artifact is picked up by all of them. Metrics are
+merged across workers through PROMETHEUS_MULTIPROC_DIR (see shared/instrument.py). A worker that dies
+is forked again from the parent.
+
+Usage:
+    python serve.py --workers 4 --port 8000          # WEB_CONCURRENCY sets the default worker count
+    python bench_workers.py                          # memory per worker and throughput vs uvicorn --workers
+"""
+import argparse
+import gc
+import glob
+import logging
+import logging.config
+import os
+import random
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+DEFAULT_WORKERS = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+MULTIPROC_DIR = None  # set in __main__, before the metrics exist
+
+
+def bind(host, port, backlog=2048):
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock, args):
+    """Child side of the fork: serve on the inherited socket until uvicorn gets SIGTERM / SIGINT."""
+    import uvicorn
+
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    random.seed()  # otherwise every worker draws the same shadow-sampling sequence
+    config = uvicorn.Config(app, log_level=args.log_level, timeout_keep_alive=args.keep_alive)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Supervisor:
+    def __init__(self, app, sock, args):
+        self.app = app
+        self.sock = sock
+        self.args = args
+        self.workers = {}  # pid -> forked_at
+        self.stopping = False
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(self.app, self.sock, self.args)
+            except BaseException:
+                import traceback
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = time.monotonic()
+
+    def stop(self, signum, frame):
+        self.stopping = True
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.args.workers):
+            self.spawn()
+        print(f"✅ {self.args.workers} workers on {self.args.host}:{self.args.port} (parent {os.getpid()})", flush=True)
+
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            forked_at = self.workers.pop(pid, None)
+            if forked_at is None:
+                continue
+            if MULTIPROC_DIR:
+                from prometheus_client import multiprocess
+                multiprocess.mark_process_dead(pid)
+            if not self.stopping:
+                print(f"⚠️ Worker {pid} exited ({os.waitstatus_to_exitcode(status)}), starting another", flush=True)
+                if time.monotonic() - forked_at < 1:
+                    time.sleep(1)  # don't fork in a tight loop if workers die at startup
+                self.spawn()
+
+
+def configure_logging(level):
+    """uvicorn's own logging setup, applied in the parent so the model-load lines are printed."""
+    from uvicorn.config import LOGGING_CONFIG
+
+    logging.config.dictConfig(LOGGING_CONFIG)
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).setLevel(level.upper())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the fare API from pre-forked workers sharing one model load")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8000)))
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--keep-alive", type=int, default=5)
+    args = parser.parse_args()
+
+    # Must be set before instrument.py creates its metrics
+    MULTIPROC_DIR = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="fare-api-metrics-"))
+    for stale in glob.glob(os.path.join(MULTIPROC_DIR, "*.db")):
+        os.remove(stale)  # counters from a previous run would otherwise be summed in
+
+    configure_logging(args.log_level)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    start = time.perf_counter()
+    import main  # noqa: E402  loads and validates the model once, in the parent
+    print(f"⏳ App and model loaded in {time.perf_counter() - start:.2f}s", flush=True)
+
+    gc.collect()
+    gc.freeze()  # everything loaded so far stays out of the workers' collections (and their page writes)
+
+    Supervisor(main.app, bind(args.host, args.port), args).run()
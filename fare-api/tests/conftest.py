@@ -0,0 +1,13 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model_store import train_mileage_model  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def mileage_model():
+    return train_mileage_model()
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from bench_predict import grid_and_off_grid_rows, sample_rows
+from model_store import MILEAGE_FEATURES
+from predictors import CompiledLinearPredictor, SklearnPredictor, TablePredictor, make_predictor
+
+TOL = 1e-9
+
+
+def max_diffs(reference, candidate, rows):
+    batch = np.max(np.abs(reference.predict(rows) - candidate.predict(rows)))
+    single = max(abs(reference.predict_one(r) - candidate.predict_one(r)) for r in rows.tolist())
+    return batch, single
+
+
+@pytest.fixture(scope="module")
+def reference(mileage_model):
+    return SklearnPredictor(mileage_model, MILEAGE_FEATURES)
+
+
+@pytest.fixture(scope="module")
+def compiled(mileage_model):
+    return CompiledLinearPredictor(mileage_model, MILEAGE_FEATURES)
+
+
+def test_compiled_matches_sklearn(reference, compiled):
+    assert max(max_diffs(reference, compiled, sample_rows(500))) <= TOL
+
+
+@pytest.mark.parametrize("rows", [sample_rows(500), grid_and_off_grid_rows()], ids=["sampled", "grid+off-grid"])
+def test_table_matches_sklearn(reference, compiled, rows):
+    assert max(max_diffs(reference, TablePredictor(compiled, MILEAGE_FEATURES), rows)) <= TOL
+
+
+def test_table_over_sklearn_matches_sklearn(reference):
+    # What FARE_API_PREDICTOR=sklearn serves
+    table = TablePredictor(reference, MILEAGE_FEATURES)
+    assert max(max_diffs(reference, table, grid_and_off_grid_rows())) <= TOL
+
+
+def test_make_predictor_wraps_mileage_models_in_the_table(mileage_model, monkeypatch):
+    monkeypatch.delenv("FARE_API_PREDICTOR", raising=False)
+    monkeypatch.delenv("FARE_API_MILEAGE_TABLE", raising=False)
+    assert isinstance(make_predictor(mileage_model, MILEAGE_FEATURES), TablePredictor)
+    assert isinstance(make_predictor(mileage_model, MILEAGE_FEATURES, table=False), CompiledLinearPredictor)
+    assert isinstance(make_predictor(mileage_model, MILEAGE_FEATURES, mode="sklearn", table=False), SklearnPredictor)
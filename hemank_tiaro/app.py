@@ -13,13 +13,16 @@ load_dotenv()
 os.environ["GROQ_API_KEY"] = os.getenv("GROQ_API_KEY")  
 SERPER_API_KEY = os.getenv("SERPER_API_KEY")            
 
+# One keep-alive session for all Serper / cardekho calls
+session = requests.Session()
+
 # --- FUNCTION TO GET TOP RESULT FROM SERPER ---
 def get_top_result_url(query):
     headers = {"X-API-KEY": SERPER_API_KEY}
     payload = {"q": query + " site:cardekho.com"}
     
     try:
-        response = requests.post("https://google.serper.dev/search", headers=headers, json=payload)
+        response = session.post("https://google.serper.dev/search", headers=headers, json=payload, timeout=5)
         results = response.json()
         if "organic" in results and results["organic"]:
             return results["organic"][0]["link"]
@@ -32,7 +35,7 @@ def get_top_result_url(query):
 def fetch_page_content(url):
     headers = {"User-Agent": "Mozilla/5.0"}
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = session.get(url, headers=headers, timeout=10)
         soup = BeautifulSoup(response.content, "html.parser")
         return soup.get_text(separator=' ')
     except Exception as e:
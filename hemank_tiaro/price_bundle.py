@@ -0,0 +1,150 @@
+"""LightGBM selling-price model plus its preprocessing, saved and loaded as one file.
+
+tiaro_file.ipynb label-encodes Car_Name / Fuel_Type / Seller_Type / Transmission, MinMax-scales
+Kms_Driven, then fits LGBMRegressor, but only model.pkl and scaler.pkl were saved. The encoders
+had to be re-typed by hand in streamlit.py. price_bundle.pkl holds all of them:
+
+    {"features": [...], "classes": {column: [labels in code order]},
+     "kms_min": ..., "kms_scale": ..., "model": LGBMRegressor}
+
+PriceBundle.encode() turns a whole DataFrame of raw inputs into the model's feature matrix with
+one category lookup per column and one multiply-add for the scaler. Unknown labels raise a
+ValueError, or become NaN with unknown="missing" (LightGBM routes them down its missing-value
+branch).
+
+Usage:
+    python price_bundle.py [cardata.csv] [model.pkl] [scaler.pkl] [price_bundle.pkl]
+"""
+import os
+import pickle
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+FEATURES = ['Car_Name', 'Year', 'Present_Price', 'Kms_Driven', 'Fuel_Type', 'Seller_Type', 'Transmission']
+CATEGORICAL = ['Fuel_Type', 'Transmission', 'Seller_Type', 'Car_Name']  # encoder fit order in the notebook
+BUNDLE_PATH = "price_bundle.pkl"
+
+
+class PriceBundle:
+    def __init__(self, model, classes, kms_min, kms_scale, features=FEATURES):
+        self.model = model
+        self.features = list(features)
+        self.classes = {column: pd.Index(labels) for column, labels in classes.items()}
+        self.kms_min = float(kms_min)
+        self.kms_scale = float(kms_scale)
+
+    @classmethod
+    def from_notebook(cls, model, encoders, scaler):
+        """From the notebook's fitted LabelEncoders dict, MinMaxScaler and LGBMRegressor."""
+        classes = {column: list(encoder.classes_) for column, encoder in encoders.items()}
+        # MinMaxScaler.transform is X * scale_ + min_
+        return cls(model, classes, scaler.min_[0], scaler.scale_[0])
+
+    def codes(self, column, values, unknown="error"):
+        """Label codes for a whole column; unknown labels raise, or come back NaN with unknown="missing"."""
+        codes = self.classes[column].get_indexer(pd.Index(np.asarray(values, dtype=object)))
+        missing = codes < 0
+        if missing.any():
+            if unknown != "missing":
+                bad = int(np.flatnonzero(missing)[0])
+                raise ValueError(f"Unknown {column} at index {bad}: {np.asarray(values, dtype=object)[bad]!r}")
+            return np.where(missing, np.nan, codes)
+        return codes.astype(float)
+
+    def encode(self, inputs, unknown="error"):
+        """Raw inputs (DataFrame or dict of columns, FEATURES names) -> model feature frame."""
+        inputs = pd.DataFrame(inputs)
+        encoded = {}
+        for column in self.features:
+            if column in self.classes:
+                encoded[column] = self.codes(column, inputs[column], unknown)
+            elif column == "Kms_Driven":
+                encoded[column] = inputs[column].to_numpy(dtype=float) * self.kms_scale + self.kms_min
+            else:
+                encoded[column] = inputs[column].to_numpy(dtype=float)
+        return pd.DataFrame(encoded, columns=self.features)
+
+    def predict(self, inputs, unknown="error"):
+        return self.model.predict(self.encode(inputs, unknown))
+
+    def options(self, column):
+        return list(self.classes[column])
+
+    def save(self, path=BUNDLE_PATH):
+        bundle = {
+            "features": self.features,
+            "classes": {column: list(labels) for column, labels in self.classes.items()},
+            "kms_min": self.kms_min,
+            "kms_scale": self.kms_scale,
+            "model": self.model
+        }
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(bundle, f)
+        # Rename into place so the app never reads a half-written bundle
+        os.replace(path + ".tmp", path)
+        return path
+
+    @classmethod
+    def load(cls, path=BUNDLE_PATH):
+        with open(path, "rb") as f:
+            bundle = pickle.load(f)
+        return cls(bundle["model"], bundle["classes"], bundle["kms_min"], bundle["kms_scale"], bundle["features"])
+
+
+def fit_encoders(df):
+    """The notebook's LabelEncoders, refit on the same data (LabelEncoder sorts classes, so codes match)."""
+    return {column: LabelEncoder().fit(df[column]) for column in CATEGORICAL}
+
+
+def notebook_features(df, encoders, scaler):
+    # tiaro_file.ipynb / streamlit.py preprocessing, one transform per column
+    X = df[FEATURES].copy()
+    for column, encoder in encoders.items():
+        X[column] = encoder.transform(X[column])
+    X["Kms_Driven"] = scaler.transform(df[["Kms_Driven"]])[:, 0]
+    return X
+
+
+if __name__ == "__main__":
+    defaults = ["cardata.csv", "model.pkl", "scaler.pkl", BUNDLE_PATH]
+    data_path, model_path, scaler_path, out_path = sys.argv[1:5] + defaults[len(sys.argv[1:5]):]
+    df = pd.read_csv(data_path)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # InconsistentVersionWarning: pickled with an older scikit-learn
+        with open(model_path, "rb") as f:
+            model = pickle.load(f)
+        with open(scaler_path, "rb") as f:
+            scaler = pickle.load(f)
+
+    encoders = fit_encoders(df)
+    bundle = PriceBundle.from_notebook(model, encoders, scaler)
+
+    # Parity with the notebook pipeline on every row of the training data
+    expected = model.predict(notebook_features(df, encoders, scaler))
+    diff = np.max(np.abs(bundle.predict(df) - expected))
+    assert diff <= 1e-9, f"bundle predictions differ by {diff}"
+    bundle.save(out_path)
+    print(f"✅ Saved {out_path} (max abs diff vs notebook pipeline {diff:.1e})")
+
+    # streamlit.py path: dict lookups + scaler.transform([[kms]]) + predict, one row at a time
+    rows = df.sample(200, replace=True, random_state=0)
+    start = time.perf_counter()
+    for _, row in rows.iterrows():
+        X = pd.DataFrame([[encoders["Car_Name"].transform([row["Car_Name"]])[0], row["Year"], row["Present_Price"],
+                           scaler.transform(pd.DataFrame({"Kms_Driven": [row["Kms_Driven"]]}))[0][0],
+                           encoders["Fuel_Type"].transform([row["Fuel_Type"]])[0],
+                           encoders["Seller_Type"].transform([row["Seller_Type"]])[0],
+                           encoders["Transmission"].transform([row["Transmission"]])[0]]], columns=FEATURES)
+        model.predict(X)
+    per_row = (time.perf_counter() - start) / len(rows)
+    big = df.sample(100_000, replace=True, random_state=0)
+    start = time.perf_counter()
+    bundle.predict(big)
+    batch = time.perf_counter() - start
+    print(f"⏱️ per-row path {per_row * 1000:.2f} ms/row, bundle batch {batch / len(big) * 1e6:.2f} us/row "
+          f"({len(big) / batch:,.0f} rows/s)")
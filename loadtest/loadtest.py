@@ -0,0 +1,273 @@
+"""Load test for fare-api and fetcher_api: throughput and p50/p95/p99 latency per scenario.
+
+The apps run in-process behind httpx's ASGI transport (no server, no socket to the app). The
+car-info chain's Serper / cardekho / Groq calls go to local stubs with fixed latencies
+(stubs.py), so runs are repeatable and cost nothing. Each service runs in its own child
+process (clean imports, own env, own caches).
+
+Scenarios:
+    fare_single     POST /predict_fare
+    fare_batch      POST /predict_fare/batch with --batch-size trips
+    car_info_hot    POST /get-car-info over a few keys already in the cache
+    car_info_cold   POST /get-car-info with a new key every time (Serper -> page -> LLM)
+    --mix "fare_single=3,fare_batch=1" adds a weighted "mix" scenario (one service at a time)
+
+Usage:
+    python loadtest.py --concurrency 16 --duration 5 --output results.json
+    python loadtest.py --baseline baseline.json          # exit 1 if a scenario regressed
+    python loadtest.py --save-baseline baseline.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICES = {
+    "fare-api": {"dir": os.path.join(ROOT, "fare-api"), "module": "main"},
+    "fetcher": {"dir": os.path.join(ROOT, "Aryan_tiaro"), "module": "fetcher_api"},
+}
+CAR_TYPES = ["Hatch", "Sedan", "SUV"]
+RIDE_TYPES = ["Shared", "Exclusive"]
+HOT_KEYS = 8
+
+
+# --- Request generators: i -> (path, json body, rows priced) ---
+def fare_trip(rng):
+    return {
+        "trip_distance_km": round(rng.uniform(2, 40), 1),
+        "fuel_price_per_litre": round(rng.uniform(90, 110), 2),
+        "vehicle_age": rng.randrange(20),
+        "car_type": rng.choice(CAR_TYPES),
+        "ride_type": rng.choice(RIDE_TYPES)
+    }
+
+
+def fare_single(i, rng, args):
+    return "/predict_fare", fare_trip(rng), 1
+
+
+def fare_batch(i, rng, args):
+    return "/predict_fare/batch", {"trips": [fare_trip(rng) for _ in range(args.batch_size)]}, args.batch_size
+
+
+def car_query(key):
+    return {"car_name": "Maruti", "model": "Swift", "year": "2020", "fuel_type": "petrol", "variant": f"V{key}"}
+
+
+def car_info_hot(i, rng, args):
+    return "/get-car-info", car_query(f"hot{i % HOT_KEYS}"), 1
+
+
+def car_info_cold(i, rng, args):
+    return "/get-car-info", car_query(f"cold{os.getpid()}-{i}-{rng.random()}"), 1
+
+
+SCENARIOS = {
+    "fare_single": ("fare-api", fare_single),
+    "fare_batch": ("fare-api", fare_batch),
+    "car_info_hot": ("fetcher", car_info_hot),
+    "car_info_cold": ("fetcher", car_info_cold),
+}
+WARMUP = {"car_info_hot": [car_info_hot(i, None, None) for i in range(HOT_KEYS)]}
+
+
+def mixed(weights):
+    names, w = zip(*weights.items())
+
+    def generate(i, rng, args):
+        return SCENARIOS[rng.choices(names, w)[0]][1](i, rng, args)
+    return generate
+
+
+# --- Driver (runs inside the service's child process) ---
+async def drive(app, generate, args, warmup=()):
+    import httpx
+
+    counter = iter(range(10 ** 9))
+    latencies, failures, rows = [], 0, 0
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=60) as client:
+            for path, body, _ in warmup:
+                await client.post(path, json=body)
+
+            deadline = time.perf_counter() + args.duration
+
+            async def worker(seed):
+                nonlocal failures, rows
+                rng = random.Random(seed)
+                while time.perf_counter() < deadline:
+                    path, body, n = generate(next(counter), rng, args)
+                    start = time.perf_counter()
+                    response = await client.post(path, json=body)
+                    latencies.append(time.perf_counter() - start)
+                    if response.status_code != 200 or "error" in response.json():
+                        failures += 1
+                    else:
+                        rows += n
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker(args.seed + w) for w in range(args.concurrency)))
+            elapsed = time.perf_counter() - start
+
+    ms = np.array(latencies) * 1000
+    return {
+        "requests": len(ms),
+        "errors": failures,
+        "seconds": round(elapsed, 3),
+        "rps": round(len(ms) / elapsed, 1),
+        "rows_per_second": round(rows / elapsed, 1),
+        "mean_ms": round(float(ms.mean()), 2) if len(ms) else None,
+        "p50_ms": round(float(np.percentile(ms, 50)), 2) if len(ms) else None,
+        "p95_ms": round(float(np.percentile(ms, 95)), 2) if len(ms) else None,
+        "p99_ms": round(float(np.percentile(ms, 99)), 2) if len(ms) else None,
+        "max_ms": round(float(ms.max()), 2) if len(ms) else None
+    }
+
+
+def run_service(service, scenarios, args):
+    """Import the service fresh in this process, with env pointing at temp files and stubs, and drive it."""
+    spec = SERVICES[service]
+    workdir = tempfile.mkdtemp(prefix=f"loadtest-{service}-")
+    os.chdir(spec["dir"])
+    sys.path.insert(0, spec["dir"])
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.environ.update({
+        # fare-api: train the mileage model into a temp file, no directory watch
+        "MILEAGE_MODEL_PATH": os.path.join(workdir, "mileage_model.joblib"),
+        "FARE_API_ALLOW_TRAINING": "1",
+        "MODEL_RELOAD_SECONDS": "0",
+        "SHADOW_FRACTION": "0",
+        # fetcher_api: fresh cache, all outbound calls to the stubs
+        "CAR_INFO_CACHE_PATH": os.path.join(workdir, "car_info_cache.sqlite3"),
+        "CATALOGUE_DIR": os.path.join(workdir, "no_catalogue"),
+        "SERPER_API_KEY": "stub",
+        "GROQ_API_KEY": "stub",
+        "PROFILE_SAMPLE_RATE": "0"
+    })
+
+    from stubs import StubServer
+    with StubServer(args.stub_latency) as base_url:
+        os.environ["SERPER_URL"] = f"{base_url}/search"
+        os.environ["GROQ_BASE_URL"] = base_url
+        app = __import__(spec["module"]).app
+        results = {}
+        for name in scenarios:
+            generate = mixed(args.mix) if name == "mix" else SCENARIOS[name][1]
+            with open(os.devnull, "w") as quiet, contextlib.redirect_stdout(quiet):  # the apps print per request
+                results[name] = asyncio.run(drive(app, generate, args, WARMUP.get(name, ())))
+            print(f"⏳ {name}: {results[name]['rps']:,.0f} req/s, p95 {results[name]['p95_ms']} ms", flush=True)
+    return results
+
+
+# --- Baseline comparison ---
+def compare(results, baseline, tolerance):
+    """Print deltas per scenario; returns the names that got slower beyond `tolerance`."""
+    regressed = []
+    print(f"\n{'scenario':<16}{'rps':>10}{'Δ':>8}{'p50 ms':>10}{'Δ':>8}{'p95 ms':>10}{'Δ':>8}{'p99 ms':>10}{'Δ':>8}")
+    for name, now in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"{name:<16}{now['rps']:>10,.0f}   (not in baseline)")
+            continue
+        line, bad = f"{name:<16}", False
+        for metric, higher_is_better in [("rps", True), ("p50_ms", False), ("p95_ms", False), ("p99_ms", False)]:
+            change = now[metric] / base[metric] - 1 if base[metric] else 0.0
+            worse = -change if higher_is_better else change
+            bad |= metric != "p50_ms" and worse > tolerance  # p50 is reported, rps / tails gate
+            line += f"{now[metric]:>10,.1f}{change:>+8.0%}"
+        print(line + ("  ❌ regression" if bad else ""))
+        if bad:
+            regressed.append(name)
+    return regressed
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def parse_weights(text):
+    return {name: float(w) for name, w in (part.split("=") for part in text.split(","))} if text else {}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test fare-api and fetcher_api in-process against stubs")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated scenario names")
+    parser.add_argument("--mix", type=parse_weights, default={}, help='Weighted mix, e.g. "fare_single=3,fare_batch=1"')
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per scenario")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--stub-latency", type=parse_weights, default={},
+                        help='Stub latencies in ms, e.g. "serper=80,page=150,llm=400"')
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="loadtest_results.json")
+    parser.add_argument("--baseline", help="Compare against this results file; exit 1 on a regression")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed slowdown before it counts")
+    parser.add_argument("--save-baseline", help="Also write the results here")
+    args = parser.parse_args()
+
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        sys.exit(f"Unknown scenarios {unknown}; choose from {list(SCENARIOS)}")
+    by_service = {}
+    for name in scenarios:
+        by_service.setdefault(SCENARIOS[name][0], []).append(name)
+    if args.mix:
+        services = {SCENARIOS[name][0] for name in args.mix}
+        if len(services) != 1:
+            sys.exit("--mix must use scenarios of one service")
+        by_service.setdefault(services.pop(), []).append("mix")
+
+    results = {}
+    for service, names in by_service.items():
+        # A fresh process per service: separate imports, env and caches
+        with ProcessPoolExecutor(1) as pool:
+            results.update(pool.submit(run_service, service, names, args).result())
+
+    report = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "batch_size": args.batch_size,
+            "mix": args.mix,
+            "stub_latency_ms": args.stub_latency
+        },
+        "results": results
+    }
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+    print(f"✅ Results in {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        changed = {key: (baseline["meta"].get(key), value) for key, value in report["meta"].items()
+                   if key in ("cpus", "concurrency", "batch_size", "mix", "stub_latency_ms")
+                   and baseline["meta"].get(key) != value}
+        if changed:
+            print(f"⚠️ Settings differ from the baseline (baseline, now): {changed}")
+        regressed = compare(results, baseline, args.tolerance)
+        if regressed:
+            sys.exit(f"❌ Slower than baseline beyond {args.tolerance:.0%}: {', '.join(regressed)}")
+        print("✅ No regressions against baseline")
@@ -0,0 +1,106 @@
+"""Local stand-ins for Serper, cardekho and Groq, served over real HTTP on 127.0.0.1.
+
+fetcher_api talks to them through its normal clients (SERPER_URL, GROQ_BASE_URL, and the page
+link Serper returns), so connection pooling, HTML parsing and the LangChain call path are all
+exercised. Each stub sleeps for a configurable latency before answering.
+
+Tests can steer them through `server.app.state`: `fail` (stub names answering 500),
+`llm_reply` (fixed completion text instead of the keyed SPECS) and `peers` (client ports seen
+per stub, to check connection reuse).
+"""
+import asyncio
+import hashlib
+import json
+import re
+import socket
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import HTMLResponse
+
+DEFAULT_LATENCY_MS = {"serper": 80, "page": 150, "llm": 400}
+
+SPECS = {"original_price": "₹6.49 Lakh", "company_claimed_mileage": "22.38 kmpl", "engine": "1197 cc",
+         "max_power": "88.50 bhp"}
+
+# Engine / power / mileage but no price, so page_extract can't skip the LLM
+PAGE_TEMPLATE = """<html><head><title>{slug} - Price, Specs</title></head><body>
+<h1>{slug}</h1><p>{filler}</p>
+<table>
+<tr><td>Engine Displacement</td><td>1197 cc</td></tr>
+<tr><td>Max Power</td><td>88.50bhp@6000rpm</td></tr>
+<tr><td>ARAI Mileage</td><td>22.38 kmpl</td></tr>
+<tr><td>Seating Capacity</td><td>5</td></tr>
+</table><p>{filler}</p></body></html>"""
+
+
+def stub_app(latency_ms, base_url):
+    app = FastAPI()
+    app.state.calls = {"serper": 0, "page": 0, "llm": 0}
+    app.state.peers = {"serper": set(), "page": set(), "llm": set()}
+    app.state.fail = set()
+    app.state.llm_reply = None
+
+    async def delay(name, request):
+        app.state.calls[name] += 1
+        app.state.peers[name].add(request.client.port)
+        await asyncio.sleep(latency_ms[name] / 1000)
+        if name in app.state.fail:
+            raise HTTPException(status_code=500, detail=f"{name} stub failing")
+
+    @app.post("/search")
+    async def serper(request: Request):
+        query = (await request.json())["q"]
+        await delay("serper", request)
+        slug = hashlib.sha1(query.encode()).hexdigest()[:12]
+        return {"organic": [{"link": f"{base_url}/cars/{slug}"}]}
+
+    @app.get("/cars/{slug}")
+    async def page(slug: str, request: Request):
+        await delay("page", request)
+        return HTMLResponse(PAGE_TEMPLATE.format(slug=slug, filler="Lorem ipsum dolor sit amet. " * 200))
+
+    @app.post("/openai/v1/chat/completions")
+    async def groq(request: Request):
+        body = await request.json()
+        prompt = body["messages"][-1]["content"]
+        await delay("llm", request)
+        ids = re.findall(r"^### (car_\d+)", prompt, re.MULTILINE)
+        content = app.state.llm_reply or json.dumps({i: SPECS for i in ids} if ids else SPECS)
+        return {
+            "id": "stub", "object": "chat.completion", "created": int(time.time()), "model": body.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": 40, "total_tokens": len(prompt) // 4 + 40}
+        }
+
+    return app
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class StubServer:
+    """`with StubServer(latency_ms) as base_url:` runs the stubs in a background thread."""
+
+    def __init__(self, latency_ms=None):
+        self.latency_ms = dict(DEFAULT_LATENCY_MS, **(latency_ms or {}))
+        self.port = free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.app = stub_app(self.latency_ms, self.base_url)
+        self.server = uvicorn.Server(uvicorn.Config(self.app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, name="stubs", daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self.base_url
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join()
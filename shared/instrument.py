@@ -0,0 +1,198 @@
+"""Request / stage metrics in Prometheus text format, plus an opt-in profiler for slow requests.
+
+    app.add_middleware(MetricsMiddleware)          # latency histogram + in-flight gauge per endpoint
+    with stage("model_predict"): ...              # stage histogram, in-flight gauge, error counter
+    record_error("serper")                         # failures that come back as values, not exceptions
+    register_stats("car_info_cache", cache.stats)  # any stats() dict, read at scrape time
+    app.add_api_route("/metrics", metrics_endpoint)
+
+A stage costs a few microseconds and the middleware adds no measurable latency to a request,
+so both stay on in production.
+PROFILE_SAMPLE_RATE > 0 samples the Python stacks of every thread for that fraction of requests
+(PROFILE_INTERVAL_MS apart). Requests slower than PROFILE_SLOW_MS get their samples written to
+PROFILE_DIR as collapsed stacks (flamegraph.pl / speedscope). One request is profiled at a time.
+Other requests running concurrently show up in the same samples.
+
+Several worker processes (fare-api's serve.py) share counters and histograms through files in
+PROMETHEUS_MULTIPROC_DIR; each scrape sums them over all workers. register_stats() gauges come
+from whichever worker answers the scrape.
+
+One copy for fare-api/ and Aryan_tiaro/: their modules put this directory on sys.path
+(SHARED_DIR, default ../shared) before importing it.
+"""
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter as PromCounter, Gauge,
+                               Histogram, generate_latest, multiprocess)
+from prometheus_client.core import GaugeMetricFamily
+from starlette.responses import Response
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "Request latency by endpoint",
+                            ["endpoint", "method", "status"], buckets=LATENCY_BUCKETS)
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests being served", multiprocess_mode="livesum")
+STAGE_LATENCY = Histogram("stage_duration_seconds", "Time spent in one hot-path stage", ["stage"],
+                          buckets=LATENCY_BUCKETS)
+STAGE_IN_FLIGHT = Gauge("stage_in_flight", "Calls currently inside a stage", ["stage"], multiprocess_mode="livesum")
+STAGE_ERRORS = PromCounter("stage_errors_total", "Failed calls by stage", ["stage"])
+PROFILES_WRITTEN = PromCounter("slow_request_profiles_total", "Slow-request profiles written")
+
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))  # 0 = profiler off
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", 500))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", 5))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")  # set by serve.py when running several workers
+
+
+# --- Stages ---
+_stage_children = {}  # name -> (latency, in_flight, errors); .labels() is a locked lookup, so do it once
+
+
+def _children(name):
+    children = _stage_children.get(name)
+    if children is None:
+        children = _stage_children[name] = (STAGE_LATENCY.labels(name), STAGE_IN_FLIGHT.labels(name),
+                                             STAGE_ERRORS.labels(name))
+    return children
+
+
+class stage:
+    """`with stage("llm"):` times a block (sync, or around an await); an exception counts as an error."""
+    __slots__ = ("latency", "in_flight", "errors", "start")
+
+    def __init__(self, name):
+        self.latency, self.in_flight, self.errors = _children(name)
+
+    def __enter__(self):
+        self.in_flight.inc()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.latency.observe(time.perf_counter() - self.start)
+        self.in_flight.dec()
+        if exc_type is not None:
+            self.errors.inc()
+
+
+def record_error(name):
+    _children(name)[2].inc()
+
+
+# --- Existing stats() dicts exported as gauges, read once per scrape ---
+class StatsCollector:
+    def __init__(self, prefix, stats_fn):
+        self.prefix = prefix
+        self.stats_fn = stats_fn
+
+    def collect(self):
+        for key, value in self.stats_fn().items():
+            if isinstance(value, (int, float)):  # bools export as 0 / 1
+                yield GaugeMetricFamily(f"{self.prefix}_{key}", f"{self.prefix} {key}", value=value)
+
+
+_stats_collectors = []
+
+
+def register_stats(prefix, stats_fn):
+    collector = StatsCollector(prefix, stats_fn)
+    _stats_collectors.append(collector)
+    REGISTRY.register(collector)
+
+
+# --- Sampling profiler ---
+IDLE_FILES = ("threading.py", "selectors.py", "queue.py", "thread.py")
+
+
+class StackSampler:
+    """Collapsed Python stacks of all other threads, sampled every `interval` seconds."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == me or os.path.basename(frame.f_code.co_filename) in IDLE_FILES:
+                    continue  # skip the sampler and threads parked in a wait / select
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+
+_profile_slot = threading.Lock()
+
+
+def write_profile(samples, endpoint, elapsed_ms):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}_{endpoint.strip('/').replace('/', '_') or 'root'}_{elapsed_ms:.0f}ms.txt"
+    with open(os.path.join(PROFILE_DIR, name), "w") as f:
+        f.writelines(f"{stack} {count}\n" for stack, count in samples.most_common())
+    PROFILES_WRITTEN.inc()
+
+
+# --- ASGI middleware (plain ASGI: no extra task or body buffering per request) ---
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        sampler = None
+        if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE and _profile_slot.acquire(blocking=False):
+            sampler = StackSampler(PROFILE_INTERVAL_MS / 1000)
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")  # set by the router; templated path keeps label cardinality bounded
+            endpoint = getattr(route, "path", "unmatched")
+            REQUEST_LATENCY.labels(endpoint, scope["method"], str(status)).observe(elapsed)
+            if sampler is not None:
+                samples = sampler.stop()
+                _profile_slot.release()
+                if elapsed * 1000 >= PROFILE_SLOW_MS and samples:
+                    write_profile(samples, endpoint, elapsed * 1000)
+
+
+def metrics_endpoint():
+    registry = REGISTRY
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()  # per scrape: merges every worker's files
+        multiprocess.MultiProcessCollector(registry)
+        for collector in _stats_collectors:
+            registry.register(collector)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)